@@ -0,0 +1,107 @@
+"""
+Manifiesto de un lote de videos para poder reanudarlo.
+
+El manifiesto es un archivo JSONL de solo-anexar dentro de la carpeta del lote:
+cada cambio de estado agrega una línea {"video_id", "status", ...} y al cargarlo
+gana la última línea de cada video. Si el proceso se corta a mitad de una
+escritura, la línea incompleta se descarta al cargarlo.
+"""
+
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+MANIFEST_NAME = '.manifest.jsonl'
+
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+NO_CAPTIONS = 'no_captions'
+
+
+class BatchManifest:
+    """Estado por video de un lote (pending/done/failed/no_captions)."""
+
+    def __init__(self, batch_dir: str):
+        self.path = os.path.join(batch_dir, MANIFEST_NAME)
+        self.entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._load()
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        # Bytes hasta el final de la última línea completa
+        complete = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                complete += len(line)
+                try:
+                    entry = json.loads(line.decode('utf-8'))
+                except ValueError:
+                    # Línea dañada por una interrupción
+                    continue
+                self.entries[entry['video_id']] = entry
+            size = f.tell()
+        if size > complete:
+            # Línea a medio escribir: se descarta para que la próxima no se
+            # anexe a continuación y quede ilegible también
+            os.truncate(self.path, complete)
+
+    def status(self, video_id: str) -> Optional[str]:
+        entry = self.entries.get(video_id)
+        return entry['status'] if entry else None
+
+    def is_complete(self, video_id: str, plain_dir: str, retry_no_captions: bool = False, store=None) -> bool:
+        """Indica si el video ya quedó resuelto en una ejecución anterior.
+
+        Con store (TranscriptStore) la salida se busca en el almacén del lote
+        en lugar de en plain_dir.
+        """
+        entry = self.entries.get(video_id)
+        if not entry:
+            return False
+        if entry['status'] == NO_CAPTIONS:
+            return not retry_no_captions
+        if entry['status'] == DONE:
+            # Si la salida ya no existe, se vuelve a procesar
+            if store is not None:
+                return video_id in store
+            return os.path.exists(os.path.join(plain_dir, f"{entry['file']}.txt"))
+        return False
+
+    def mark(self, video_id: str, status: str, **fields):
+        """Registra el nuevo estado de un video."""
+        entry = {'video_id': video_id, 'status': status}
+        entry.update(fields)
+        with self._lock:
+            self.entries[video_id] = entry
+            self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self._file.flush()
+
+    def counts(self) -> Dict[str, int]:
+        counts = {PENDING: 0, DONE: 0, FAILED: 0, NO_CAPTIONS: 0}
+        for entry in self.entries.values():
+            counts[entry['status']] = counts.get(entry['status'], 0) + 1
+        return counts
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def write_text_atomic(path: str, text: str):
+    """Escribe un archivo de forma atómica (archivo temporal + os.replace).
+
+    Así una interrupción nunca deja un archivo a medio escribir con el nombre final.
+    """
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
@@ -0,0 +1,410 @@
+"""
+Servidor HTTP local para benchmarks y pruebas sin conexión a YouTube.
+
+Sirve respuestas registradas por ruta y puede simular latencia, errores y
+limitaciones (HTTP 429 con Retry-After). YouTubeFixture arma sobre él un
+YouTube simulado (metadata, subtítulos, páginas de video y playlists), que se
+consulta con FakeYtDlpBackend o con el ejecutable de write_fake_yt_dlp en
+lugar de yt-dlp.
+"""
+
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+from urllib.error import HTTPError, URLError
+from urllib.parse import parse_qs, urlencode, urlparse
+from urllib.request import urlopen
+
+from rate_limiter import RateLimiter
+from yt_dlp_backend import _Backend
+
+# Una ruta puede ser un cuerpo fijo o una función (query) -> (status, headers, body)
+Route = Union[bytes, str, Callable[[dict], tuple]]
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class FixtureServer:
+    """Servidor HTTP en un hilo aparte con rutas configurables."""
+
+    def __init__(self, routes: Optional[Dict[str, Route]] = None, latency: float = 0.0,
+                 throttle_first: int = 0, retry_after: Optional[float] = 1.0,
+                 failure_rate: float = 0.0, seed: int = 0):
+        self.routes = dict(routes or {})
+        self.latency = latency
+        self.throttle_first = throttle_first
+        self.retry_after = retry_after
+        self.failure_rate = failure_rate
+        self.requests = 0
+        self.throttled = 0
+        self.bytes_sent = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def url(self, path: str = '/') -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}{path}'
+
+    def start(self) -> 'FixtureServer':
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                status, headers, body = fixture._respond(self.path)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # El cliente dejó de leer (por ejemplo, lectura parcial en streaming)
+                    return
+                with fixture._lock:
+                    fixture.bytes_sent += len(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = _ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _respond(self, raw_path: str) -> tuple:
+        if self.latency:
+            time.sleep(self.latency)
+
+        with self._lock:
+            self.requests += 1
+            if self.throttled < self.throttle_first:
+                self.throttled += 1
+                headers = {'Retry-After': str(self.retry_after)} if self.retry_after is not None else {}
+                return 429, headers, b'Too Many Requests'
+            failed = self.failure_rate and self._random.random() < self.failure_rate
+        if failed:
+            return 500, {}, b'Internal Server Error'
+
+        parsed = urlparse(raw_path)
+        route = self.routes.get(parsed.path)
+        if route is None:
+            return 404, {}, b'Not Found'
+        if callable(route):
+            status, headers, body = route(parse_qs(parsed.query))
+        else:
+            status, headers, body = 200, {}, route
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        return status, headers, body
+
+
+# --- YouTube simulado: metadata, subtítulos, páginas de video y playlists ---
+
+_WORDS = ('hola', 'y', 'bienvenidos', 'a', 'este', 'tutorial', 'sobre', 'python', 'para', 'datos',
+          'redes', 'neuronales', 'modelo', 'entrenamiento', 'ejemplo', 'clase')
+_ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_-'
+
+
+def _format_vtt_time(seconds: float) -> str:
+    ms = int(round(seconds * 1000))
+    return f'{ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d}.{ms % 1000:03d}'
+
+
+def _caption_lines(video_id: str, segments: int) -> List[str]:
+    rng = random.Random(video_id)
+    return [' '.join(rng.choice(_WORDS) for _ in range(rng.randint(4, 9))) for _ in range(segments)]
+
+
+def synthetic_vtt(video_id: str, segments: int, rolling: bool = True) -> str:
+    """VTT con el formato de los subtítulos automáticos (cada línea se repite en el evento siguiente)."""
+    out = ['WEBVTT\nKind: captions\nLanguage: es\n']
+    previous = ''
+    t = 0.0
+    for line in _caption_lines(video_id, segments):
+        if rolling:
+            tagged = '<c> '.join(f'{w}<{_format_vtt_time(t + k * 0.3)}>' for k, w in enumerate(line.split()))
+            out.append(f'{_format_vtt_time(t)} --> {_format_vtt_time(t + 2)} align:start position:0%\n'
+                       f'{previous}\n{tagged}</c>\n')
+            out.append(f'{_format_vtt_time(t + 2)} --> {_format_vtt_time(t + 2.01)} align:start position:0%\n'
+                       f'{line}\n \n')
+            previous = line
+        else:
+            out.append(f'{_format_vtt_time(t)} --> {_format_vtt_time(t + 2)}\n{line}\n')
+        t += 2.01
+    return '\n'.join(out) + '\n'
+
+
+def synthetic_json3(video_id: str, segments: int) -> dict:
+    """Pista json3 equivalente a synthetic_vtt."""
+    events = [{'tStartMs': 0, 'dDurationMs': segments * 2010, 'id': 1, 'wpWinPosId': 1, 'wsWinStyleId': 1}]
+    for n, line in enumerate(_caption_lines(video_id, segments)):
+        start = n * 2010
+        words = line.split()
+        events.append({'tStartMs': start, 'dDurationMs': 4000, 'wWinId': 1,
+                       'segs': [{'utf8': words[0]}] + [{'utf8': ' ' + w, 'tOffsetMs': k * 300}
+                                                       for k, w in enumerate(words[1:], 1)]})
+        events.append({'tStartMs': start + 2000, 'dDurationMs': 10, 'wWinId': 1, 'aAppend': 1,
+                       'segs': [{'utf8': '\n'}]})
+    return {'wireMagic': 'pb3', 'events': events}
+
+
+class YouTubeFixture:
+    """Simula las respuestas de YouTube que usa el extractor sobre un FixtureServer.
+
+    Rutas:
+        /info?v=ID                 metadata como la de `yt-dlp --dump-json`
+        /captions?v=ID&fmt=FMT     subtítulos automáticos en json3 o vtt
+        /watch?v=ID                página del video (con <title> y relleno)
+        /oembed?url=...            título del video en JSON
+        /playlist?list=ID          IDs y títulos de la playlist, uno por línea
+
+    La latencia, la tasa de errores y las respuestas 429 iniciales se configuran
+    igual que en FixtureServer.
+    """
+
+    def __init__(self, videos: int = 50, segments: int = 200, watch_page_kb: int = 600, seed: int = 0,
+                 **server_options):
+        rng = random.Random(seed)
+        self.video_ids = [''.join(rng.choice(_ALPHABET) for _ in range(11)) for _ in range(videos)]
+        self.segments = segments
+        self.watch_page_kb = watch_page_kb
+        self._known = set(self.video_ids)
+        self.server = FixtureServer({
+            '/info': self._info,
+            '/captions': self._captions,
+            '/watch': self._watch,
+            '/oembed': self._oembed,
+            '/playlist': self._playlist,
+        }, **server_options)
+
+    def start(self) -> 'YouTubeFixture':
+        self.server.start()
+        return self
+
+    def stop(self):
+        self.server.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def base_url(self) -> str:
+        return self.server.url('')
+
+    @staticmethod
+    def video_url(video_id: str) -> str:
+        """URL pública del video; el backend simulado la traduce a la ruta /info."""
+        return f'https://www.youtube.com/watch?v={video_id}'
+
+    def video_urls(self) -> List[str]:
+        return [self.video_url(video_id) for video_id in self.video_ids]
+
+    @staticmethod
+    def title(video_id: str) -> str:
+        return f'Video de prueba {video_id}'
+
+    def _video_id(self, query: dict) -> Optional[str]:
+        video_id = (query.get('v') or [None])[0]
+        return video_id if video_id in self._known else None
+
+    def _info(self, query: dict) -> tuple:
+        video_id = self._video_id(query)
+        if video_id is None:
+            return 404, {}, b'ERROR: Video unavailable'
+        captions = self.server.url('/captions')
+        tracks = {lang: [{'ext': ext, 'url': f'{captions}?v={video_id}&lang={lang}&fmt={ext}'}
+                         for ext in ('json3', 'srv1', 'vtt')]
+                  for lang in ('es', 'en')}
+        info = {
+            'id': video_id,
+            'title': self.title(video_id),
+            'language': 'es',
+            'duration': self.segments * 2,
+            'subtitles': {},
+            'automatic_captions': tracks,
+            'formats': [{'format_id': str(n), 'url': f'https://example.invalid/{n}'} for n in range(30)],
+        }
+        return 200, {'Content-Type': 'application/json'}, json.dumps(info)
+
+    def _captions(self, query: dict) -> tuple:
+        video_id = self._video_id(query)
+        if video_id is None:
+            return 404, {}, b'Not Found'
+        if (query.get('fmt') or ['vtt'])[0] == 'json3':
+            return 200, {'Content-Type': 'application/json'}, json.dumps(synthetic_json3(video_id, self.segments))
+        return 200, {'Content-Type': 'text/vtt'}, synthetic_vtt(video_id, self.segments)
+
+    def _watch(self, query: dict) -> tuple:
+        video_id = self._video_id(query)
+        if video_id is None:
+            return 404, {}, b'Not Found'
+        head = f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{self.title(video_id)} - YouTube</title>'
+        filler = '<script>var ytInitialData = {"contents": "' + 'x' * (self.watch_page_kb * 1024) + '"};</script>'
+        return 200, {'Content-Type': 'text/html'}, head + filler + '</head><body></body></html>'
+
+    def _oembed(self, query: dict) -> tuple:
+        url = (query.get('url') or [''])[0]
+        video_id = self._video_id({'v': [url.rpartition('v=')[2][:11]]})
+        if video_id is None:
+            return 404, {}, b'Not Found'
+        return 200, {'Content-Type': 'application/json'}, json.dumps({'title': self.title(video_id)})
+
+    def _playlist(self, query: dict) -> tuple:
+        lines = ''.join(f'{video_id}\t{self.title(video_id)}\n' for video_id in self.video_ids)
+        return 200, {'Content-Type': 'text/plain'}, lines
+
+
+class FakeYtDlpBackend(_Backend):
+    """Backend con la interfaz de yt_dlp_backend que consulta un YouTubeFixture.
+
+    Hace las mismas peticiones que yt-dlp (metadata y luego el archivo de
+    subtítulos), así que la latencia y los errores del servidor se reflejan
+    igual que con YouTube.
+    """
+
+    name = 'fake'
+
+    def __init__(self, base_url: str, rate_limiter: Optional[RateLimiter] = None):
+        super().__init__(rate_limiter)
+        self.base_url = base_url.rstrip('/')
+
+    def _get(self, path: str) -> Tuple[bool, bytes, str]:
+        try:
+            with urlopen(self.base_url + path, timeout=30) as response:
+                return True, response.read(), ''
+        except HTTPError as e:
+            return False, b'', f'ERROR: HTTP Error {e.code}: {e.reason}'
+        except URLError as e:
+            return False, b'', f'ERROR: {e.reason}'
+
+    @staticmethod
+    def _video_id(video_url: str) -> str:
+        return parse_qs(urlparse(video_url).query).get('v', [video_url[-11:]])[0]
+
+    def extract_info(self, video_url: str) -> Optional[dict]:
+        path = '/info?' + urlencode({'v': self._video_id(video_url)})
+
+        def call():
+            ok, body, error_text = self._get(path)
+            return ok, json.loads(body) if ok else None, error_text
+
+        return self._limited(call)
+
+    def download_subtitles(self, video_url: str, languages: List[str], output_dir: str) -> bool:
+        info = self.extract_info(video_url)
+        if not info:
+            return False
+        downloaded = False
+        for lang in languages:
+            track = (info.get('subtitles') or {}).get(lang) or (info.get('automatic_captions') or {}).get(lang)
+            url = next((fmt['url'] for fmt in track or () if fmt.get('ext') == 'vtt'), None)
+            if url is None:
+                continue
+
+            body = self._limited(lambda: self._get(url[len(self.base_url):]))
+            if body:
+                with open(os.path.join(output_dir, f"{info['title']}.{lang}.vtt"), 'wb') as f:
+                    f.write(body)
+                downloaded = True
+        return downloaded
+
+    def iter_playlist_entries(self, playlist_url: str) -> Iterator[dict]:
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        list_id = parse_qs(urlparse(playlist_url).query).get('list', [''])[0]
+        ok, body, error_text = self._get('/playlist?' + urlencode({'list': list_id}))
+        if not ok:
+            raise RuntimeError(error_text)
+        for line in body.decode('utf-8').splitlines():
+            video_id, _, title = line.partition('\t')
+            yield {'id': video_id, 'title': title}
+
+
+_FAKE_EXECUTABLE = '''#!{python}
+# yt-dlp simulado para benchmarks: responde desde {base_url}
+import sys
+sys.path.insert(0, {repo_dir!r})
+from bench_fixtures import fake_yt_dlp_main
+sys.exit(fake_yt_dlp_main(sys.argv[1:], {base_url!r}))
+'''
+
+
+def write_fake_yt_dlp(directory: str, base_url: str) -> str:
+    """Escribe un ejecutable `yt-dlp` simulado para usar con SubprocessBackend(executable=...)."""
+    path = os.path.join(directory, 'yt-dlp')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(_FAKE_EXECUTABLE.format(python=sys.executable, base_url=base_url,
+                                        repo_dir=os.path.dirname(os.path.abspath(__file__))))
+    os.chmod(path, 0o755)
+    return path
+
+
+def fake_yt_dlp_main(argv: List[str], base_url: str) -> int:
+    """Implementa las opciones de yt-dlp que usa SubprocessBackend."""
+    if '--version' in argv:
+        print('2099.01.01-fake')
+        return 0
+    backend = FakeYtDlpBackend(base_url)
+    options = {}
+    flags = set()
+    positional = []
+    args = iter(argv)
+    for arg in args:
+        if arg in ('--sub-lang', '--output', '--print'):
+            options[arg] = next(args, '')
+        elif arg.startswith('--'):
+            flags.add(arg)
+        else:
+            positional.append(arg)
+    if not positional:
+        sys.stderr.write('ERROR: falta la URL\n')
+        return 2
+    url = positional[-1]
+
+    if '--flat-playlist' in flags:
+        try:
+            for entry in backend.iter_playlist_entries(url):
+                print(f"{entry['id']}\t{entry['title']}", flush=True)
+        except RuntimeError as e:
+            sys.stderr.write(f'{e}\n')
+            return 1
+        return 0
+    if '--dump-json' in flags:
+        ok, body, error_text = backend._get('/info?' + urlencode({'v': backend._video_id(url)}))
+        if not ok:
+            sys.stderr.write(error_text + '\n')
+            return 1
+        sys.stdout.write(body.decode('utf-8') + '\n')
+        return 0
+    if '--skip-download' in flags:
+        output_dir = os.path.dirname(options.get('--output', '')) or '.'
+        languages = [lang for lang in options.get('--sub-lang', '').split(',') if lang]
+        return 0 if backend.download_subtitles(url, languages, output_dir) else 1
+    sys.stderr.write(f'ERROR: opciones no soportadas: {" ".join(argv)}\n')
+    return 2
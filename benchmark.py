@@ -0,0 +1,1116 @@
+#!/usr/bin/env python3
+"""
+Benchmarks de rendimiento para YouTube Transcript Extractor.
+
+Uso:
+    python benchmark.py backends URL [URL ...] [--repeat N]
+    python benchmark.py vtt [ARCHIVO.vtt] [--size-mb N]
+    python benchmark.py segments [--transcripts N] [--segments N]
+    python benchmark.py ratelimit [--requests N] [--throttle N] [--jobs N]
+    python benchmark.py titles [--repeat N] [--page-kb N]
+    python benchmark.py finder [PAGINA.html ...] [--size-mb N] [--no-legacy]
+    python benchmark.py initialdata [PAGINA.html ...] [--size-mb N]
+    python benchmark.py bundle [--videos N] [--segments N]
+    python benchmark.py index [--transcripts N] [--segments N] [--queries N]
+    python benchmark.py ingest [URLS.txt] [--lines N] [--unique N]
+    python benchmark.py offline [--videos N] [--jobs N] [--latency S] [--failure-rate F]
+                                [--backend fake|subprocess] [--json RESULTADOS.json] [--compare ANTERIOR.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from rich.console import Console
+from rich.table import Table
+
+from bench_fixtures import FakeYtDlpBackend, FixtureServer, YouTubeFixture, synthetic_vtt, write_fake_yt_dlp
+from caption_parser import parse_vtt
+from transcript_segments import SegmentList, format_vtt_time
+from yt_dlp_backend import SubprocessBackend, YtDlpApiBackend
+
+console = Console()
+
+
+def _summarize(samples):
+    """Devuelve (media, mediana, mínimo) en milisegundos."""
+    ms = [s * 1000 for s in samples]
+    return statistics.mean(ms), statistics.median(ms), min(ms)
+
+
+def bench_backends(urls, repeat):
+    """Compara el costo por video de los backends subprocess y API de yt-dlp."""
+    # Costo fijo: arrancar yt-dlp sin hacer ninguna petición de red
+    startup = {'subprocess': [], 'api': []}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(['yt-dlp', '--version'], capture_output=True, text=True)
+        startup['subprocess'].append(time.perf_counter() - start)
+
+    api_backend = YtDlpApiBackend()
+    start = time.perf_counter()
+    api_backend._get_ydl()
+    startup['api'].append(time.perf_counter() - start)
+    for _ in range(repeat - 1):
+        # Las llamadas siguientes reutilizan la instancia del hilo
+        start = time.perf_counter()
+        api_backend._get_ydl()
+        startup['api'].append(time.perf_counter() - start)
+
+    # Costo por video: extracción de metadata completa
+    per_video = {'subprocess': [], 'api': []}
+    backends = {'subprocess': SubprocessBackend(), 'api': api_backend}
+    for _ in range(repeat):
+        for url in urls:
+            for name, backend in backends.items():
+                start = time.perf_counter()
+                backend.extract_info(url)
+                per_video[name].append(time.perf_counter() - start)
+
+    table = Table(title='Backends de yt-dlp (ms)', show_header=True, header_style='bold blue')
+    table.add_column('Backend', style='cyan')
+    table.add_column('Medición')
+    table.add_column('Media', justify='right')
+    table.add_column('Mediana', justify='right')
+    table.add_column('Mínimo', justify='right')
+    for name in ('subprocess', 'api'):
+        for label, samples in (('arranque', startup[name]), ('metadata/video', per_video[name])):
+            mean, median, minimum = _summarize(samples)
+            table.add_row(name, label, f'{mean:.1f}', f'{median:.1f}', f'{minimum:.1f}')
+    console.print(table)
+
+    overhead = _summarize(per_video['subprocess'])[1] - _summarize(per_video['api'])[1]
+    console.print(f'[green]Ahorro estimado por llamada con el backend API: {overhead:.1f} ms[/green]')
+
+
+def _legacy_time_to_seconds(time_str):
+    parts = time_str.split(':')
+    seconds_parts = parts[2].split('.')
+    milliseconds = int(seconds_parts[1]) if len(seconds_parts) > 1 else 0
+    return int(parts[0]) * 3600 + int(parts[1]) * 60 + int(seconds_parts[0]) + milliseconds / 1000
+
+
+def _legacy_process_vtt(vtt_content):
+    """Implementación original de _process_vtt_transcript, como referencia."""
+    transcript = {'segments': [], 'full_text': []}
+    lines = vtt_content.split('\n')
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip()
+        if '-->' in line:
+            time_match = re.match(r'(\d{2}:\d{2}:\d{2}\.\d{3})\s*-->\s*(\d{2}:\d{2}:\d{2}\.\d{3})', line)
+            if time_match:
+                start_time = time_match.group(1)
+                start_seconds = _legacy_time_to_seconds(start_time)
+                duration = _legacy_time_to_seconds(time_match.group(2)) - start_seconds
+                i += 1
+                text_lines = []
+                while i < len(lines) and lines[i].strip() and '-->' not in lines[i]:
+                    text_line = lines[i].strip()
+                    if text_line:
+                        clean_text = re.sub(r'<[^>]+>', '', text_line)
+                        clean_text = re.sub(r'<\d{2}:\d{2}:\d{2}\.\d{3}>', '', clean_text)
+                        if clean_text:
+                            text_lines.append(clean_text)
+                    i += 1
+                if text_lines:
+                    segment = {'text': ' '.join(text_lines).strip(), 'start': start_seconds,
+                               'duration': duration, 'start_formatted': start_time}
+                    if segment['text']:
+                        transcript['segments'].append(segment)
+                        transcript['full_text'].append(segment['text'])
+                continue
+        i += 1
+    transcript['full_text'] = ' '.join(transcript['full_text'])
+    return transcript
+
+
+def write_synthetic_vtt(path, size_mb):
+    """Genera un VTT con el formato de subtítulos automáticos de YouTube."""
+    words = ['hola', 'y', 'bienvenidos', 'a', 'este', 'tutorial', 'sobre', 'python', 'para', 'datos']
+    target = size_mb * 1024 * 1024
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('WEBVTT\nKind: captions\nLanguage: es\n\n')
+        t = 0.0
+        previous = ''
+        n = 0
+        while f.tell() < target:
+            line = ' '.join(words[(n + k) % len(words)] for k in range(6))
+            tagged = '<c> '.join(f'{w}<{format_vtt_time(t + k * 0.3)}>' for k, w in enumerate(line.split()))
+            f.write(f'{format_vtt_time(t)} --> {format_vtt_time(t + 2)} align:start position:0%\n'
+                    f'{previous}\n{tagged}</c>\n\n')
+            f.write(f'{format_vtt_time(t + 2)} --> {format_vtt_time(t + 2.01)} align:start position:0%\n'
+                    f'{line}\n \n\n')
+            previous = line
+            t += 2.01
+            n += 1
+
+
+def _measure(func):
+    """Ejecuta func midiendo tiempo (sin tracemalloc) y luego memoria pico."""
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def bench_vtt(path, size_mb):
+    """Compara el parser VTT en streaming con la implementación original."""
+    tmp_dir = None
+    if path is None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        path = os.path.join(tmp_dir.name, 'synthetic.vtt')
+        write_synthetic_vtt(path, size_mb)
+    size = os.path.getsize(path) / (1024 * 1024)
+
+    def legacy():
+        with open(path, 'r', encoding='utf-8') as f:
+            return _legacy_process_vtt(f.read())
+
+    def streaming():
+        with open(path, 'r', encoding='utf-8') as f:
+            return parse_vtt(f)
+
+    legacy_result, legacy_time, legacy_peak = _measure(legacy)
+    new_result, new_time, new_peak = _measure(streaming)
+
+    table = Table(title=f'Parser VTT ({size:.1f} MB, {len(new_result["segments"])} segmentos)',
+                  show_header=True, header_style='bold blue')
+    table.add_column('Implementación', style='cyan')
+    table.add_column('Tiempo (s)', justify='right')
+    table.add_column('MB/s', justify='right')
+    table.add_column('Memoria pico (MB)', justify='right')
+    for name, elapsed, peak in (('original', legacy_time, legacy_peak), ('streaming', new_time, new_peak)):
+        table.add_row(name, f'{elapsed:.2f}', f'{size / elapsed:.1f}', f'{peak / (1024 * 1024):.1f}')
+    console.print(table)
+
+    if legacy_result == new_result:
+        console.print('[green]✅ Ambas implementaciones producen el mismo resultado[/green]')
+    else:
+        console.print('[bold red]❌ Los resultados difieren[/bold red]')
+
+    with open(path, 'r', encoding='utf-8') as f:
+        start = time.perf_counter()
+        merged = parse_vtt(f, merge_rolling=True)
+        merged_time = time.perf_counter() - start
+    ratio = len(merged['full_text']) / max(1, len(new_result['full_text']))
+    console.print(f'Sin repeticiones (merge_rolling): {len(merged["segments"])} segmentos, '
+                  f'texto al {ratio * 100:.0f}% del original, {size / merged_time:.1f} MB/s')
+
+    if tmp_dir is not None:
+        tmp_dir.cleanup()
+
+
+def _traced_peak(build):
+    """Memoria pico (bytes) que ocupa el resultado de build()."""
+    tracemalloc.start()
+    result = build()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, peak
+
+
+def bench_segments(transcripts, segments_per_transcript):
+    """Compara la memoria de una lista de dicts frente a SegmentList en un corpus sintético."""
+    words = ['hola', 'y', 'bienvenidos', 'a', 'este', 'tutorial', 'sobre', 'python', 'para', 'datos']
+
+    def rows(t):
+        for n in range(segments_per_transcript):
+            start = n * 2.01 + t
+            yield ' '.join(words[(n + k) % len(words)] for k in range(6)) + f' {n}', start, 2.01
+
+    def build_dicts():
+        return [[{'text': text, 'start': start, 'duration': duration,
+                  'start_formatted': format_vtt_time(start)} for text, start, duration in rows(t)]
+                for t in range(transcripts)]
+
+    def build_compact():
+        corpus = []
+        for t in range(transcripts):
+            segments = SegmentList()
+            for text, start, duration in rows(t):
+                segments.append(text, start, duration)
+            segments.text(0)  # unir el buffer de textos
+            corpus.append(segments)
+        return corpus
+
+    dicts, dicts_peak = _traced_peak(build_dicts)
+    del dicts
+    compact, compact_peak = _traced_peak(build_compact)
+
+    total = transcripts * segments_per_transcript
+    table = Table(title=f'Segmentos en memoria ({transcripts} transcripciones, {total} segmentos)',
+                  show_header=True, header_style='bold blue')
+    table.add_column('Representación', style='cyan')
+    table.add_column('Memoria (MB)', justify='right')
+    table.add_column('Bytes/segmento', justify='right')
+    for name, peak in (('lista de dicts', dicts_peak), ('SegmentList', compact_peak)):
+        table.add_row(name, f'{peak / (1024 * 1024):.1f}', f'{peak / total:.0f}')
+    console.print(table)
+    console.print(f'[green]Ahorro: {(1 - compact_peak / dicts_peak) * 100:.0f}%[/green]')
+
+
+def bench_ratelimit(requests_count, throttle, jobs, rate):
+    """Envía peticiones a un servidor local que responde 429 a las primeras `throttle`."""
+    from youtube_transcript_extractor import YouTubeTranscriptExtractor
+
+    extractor = YouTubeTranscriptExtractor(jobs=jobs, cache_path=None, requests_per_second=rate)
+    with FixtureServer({'/ok': b'ok'}, throttle_first=throttle, retry_after=1) as server:
+        url = server.url('/ok')
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            statuses = list(executor.map(lambda _: extractor._http_get(url).status_code, range(requests_count)))
+        elapsed = time.perf_counter() - start
+
+    limiter = extractor.rate_limiter
+    table = Table(title='Limitador de peticiones (servidor local)', show_header=True, header_style='bold blue')
+    table.add_column('Métrica', style='cyan')
+    table.add_column('Valor', justify='right')
+    table.add_row('Peticiones lógicas', str(requests_count))
+    table.add_row('Peticiones al servidor', str(server.requests))
+    table.add_row('Respuestas 429', str(server.throttled))
+    table.add_row('Limitaciones detectadas', str(limiter.throttle_events))
+    table.add_row('Reintentos', str(limiter.retries))
+    table.add_row('Respuestas finales 200', str(statuses.count(200)))
+    table.add_row('Tasa final (pet/s)', f'{limiter.rate:.2f}')
+    table.add_row('Tiempo total (s)', f'{elapsed:.2f}')
+    console.print(table)
+
+
+def _synthetic_watch_page(title, size_kb):
+    """Página de video con el <title> al inicio y scripts de relleno detrás, como la real."""
+    head = f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{title} - YouTube</title>'
+    filler = '<script>var ytInitialData = {"contents": "' + 'x' * (size_kb * 1024) + '"};</script>'
+    return head + filler + '</head><body></body></html>'
+
+
+def bench_titles(repeat, page_kb):
+    """Compara formas de obtener el título frente a un servidor local."""
+    from youtube_transcript_extractor import YouTubeTranscriptExtractor
+
+    title = 'Video de prueba &amp; benchmark'
+    routes = {
+        '/watch': _synthetic_watch_page(title, page_kb),
+        '/oembed': json.dumps({'title': 'Video de prueba & benchmark', 'author_name': 'Canal'}),
+    }
+    extractor = YouTubeTranscriptExtractor(cache_path=None, requests_per_second=1000)
+
+    with FixtureServer(routes) as server:
+        extractor.OEMBED_URL = server.url('/oembed')
+        video_url = server.url('/watch?v=dQw4w9WgXcQ')
+
+        def full_page():
+            # Implementación original: descarga toda la página y busca <title>
+            response = extractor.session.get(video_url, timeout=15)
+            return len(response.content)
+
+        def streamed_page():
+            before = extractor.stats['title_bytes']
+            extractor._fetch_watch_page_title(video_url)
+            return extractor.stats['title_bytes'] - before
+
+        def oembed():
+            before = extractor.stats['title_bytes']
+            extractor._fetch_oembed_title('dQw4w9WgXcQ')
+            return extractor.stats['title_bytes'] - before
+
+        table = Table(title=f'Obtención de títulos ({repeat} repeticiones, página de {page_kb} KB)',
+                      show_header=True, header_style='bold blue')
+        table.add_column('Método', style='cyan')
+        table.add_column('Bytes leídos', justify='right')
+        table.add_column('Mediana (ms)', justify='right')
+        for name, method in (('Página completa (original)', full_page),
+                             ('Página en streaming hasta </title>', streamed_page),
+                             ('oEmbed', oembed)):
+            samples = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                read = method()
+                samples.append(time.perf_counter() - start)
+            table.add_row(name, f'{read:,}', f'{statistics.median(samples) * 1000:.2f}')
+
+        console.print(table)
+
+
+_LEGACY_FINDER_PATTERNS = [
+    r'(?:youtube\.com/(?:watch\?v=|embed/|v/)|youtu\.be/)([\w-]{11})',
+    r'v=([\w-]{11})',
+    r'\"videoId\"\s*:\s*\"([\w-]{11})\"',
+    r'\"videoRenderer\"\s*:\s*{[^}]*\"videoId\"\s*:\s*\"([\w-]{11})\"',
+    r'\"watchEndpoint\"\s*:\s*{[^}]*\"videoId\"\s*:\s*\"([\w-]{11})\"',
+    r'\"videoPrimaryInfoRenderer[^}]*\"videoId\"\s*:\s*\"([\w-]{11})\"',
+    r'/watch\\?v=([\w-]{11})',
+    r'videoId\\?":\\?"([\w-]{11})',
+    r'\"url\":\s*\"[^\"]*(?:youtube\.com/(?:watch\?v=|embed/|v/)|youtu\.be/)([\w-]{11})\"',
+    r'richItemRenderer.*?videoId\\?":\\?"([\w-]{11})',
+    r'gridVideoRenderer.*?videoId\\?":\\?"([\w-]{11})',
+    r'playlistVideoRenderer.*?videoId\\?":\\?"([\w-]{11})',
+    r'compactVideoRenderer.*?videoId\\?":\\?"([\w-]{11})',
+    r'endScreenVideoRenderer.*?videoId\\?":\\?"([\w-]{11})',
+    r'serializedShareEntity\\?":\\?"video_([\w-]{11})',
+    r'watchEndpoint\\?":{[^}]*\\?"videoId\\?":\\?"([\w-]{11})',
+]
+
+
+def _legacy_extract_video_id_from_text(text):
+    """Implementación original de yt_url_finder.extract_video_id_from_text, como referencia."""
+    video_ids = set()
+    for pattern in _LEGACY_FINDER_PATTERNS:
+        for match in re.finditer(pattern, text, re.DOTALL):
+            video_ids.add(match.group(1))
+    for json_match in re.finditer(r'var ytInitialData = ({.*?});', text, re.DOTALL):
+        try:
+            json_text = json.dumps(json.loads(json_match.group(1)))
+        except ValueError:
+            continue
+        for pattern in _LEGACY_FINDER_PATTERNS:
+            for match in re.finditer(pattern, json_text):
+                video_ids.add(match.group(1))
+    return video_ids
+
+
+def _legacy_extract_youtube_urls(html_content):
+    """Implementación original de yt_url_finder.extract_youtube_urls (requiere bs4)."""
+    import warnings
+    from bs4 import BeautifulSoup
+
+    video_ids = _legacy_extract_video_id_from_text(html_content)
+    with warnings.catch_warnings():
+        # bs4 avisa cuando un fragmento del corpus parece una URL
+        warnings.simplefilter('ignore')
+        soup = BeautifulSoup(html_content, 'html.parser')
+    for script in soup.find_all('script'):
+        if script.string:
+            video_ids.update(_legacy_extract_video_id_from_text(script.string))
+    for element in soup.find_all(attrs={'data-video-id': True}):
+        video_id = element.get('data-video-id')
+        if video_id and len(video_id) == 11:
+            video_ids.add(video_id)
+    for a in soup.find_all('a', href=True):
+        video_ids.update(_legacy_extract_video_id_from_text(a['href']))
+    return sorted(f'https://www.youtube.com/watch?v={video_id}' for video_id in video_ids)
+
+
+# Fragmentos con las formas en que aparecen IDs en páginas guardadas de YouTube
+FINDER_CORPUS = [
+    '<a href="/watch?v=dQw4w9WgXcQ&amp;t=42s">video</a>',
+    '<a href="https://youtu.be/9bZkp7q19f0?si=abc">corto</a>',
+    '<iframe src="https://www.youtube.com/embed/kJQP7kiw5Fk"></iframe>',
+    '<object data="http://www.youtube.com/v/OPf0YbXqDm0"></object>',
+    '{"videoId": "JGwWNGJdvx8", "title": "x"}',
+    '{"videoRenderer":{"videoId":"RgKAFK5djSk","thumbnail":{}}}',
+    '{"watchEndpoint":{"videoId":"fJ9rUzIMcZQ","params":"x"}}',
+    'ytcfg.set({"data":"{\\"videoId\\":\\"hT_nvWreIhg\\"}"})',
+    '"serializedShareEntity":"video_CevxZvSJLk8"',
+    'watchEndpoint\\":{\\"videoId\\":\\"YQHsXMglC9A\\"}',
+    '<div class="thumb" data-video-id="60ItHLz5WEA"></div>',
+    "<div DATA-VIDEO-ID='kXYiU_JCYtU'></div>",
+    '<div data-video-id="corto"></div>',
+    '"richItemRenderer":{"content":{"videoRenderer":{"videoId":"lp-EO5I60KA"}}}',
+    '<script>var ytInitialData = {"url": "/watch?v\\u003dnfWlot6h_JM"};</script>',
+    '{"videoId":"tooLongVideoID_x"} v=short',
+    'https://www.youtube.com/watch?v=2Vv-BfVoq4g&list=PLx&index=2',
+]
+
+
+def write_synthetic_channel_page(path, size_mb):
+    """Genera una página de canal con la estructura de las páginas guardadas de YouTube."""
+    rng = random.Random(0)
+    alphabet = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_-'
+    target = size_mb * 1024 * 1024
+    items = []
+    links = []
+    size = 0
+    while size < target:
+        video_id = ''.join(rng.choice(alphabet) for _ in range(11))
+        items.append({'richItemRenderer': {'content': {'videoRenderer': {
+            'videoId': video_id,
+            'thumbnail': {'thumbnails': [{'url': f'https://i.ytimg.com/vi/{video_id}/hqdefault.jpg',
+                                          'width': 480, 'height': 360}]},
+            'title': {'runs': [{'text': 'Video de ejemplo ' + video_id}]},
+            'lengthText': {'simpleText': f'{rng.randint(0, 59)}:{rng.randint(0, 59):02d}'},
+            'descriptionSnippet': {'runs': [{'text': 'lorem ipsum ' * rng.randint(5, 40)}]},
+            'navigationEndpoint': {'commandMetadata': {'webCommandMetadata': {'url': f'/watch?v={video_id}'}},
+                                   'watchEndpoint': {'videoId': video_id}},
+        }}}})
+        links.append(f'<a id="thumbnail" href="/watch?v={video_id}&amp;pp=ygU" data-video-id="{video_id}">'
+                     f'<img src="https://i.ytimg.com/vi/{video_id}/hq720.jpg"></a>')
+        size += len(json.dumps(items[-1])) + len(links[-1])
+    escaped = json.dumps(json.dumps({'videoId': items[0]['richItemRenderer']['content']['videoRenderer']['videoId']}))
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<!DOCTYPE html><html><head><title>Canal - YouTube</title>')
+        f.write(f'<script>ytcfg.set({{"DATA": {escaped}}});</script>')
+        f.write('<script>var ytInitialData = ')
+        f.write(json.dumps({'contents': {'twoColumnBrowseResultsRenderer': {'tabs': [
+            {'tabRenderer': {'content': {'richGridRenderer': {'contents': items}}}}]}}}))
+        f.write(';</script></head><body>')
+        f.write('\n'.join(links))
+        f.write('</body></html>')
+
+
+def bench_finder(paths, size_mb, legacy=True):
+    """Compara yt_url_finder con la implementación original (mismos IDs, menos tiempo).
+
+    También mide la lectura por bloques con mmap frente a cargar el archivo en
+    un str. La implementación original necesita bs4 y es muy lenta en páginas
+    grandes; con legacy=False se omite.
+    """
+    from yt_url_finder import extract_youtube_urls, extract_youtube_urls_from_file
+
+    if legacy:
+        try:
+            import bs4  # noqa: F401
+        except ImportError:
+            console.print('[yellow]⚠️  beautifulsoup4 no está instalado: se omite la implementación original[/yellow]')
+            legacy = False
+
+    if legacy:
+        for snippet in FINDER_CORPUS:
+            if extract_youtube_urls(snippet) != _legacy_extract_youtube_urls(snippet):
+                console.print(f'[bold red]❌ Los resultados difieren en el corpus: {snippet}[/bold red]')
+                return
+        console.print(f'[green]✅ Corpus de regresión: {len(FINDER_CORPUS)} fragmentos con los mismos IDs[/green]')
+
+    tmp_path = None
+    if not paths:
+        fd, tmp_path = tempfile.mkstemp(suffix='.html')
+        os.close(fd)
+        console.print(f'[blue]Generando página de canal sintética de {size_mb} MB...[/blue]')
+        write_synthetic_channel_page(tmp_path, size_mb)
+        paths = [tmp_path]
+
+    table = Table(title='Búsqueda de IDs de video en HTML', show_header=True, header_style='bold blue')
+    table.add_column('Archivo', style='cyan')
+    table.add_column('MB', justify='right')
+    table.add_column('IDs', justify='right')
+    if legacy:
+        table.add_column('Original (s)', justify='right')
+    table.add_column('str (s)', justify='right')
+    table.add_column('str pico (MB)', justify='right')
+    table.add_column('mmap (s)', justify='right')
+    table.add_column('mmap pico (MB)', justify='right')
+    try:
+        for path in paths:
+            mb = os.path.getsize(path) / (1024 * 1024)
+            row = [os.path.basename(path), f'{mb:.1f}']
+
+            def in_memory():
+                with open(path, 'r', encoding='utf-8') as f:
+                    return extract_youtube_urls(f.read())
+
+            urls, str_time, str_peak = _measure(in_memory)
+            file_urls, file_time, file_peak = _measure(lambda: extract_youtube_urls_from_file(path))
+            row.append(str(len(urls)))
+
+            if legacy:
+                with open(path, 'r', encoding='utf-8') as f:
+                    html_content = f.read()
+                start = time.perf_counter()
+                legacy_urls = _legacy_extract_youtube_urls(html_content)
+                row.append(f'{time.perf_counter() - start:.2f}')
+                del html_content
+                if urls != legacy_urls:
+                    console.print(f'[bold red]❌ Los resultados difieren en {path}: '
+                                  f'{len(legacy_urls)} vs {len(urls)} URLs[/bold red]')
+            if file_urls != urls:
+                console.print(f'[bold red]❌ La lectura por bloques difiere en {path}: '
+                              f'{len(urls)} vs {len(file_urls)} URLs[/bold red]')
+
+            row += [f'{str_time:.2f}', f'{str_peak / 1e6:.1f}', f'{file_time:.2f}', f'{file_peak / 1e6:.1f}']
+            table.add_row(*row)
+    finally:
+        if tmp_path:
+            os.remove(tmp_path)
+
+    console.print(table)
+
+
+def bench_initialdata(paths, size_mb):
+    """Compara el recorrido de ytInitialData con loads -> dumps -> regex."""
+    from yt_url_finder import _YT_INITIAL_DATA_RE, _walk_initial_data_at
+
+    tmp_path = None
+    if not paths:
+        fd, tmp_path = tempfile.mkstemp(suffix='.html')
+        os.close(fd)
+        console.print(f'[blue]Generando página de canal sintética de {size_mb} MB...[/blue]')
+        write_synthetic_channel_page(tmp_path, size_mb)
+        paths = [tmp_path]
+
+    def legacy(text):
+        video_ids = set()
+        for json_match in re.finditer(r'var ytInitialData = ({.*?});', text, re.DOTALL):
+            try:
+                json_text = json.dumps(json.loads(json_match.group(1)))
+            except ValueError:
+                continue
+            for pattern in _LEGACY_FINDER_PATTERNS:
+                for match in re.finditer(pattern, json_text):
+                    video_ids.add(match.group(1))
+        return video_ids
+
+    def walker(text, video_info):
+        video_ids = set()
+        for match in _YT_INITIAL_DATA_RE.finditer(text):
+            _walk_initial_data_at(text, match.end(), video_ids, video_info)
+        return video_ids
+
+    table = Table(title='IDs dentro de ytInitialData', show_header=True, header_style='bold blue')
+    table.add_column('Archivo', style='cyan')
+    table.add_column('MB', justify='right')
+    table.add_column('IDs (original / recorrido)', justify='right')
+    table.add_column('Con título / duración', justify='right')
+    table.add_column('Original (s)', justify='right')
+    table.add_column('Recorrido (s)', justify='right')
+    try:
+        for path in paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            start = time.perf_counter()
+            legacy_ids = legacy(text)
+            legacy_time = time.perf_counter() - start
+            video_info = {}
+            start = time.perf_counter()
+            walker_ids = walker(text, video_info)
+            walker_time = time.perf_counter() - start
+
+            if not legacy_ids <= walker_ids:
+                console.print(f'[bold red]❌ El recorrido no encontró {len(legacy_ids - walker_ids)} IDs en {path}[/bold red]')
+            titled = sum(1 for info in video_info.values() if info['title'])
+            timed = sum(1 for info in video_info.values() if info['duration'] is not None)
+            table.add_row(os.path.basename(path), f'{len(text) / (1024 * 1024):.1f}',
+                          f'{len(legacy_ids)} / {len(walker_ids)}', f'{titled} / {timed}',
+                          f'{legacy_time:.3f}', f'{walker_time:.3f}')
+    finally:
+        if tmp_path:
+            os.remove(tmp_path)
+
+    console.print(table)
+
+
+def bench_bundle(videos, segments_per_video):
+    """Escritura de un lote como .txt por video frente al almacén agrupado."""
+    import shutil
+    from batch_manifest import write_text_atomic
+    from transcript_segments import format_timestamped_text
+    from transcript_store import TranscriptStore
+
+    words = ['hola', 'y', 'bienvenidos', 'a', 'este', 'tutorial', 'sobre', 'python', 'para', 'datos']
+    segments = SegmentList()
+    for i in range(segments_per_video):
+        segments.append(' '.join(words[(i + k) % len(words)] for k in range(8)), i * 2.0, 2.0)
+    transcript = {'segments': segments, 'full_text': ' '.join(segments.texts()),
+                  'title': 'Video de prueba', 'selected_language': 'es'}
+    video_ids = [f'vid{i:08d}' for i in range(videos)]
+
+    root = tempfile.mkdtemp()
+    try:
+        txt_dir = os.path.join(root, 'txt')
+        timestamps_dir = os.path.join(txt_dir, 'transcripts_with_timestamps')
+        plain_dir = os.path.join(txt_dir, 'transcripts_plain')
+        os.makedirs(timestamps_dir)
+        os.makedirs(plain_dir)
+        start = time.perf_counter()
+        for idx, video_id in enumerate(video_ids, 1):
+            filename = f'{idx:03d}_Video de prueba_{video_id}'
+            write_text_atomic(os.path.join(timestamps_dir, f'{filename}.txt'), format_timestamped_text(segments))
+            write_text_atomic(os.path.join(plain_dir, f'{filename}.txt'), transcript['full_text'])
+        txt_time = time.perf_counter() - start
+        start = time.perf_counter()
+        txt_files = sum(len(files) for _, _, files in os.walk(txt_dir))
+        txt_list_time = time.perf_counter() - start
+
+        bundle_dir = os.path.join(root, 'bundle')
+        start = time.perf_counter()
+        with TranscriptStore(bundle_dir) as store:
+            for idx, video_id in enumerate(video_ids, 1):
+                store.put(video_id, f'{idx:03d}_Video de prueba_{video_id}', transcript)
+        bundle_time = time.perf_counter() - start
+        bundle_bytes = sum(os.path.getsize(os.path.join(bundle_dir, name)) for name in os.listdir(bundle_dir))
+
+        rng = random.Random(0)
+        sample = [rng.choice(video_ids) for _ in range(min(1000, videos))]
+        start = time.perf_counter()
+        with TranscriptStore(bundle_dir) as store:
+            open_time = time.perf_counter() - start
+            start = time.perf_counter()
+            for video_id in sample:
+                store.get(video_id)
+            get_time = (time.perf_counter() - start) / len(sample)
+    finally:
+        shutil.rmtree(root)
+
+    table = Table(title=f'Salida de {videos} videos ({segments_per_video} segmentos c/u)',
+                  show_header=True, header_style='bold blue')
+    table.add_column('Métrica', style='cyan')
+    table.add_column('.txt por video', justify='right')
+    table.add_column('Almacén agrupado', justify='right')
+    table.add_row('Archivos', f'{txt_files:,}', '2')
+    table.add_row('Escritura (s)', f'{txt_time:.2f}', f'{bundle_time:.2f}')
+    table.add_row('Listar / abrir (ms)', f'{txt_list_time * 1000:.1f}', f'{open_time * 1000:.1f}')
+    table.add_row('Tamaño almacén (MB)', '', f'{bundle_bytes / 1e6:.1f}')
+    table.add_row('Lectura por ID (ms)', '', f'{get_time * 1000:.2f}')
+    console.print(table)
+
+
+# Pausa fija por video que usaba el extractor antes del limitador de peticiones
+LEGACY_VIDEO_PAUSE = 0.5
+
+
+_URL_FORMS = (
+    'https://www.youtube.com/watch?v={id}',
+    'https://www.youtube.com/watch?v={id}&t={n}s',
+    'https://www.youtube.com/watch?v={id}&list=PLx{n}&index={n}',
+    'https://m.youtube.com/watch?v={id}&feature=share',
+    'https://youtu.be/{id}?si=x{n}',
+    'https://www.youtube.com/shorts/{id}',
+    'https://www.youtube.com/embed/{id}?rel=0',
+    '  https://music.youtube.com/watch?v={id}  ',
+)
+
+
+def write_synthetic_url_list(path, lines, unique):
+    """Lista de URLs con los mismos videos escritos de varias formas y algunas líneas basura."""
+    rng = random.Random(0)
+    alphabet = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_-'
+    ids = [''.join(rng.choice(alphabet) for _ in range(10)) + rng.choice('AEIMQUYcgkosw048') for _ in range(unique)]
+    with open(path, 'w', encoding='utf-8') as f:
+        for n in range(lines):
+            if n % 50 == 0:
+                f.write('# comentario\n' if n % 100 == 0 else 'https://www.youtube.com/playlist?list=PLabc\n')
+                continue
+            video_id = ids[n] if n < unique else rng.choice(ids)
+            f.write(rng.choice(_URL_FORMS).format(id=video_id, n=n) + '\n')
+
+
+def bench_ingest(path, lines, unique):
+    """Compara la lectura original de listas de URLs con la lectura en streaming."""
+    from url_processor import IngestStats, VideoIdSet, canonical_video_id, iter_video_urls
+
+    tmp_dir = None
+    if path is None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        path = os.path.join(tmp_dir.name, 'urls.txt')
+        write_synthetic_url_list(path, lines, unique)
+    size = os.path.getsize(path) / (1024 * 1024)
+
+    def legacy():
+        # Implementación original de read_urls_from_file: todas las líneas a una lista
+        urls = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    if 'youtube.com/watch' in line or 'youtu.be/' in line:
+                        urls.append(line)
+        return urls
+
+    stats = IngestStats()
+
+    def streaming():
+        stats.__init__()
+        count = 0
+        for _ in iter_video_urls(path, stats):
+            count += 1
+        return count
+
+    legacy_urls, legacy_time, legacy_peak = _measure(legacy)
+    new_count, new_time, new_peak = _measure(streaming)
+    legacy_unique = len({canonical_video_id(url) for url in legacy_urls})
+
+    table = Table(title=f'Lectura de listas de URLs ({size:.1f} MB, {stats.lines:,} líneas)',
+                  show_header=True, header_style='bold blue')
+    table.add_column('Implementación', style='cyan')
+    table.add_column('URLs a procesar', justify='right')
+    table.add_column('Videos distintos', justify='right')
+    table.add_column('Tiempo (s)', justify='right')
+    table.add_column('Líneas/s', justify='right')
+    table.add_column('Memoria pico (MB)', justify='right')
+    for name, count, distinct, elapsed, peak in (
+            ('original (lista)', len(legacy_urls), legacy_unique, legacy_time, legacy_peak),
+            ('streaming + canónica', new_count, new_count, new_time, new_peak)):
+        table.add_row(name, f'{count:,}', f'{distinct:,}', f'{elapsed:.2f}', f'{stats.lines / elapsed:,.0f}',
+                      f'{peak / (1024 * 1024):.1f}')
+    console.print(table)
+    console.print(f'Repetidas descartadas: {stats.duplicates:,} • líneas sin video: {stats.invalid:,}')
+
+    # Memoria del conjunto de IDs ya vistos
+    urls = list(iter_video_urls(path))
+    str_set_peak = _traced_peak(lambda: {url[-11:] for url in urls})[1]
+
+    def build_compact():
+        compact = VideoIdSet()
+        for url in urls:
+            compact.add(url[-11:])
+        return compact
+
+    compact_peak = _traced_peak(build_compact)[1]
+    console.print(f'Memoria de los IDs vistos ({len(urls):,}): set de str {str_set_peak / len(urls):.1f} B/ID, '
+                  f'VideoIdSet {compact_peak / len(urls):.1f} B/ID')
+
+    if tmp_dir is not None:
+        tmp_dir.cleanup()
+
+
+def bench_index(transcripts, segments_per_transcript, queries):
+    """Construcción, tamaño y latencia de búsqueda del índice de texto completo."""
+    import shutil
+    from transcript_index import TranscriptIndex
+
+    # Vocabulario con frecuencias tipo Zipf, como el texto hablado
+    rng = random.Random(0)
+    vocabulary = [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(3, 10)))
+                  for _ in range(30000)]
+    cum_weights = []
+    total = 0.0
+    for rank in range(1, len(vocabulary) + 1):
+        total += 1 / rank
+        cum_weights.append(total)
+
+    def corpus():
+        for t in range(transcripts):
+            segments = SegmentList()
+            for i in range(segments_per_transcript):
+                words = rng.choices(vocabulary, cum_weights=cum_weights, k=8)
+                segments.append(' '.join(words), i * 2.5, 2.5)
+            yield f'vid{t:08d}', segments, f'Video {t}'
+
+    root = tempfile.mkdtemp()
+    try:
+        index = TranscriptIndex(os.path.join(root, 'index.sqlite3'))
+        start = time.perf_counter()
+        index.add_many(corpus())
+        build_time = time.perf_counter() - start
+        stats = index.stats()
+
+        # Actualización incremental de un video nuevo
+        extra = next(iter(corpus()))
+        start = time.perf_counter()
+        index.add('vid_incremental', extra[1], 'Nuevo')
+        add_time = time.perf_counter() - start
+
+        # Consultas de 1 a 3 términos de frecuencia media/baja
+        query_rng = random.Random(1)
+        query_list = [' '.join(query_rng.choice(vocabulary[50:5000]) for _ in range(query_rng.randint(1, 3)))
+                      for _ in range(queries)]
+        latencies = []
+        for query in query_list:
+            start = time.perf_counter()
+            index.search(query, 10)
+            latencies.append(time.perf_counter() - start)
+        index.close()
+    finally:
+        shutil.rmtree(root)
+
+    latencies.sort()
+    table = Table(title=f'Índice de texto completo ({transcripts:,} transcripciones x {segments_per_transcript} segmentos)',
+                  show_header=True, header_style='bold blue')
+    table.add_column('Métrica', style='cyan')
+    table.add_column('Valor', justify='right')
+    table.add_row('Tokens indexados', f"{stats['tokens']:,}")
+    table.add_row('Términos / postings', f"{stats['terms']:,} / {stats['postings']:,}")
+    table.add_row('Construcción (s)', f'{build_time:.1f}')
+    table.add_row('Transcripciones/s', f'{transcripts / build_time:.0f}')
+    table.add_row('Tamaño en disco (MB)', f"{stats['bytes'] / 1e6:.1f}")
+    table.add_row('Bytes por token', f"{stats['bytes'] / max(1, stats['tokens']):.2f}")
+    table.add_row('Agregar 1 video (ms)', f'{add_time * 1000:.1f}')
+    table.add_row('Búsqueda mediana (ms)', f'{statistics.median(latencies) * 1000:.1f}')
+    table.add_row('Búsqueda p95 (ms)', f'{latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f}')
+    console.print(table)
+
+
+def _distribution(samples):
+    """Resumen de una lista de duraciones (segundos) en milisegundos."""
+    ms = sorted(s * 1000 for s in samples)
+    return {
+        'samples': len(ms),
+        'mean_ms': round(statistics.mean(ms), 3),
+        'median_ms': round(statistics.median(ms), 3),
+        'p95_ms': round(ms[max(0, int(len(ms) * 0.95 + 0.5) - 1)], 3),
+        'min_ms': round(ms[0], 3),
+    }
+
+
+def _git_commit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def _offline_extractor(fixture, backend, fake_executable, requests_per_second=10000, **options):
+    """Extractor sin caché ni salida por consola que consulta el YouTube simulado.
+
+    Con requests_per_second=None se usa la tasa por defecto del limitador.
+    """
+    from youtube_transcript_extractor import YouTubeTranscriptExtractor
+
+    extractor = YouTubeTranscriptExtractor(cache_path=None, requests_per_second=requests_per_second, **options)
+    extractor.console = Console(quiet=True)
+    extractor.OEMBED_URL = fixture.server.url('/oembed')
+    if backend == 'subprocess':
+        extractor.backend = SubprocessBackend(fake_executable, rate_limiter=extractor.rate_limiter)
+    else:
+        extractor.backend = FakeYtDlpBackend(fixture.base_url, rate_limiter=extractor.rate_limiter)
+    return extractor
+
+
+def bench_offline(videos, segments, jobs, repeat, latency, failure_rate, backend, page_mb,
+                  json_path=None, compare_path=None):
+    """Benchmarks de punta a punta contra un YouTube simulado (sin red).
+
+    Mide get_transcript (json3 y VTT), _process_vtt_transcript,
+    extract_youtube_urls y lotes completos de process_videos_from_urls, y
+    guarda los resultados en JSON para comparar entre versiones.
+    """
+    from yt_url_finder import extract_youtube_urls
+
+    results = {}
+    fixture = YouTubeFixture(videos=videos, segments=segments, latency=latency, failure_rate=failure_rate)
+    work_dir = tempfile.mkdtemp(prefix='bench_offline_')
+    previous_cwd = os.getcwd()
+    try:
+        with fixture:
+            fake_executable = write_fake_yt_dlp(work_dir, fixture.base_url)
+            urls = fixture.video_urls()
+
+            for caption_format in ('json3', 'vtt'):
+                samples = []
+                ok = 0
+                for _ in range(repeat):
+                    # Extractor nuevo en cada repetición: sin metadata ni títulos en memoria
+                    extractor = _offline_extractor(fixture, backend, fake_executable, caption_format=caption_format)
+                    for url in urls:
+                        start = time.perf_counter()
+                        transcript = extractor.get_transcript(url)
+                        samples.append(time.perf_counter() - start)
+                        ok += bool(transcript and transcript['segments'])
+                results[f'get_transcript_{caption_format}'] = dict(_distribution(samples), ok=ok)
+
+            extractor = _offline_extractor(fixture, backend, fake_executable)
+            vtt_texts = [synthetic_vtt(video_id, segments) for video_id in fixture.video_ids]
+            samples = []
+            for _ in range(repeat):
+                for text in vtt_texts:
+                    start = time.perf_counter()
+                    extractor._process_vtt_transcript(text, merge_rolling=True)
+                    samples.append(time.perf_counter() - start)
+            vtt_bytes = sum(len(text.encode('utf-8')) for text in vtt_texts)
+            results['process_vtt_transcript'] = dict(
+                _distribution(samples), mb_per_s=round(vtt_bytes * repeat / sum(samples) / 1024 ** 2, 2))
+
+            page_path = os.path.join(work_dir, 'canal.html')
+            write_synthetic_channel_page(page_path, page_mb)
+            with open(page_path, 'r', encoding='utf-8') as f:
+                html = f.read()
+            samples = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                found = extract_youtube_urls(html)
+                samples.append(time.perf_counter() - start)
+            results['extract_youtube_urls'] = dict(_distribution(samples), page_mb=page_mb, urls=len(found))
+
+            # Lotes completos: los archivos se escriben en transcripts/ dentro de la carpeta temporal
+            os.chdir(work_dir)
+            samples = []
+            ok = 0
+            for n in range(repeat):
+                extractor = _offline_extractor(fixture, backend, fake_executable, jobs=jobs)
+                start = time.perf_counter()
+                extractor.process_videos_from_urls(urls, f'lote_{n}')
+                samples.append(time.perf_counter() - start)
+                ok += len(os.listdir(os.path.join('transcripts', f'lote_{n}', 'transcripts_plain')))
+            results['process_videos_from_urls'] = dict(
+                _distribution(samples), videos=videos, jobs=jobs, ok=ok,
+                videos_per_s=round(videos * repeat / sum(samples), 2))
+
+            # El mismo lote con la tasa por defecto del limitador y con la pausa
+            # fija por video que había antes del limitador (sin limitador)
+            for name, rate, pause in (('process_videos_default_rate', None, 0.0),
+                                      ('process_videos_legacy_pause', 10000, LEGACY_VIDEO_PAUSE)):
+                extractor = _offline_extractor(fixture, backend, fake_executable, requests_per_second=rate, jobs=jobs)
+                if pause:
+                    run_video_worker = extractor._run_video_worker
+
+                    def paused_worker(*worker_args, run_video_worker=run_video_worker):
+                        result = run_video_worker(*worker_args)
+                        time.sleep(pause)
+                        return result
+
+                    extractor._run_video_worker = paused_worker
+                start = time.perf_counter()
+                extractor.process_videos_from_urls(urls, name)
+                elapsed = time.perf_counter() - start
+                results[name] = dict(
+                    _distribution([elapsed]), videos=videos, jobs=jobs,
+                    ok=len(os.listdir(os.path.join('transcripts', name, 'transcripts_plain'))),
+                    videos_per_s=round(videos / elapsed, 2),
+                    requests_per_second=extractor.rate_limiter.max_rate if rate is None else None)
+    finally:
+        os.chdir(previous_cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        'suite': 'offline',
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': {'videos': videos, 'segments': segments, 'jobs': jobs, 'repeat': repeat, 'latency': latency,
+                   'failure_rate': failure_rate, 'backend': backend, 'page_mb': page_mb},
+        'server': {'requests': fixture.server.requests, 'bytes_sent': fixture.server.bytes_sent},
+        'results': results,
+    }
+
+    baseline = {}
+    if compare_path:
+        with open(compare_path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f).get('results', {})
+
+    table = Table(title=f'Benchmarks sin conexión ({videos} videos x {segments} segmentos, backend {backend})',
+                  show_header=True, header_style='bold blue')
+    table.add_column('Medición', style='cyan', no_wrap=True)
+    table.add_column('Muestras', justify='right')
+    table.add_column('Mediana (ms)', justify='right')
+    table.add_column('p95 (ms)', justify='right')
+    table.add_column('Correctos', justify='right')
+    if baseline:
+        table.add_column('Mediana anterior (ms)', justify='right')
+        table.add_column('Cambio', justify='right')
+    for name, result in results.items():
+        row = [name, str(result['samples']), f"{result['median_ms']:.2f}", f"{result['p95_ms']:.2f}",
+               str(result.get('ok', '-'))]
+        if baseline:
+            before = baseline.get(name, {}).get('median_ms')
+            if before:
+                change = (result['median_ms'] - before) / before * 100
+                color = 'red' if change > 10 else 'green' if change < -10 else 'white'
+                row += [f'{before:.2f}', f'[{color}]{change:+.1f}%[/{color}]']
+            else:
+                row += ['-', '-']
+        table.add_row(*row)
+    console.print(table)
+    console.print(f"Lote: {results['process_videos_from_urls']['videos_per_s']} videos/s con {jobs} hilos sin límite, "
+                  f"{results['process_videos_default_rate']['videos_per_s']} con la tasa por defecto "
+                  f"({results['process_videos_default_rate']['requests_per_second']:g} pet/s), "
+                  f"{results['process_videos_legacy_pause']['videos_per_s']} con la pausa fija original • "
+                  f"VTT: {results['process_vtt_transcript']['mb_per_s']} MB/s • "
+                  f"Servidor: {fixture.server.requests} peticiones, {fixture.server.bytes_sent / 1024 ** 2:.1f} MB")
+
+    if json_path:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        console.print(f'[green]Resultados guardados en {json_path}[/green]')
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks de YouTube Transcript Extractor')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    backends_parser = subparsers.add_parser('backends', help='Compara los backends de yt-dlp')
+    backends_parser.add_argument('urls', nargs='+', help='URLs de videos de YouTube')
+    backends_parser.add_argument('--repeat', type=int, default=3, help='Repeticiones por URL')
+
+    vtt_parser = subparsers.add_parser('vtt', help='Compara el parser VTT con la implementación original')
+    vtt_parser.add_argument('path', nargs='?', help='Archivo VTT (por defecto se genera uno sintético)')
+    vtt_parser.add_argument('--size-mb', type=int, default=50, help='Tamaño del VTT sintético')
+
+    segments_parser = subparsers.add_parser('segments', help='Memoria de los segmentos de transcripción')
+    segments_parser.add_argument('--transcripts', type=int, default=200, help='Transcripciones del corpus')
+    segments_parser.add_argument('--segments', type=int, default=2000, help='Segmentos por transcripción')
+
+    ratelimit_parser = subparsers.add_parser('ratelimit', help='Limitador de peticiones frente a respuestas 429')
+    ratelimit_parser.add_argument('--requests', type=int, default=40, help='Peticiones a enviar')
+    ratelimit_parser.add_argument('--throttle', type=int, default=3, help='Respuestas 429 iniciales del servidor')
+    ratelimit_parser.add_argument('--jobs', type=int, default=4, help='Hilos concurrentes')
+    ratelimit_parser.add_argument('--rate', type=float, default=20.0, help='Peticiones por segundo configuradas')
+
+    titles_parser = subparsers.add_parser('titles', help='Bytes y tiempo para obtener el título de un video')
+    titles_parser.add_argument('--repeat', type=int, default=20, help='Repeticiones por método')
+    titles_parser.add_argument('--page-kb', type=int, default=600, help='Tamaño de la página sintética del video')
+
+    finder_parser = subparsers.add_parser('finder', help='Compara yt_url_finder con la implementación original')
+    finder_parser.add_argument('paths', nargs='*', help='Páginas HTML guardadas (por defecto se genera una sintética)')
+    finder_parser.add_argument('--size-mb', type=int, default=3, help='Tamaño de la página sintética')
+    finder_parser.add_argument('--no-legacy', action='store_true',
+                               help='No ejecutar la implementación original (lenta en archivos grandes)')
+
+    initialdata_parser = subparsers.add_parser('initialdata', help='Recorrido de ytInitialData frente a la versión original')
+    initialdata_parser.add_argument('paths', nargs='*', help='Páginas HTML guardadas (por defecto se genera una sintética)')
+    initialdata_parser.add_argument('--size-mb', type=int, default=1, help='Tamaño de la página sintética')
+
+    bundle_parser = subparsers.add_parser('bundle', help='Archivos .txt por video frente al almacén agrupado')
+    bundle_parser.add_argument('--videos', type=int, default=5000, help='Videos del lote')
+    bundle_parser.add_argument('--segments', type=int, default=300, help='Segmentos por video')
+
+    index_parser = subparsers.add_parser('index', help='Índice de texto completo sobre un corpus sintético')
+    index_parser.add_argument('--transcripts', type=int, default=10000, help='Transcripciones del corpus')
+    index_parser.add_argument('--segments', type=int, default=100, help='Segmentos por transcripción')
+    index_parser.add_argument('--queries', type=int, default=200, help='Consultas a medir')
+
+    ingest_parser = subparsers.add_parser('ingest', help='Lectura de listas de URLs enormes frente a la original')
+    ingest_parser.add_argument('path', nargs='?', help='Archivo de URLs (por defecto se genera uno sintético)')
+    ingest_parser.add_argument('--lines', type=int, default=2000000, help='Líneas de la lista sintética')
+    ingest_parser.add_argument('--unique', type=int, default=500000, help='Videos distintos de la lista sintética')
+
+    offline_parser = subparsers.add_parser('offline', help='get_transcript, VTT, buscador y lotes contra un YouTube simulado')
+    offline_parser.add_argument('--videos', type=int, default=40, help='Videos del YouTube simulado')
+    offline_parser.add_argument('--segments', type=int, default=300, help='Segmentos por subtítulo')
+    offline_parser.add_argument('--jobs', type=int, default=4, help='Hilos del lote')
+    offline_parser.add_argument('--repeat', type=int, default=3, help='Repeticiones de cada medición')
+    offline_parser.add_argument('--latency', type=float, default=0.01, help='Latencia del servidor por petición (s)')
+    offline_parser.add_argument('--failure-rate', type=float, default=0.0, help='Fracción de respuestas 500')
+    offline_parser.add_argument('--backend', choices=['fake', 'subprocess'], default='fake',
+                                help="'fake' en proceso o 'subprocess' con un ejecutable yt-dlp simulado")
+    offline_parser.add_argument('--page-mb', type=int, default=1, help='Tamaño de la página de canal sintética')
+    offline_parser.add_argument('--json', dest='json_path', help='Archivo donde guardar los resultados')
+    offline_parser.add_argument('--compare', help='Resultados JSON de una ejecución anterior')
+
+    args = parser.parse_args()
+    if args.command == 'backends':
+        bench_backends(args.urls, max(1, args.repeat))
+    elif args.command == 'vtt':
+        bench_vtt(args.path, args.size_mb)
+    elif args.command == 'segments':
+        bench_segments(args.transcripts, args.segments)
+    elif args.command == 'ratelimit':
+        bench_ratelimit(args.requests, args.throttle, max(1, args.jobs), args.rate)
+    elif args.command == 'titles':
+        bench_titles(max(1, args.repeat), args.page_kb)
+    elif args.command == 'finder':
+        bench_finder(args.paths, args.size_mb, legacy=not args.no_legacy)
+    elif args.command == 'initialdata':
+        bench_initialdata(args.paths, args.size_mb)
+    elif args.command == 'bundle':
+        bench_bundle(max(1, args.videos), args.segments)
+    elif args.command == 'index':
+        bench_index(max(1, args.transcripts), max(1, args.segments), max(1, args.queries))
+    elif args.command == 'ingest':
+        bench_ingest(args.path, max(1, args.lines), max(1, args.unique))
+    elif args.command == 'offline':
+        bench_offline(max(1, args.videos), max(1, args.segments), max(1, args.jobs), max(1, args.repeat),
+                      args.latency, args.failure_rate, args.backend, max(1, args.page_mb),
+                      json_path=args.json_path, compare_path=args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""
+Parsers de subtítulos.
+
+El parser VTT recorre el archivo línea a línea (sin cargarlo entero en memoria)
+y produce los segmentos de forma incremental con patrones precompilados.
+
+Los subtítulos automáticos de YouTube repiten cada línea en dos o tres cues
+consecutivos (el texto "sube" en pantalla). merge_rolling_cues colapsa esas
+repeticiones en segmentos sin solapamiento.
+
+El formato json3 de YouTube ya viene estructurado (eventos con tiempos en
+milisegundos y fragmentos de texto), así que parse_json3 no necesita limpiar
+tags con expresiones regulares.
+"""
+
+import re
+from typing import Iterable, Iterator, List, Tuple
+
+from transcript_segments import SegmentList
+
+# Línea de tiempo: 00:00:00.000 --> 00:00:03.000
+_TIMING_RE = re.compile(r'(\d{2}:\d{2}:\d{2}\.\d{3})\s*-->\s*(\d{2}:\d{2}:\d{2}\.\d{3})')
+# Tags de formato y timestamps en línea (<c>, </c>, <00:00:01.000>, ...)
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def vtt_time_to_seconds(time_str: str) -> float:
+    """Convierte tiempo VTT (HH:MM:SS.mmm) a segundos."""
+    hours = int(time_str[0:2])
+    minutes = int(time_str[3:5])
+    seconds = int(time_str[6:8])
+    milliseconds = int(time_str[9:12])
+    return hours * 3600 + minutes * 60 + seconds + milliseconds / 1000
+
+
+def iter_vtt_cues(lines: Iterable[str], spec_blank_lines: bool = False) -> Iterator[Tuple[str, float, float, List[str]]]:
+    """Recorre las líneas de un VTT y produce (inicio_vtt, inicio, fin, líneas_de_texto).
+
+    Las líneas de texto ya vienen sin tags. Acepta cualquier iterable de líneas,
+    por ejemplo un archivo abierto.
+
+    Con spec_blank_lines=True solo una línea realmente vacía cierra el cue, como
+    indica WebVTT; YouTube pone líneas con un solo espacio dentro de los cues
+    automáticos, que así se ignoran en lugar de cortar el texto.
+    """
+    cue = None
+    for raw_line in lines:
+        line = raw_line.strip()
+
+        if cue is not None:
+            if spec_blank_lines and not line and raw_line.strip('\r\n'):
+                continue
+            if line and '-->' not in line:
+                clean_text = _TAG_RE.sub('', line)
+                if clean_text:
+                    cue[3].append(clean_text)
+                continue
+            # Una línea vacía u otra línea de tiempo cierra el cue actual
+            yield cue
+            cue = None
+
+        if '-->' in line:
+            time_match = _TIMING_RE.match(line)
+            if time_match:
+                start_time = time_match.group(1)
+                cue = (start_time, vtt_time_to_seconds(start_time),
+                       vtt_time_to_seconds(time_match.group(2)), [])
+
+    if cue is not None:
+        yield cue
+
+
+def iter_vtt_segments(lines: Iterable[str]) -> Iterator[dict]:
+    """Produce los segmentos {'text', 'start', 'duration', 'start_formatted'} de un VTT."""
+    for start_time, start, end, text_lines in iter_vtt_cues(lines):
+        if not text_lines:
+            continue
+        text = ' '.join(text_lines).strip()
+        if text:
+            yield {
+                'text': text,
+                'start': start,
+                'duration': end - start,
+                'start_formatted': start_time
+            }
+
+
+def merge_rolling_cues(cues: Iterable[Tuple[str, float, float, List[str]]]) -> Iterator[dict]:
+    """Colapsa el texto repetido de los subtítulos automáticos ("rolling").
+
+    Cada cue repite al principio las últimas líneas ya mostradas; solo las
+    líneas nuevas generan un segmento, que empieza con el cue donde aparecen
+    por primera vez y termina donde empieza el siguiente. Es lineal en el
+    número de cues.
+    """
+    tail: List[str] = []
+    current = None
+
+    for start_time, start, end, text_lines in cues:
+        # Mayor prefijo del cue que coincide con el final de lo ya emitido
+        overlap = min(len(text_lines), len(tail))
+        while overlap and text_lines[:overlap] != tail[-overlap:]:
+            overlap -= 1
+        new_lines = text_lines[overlap:]
+
+        if not new_lines:
+            # Solo repetición: el segmento actual sigue en pantalla
+            if current is not None and end > current[2]:
+                current[2] = end
+            continue
+
+        if current is not None:
+            yield _merged_segment(current, min(current[2], start))
+        current = [start_time, start, end, ' '.join(new_lines).strip()]
+        tail = (tail + new_lines)[-3:]
+
+    if current is not None:
+        yield _merged_segment(current, current[2])
+
+
+def _merged_segment(current: list, end: float) -> dict:
+    start_time, start, _, text = current
+    return {
+        'text': text,
+        'start': start,
+        'duration': max(0.0, end - start),
+        'start_formatted': start_time
+    }
+
+
+def parse_vtt(lines: Iterable[str], merge_rolling: bool = False) -> dict:
+    """Procesa un VTT completo y devuelve {'segments', 'full_text'}.
+
+    Los segmentos se devuelven en un SegmentList compacto. Con
+    merge_rolling=True se eliminan las repeticiones de los subtítulos
+    automáticos de YouTube.
+    """
+    if merge_rolling:
+        source = merge_rolling_cues(iter_vtt_cues(lines, spec_blank_lines=True))
+    else:
+        source = iter_vtt_segments(lines)
+
+    segments = SegmentList()
+    for segment in source:
+        if segment['text']:
+            segments.append(segment['text'], segment['start'], segment['duration'])
+    return {
+        'segments': segments,
+        'full_text': ' '.join(segments.texts())
+    }
+
+
+def parse_json3(data: dict, merge_rolling: bool = False) -> dict:
+    """Procesa subtítulos en formato json3 y devuelve {'segments', 'full_text'}.
+
+    En los subtítulos automáticos cada evento sigue en pantalla mientras se
+    muestra el siguiente; con merge_rolling=True la duración de cada segmento
+    se recorta al inicio del siguiente para que no se solapen.
+    """
+    segments = SegmentList()
+    previous = None
+    for event in data.get('events', ()):
+        segs = event.get('segs')
+        if not segs:
+            # Eventos de definición de ventana, sin texto
+            continue
+        text = ' '.join(''.join(seg.get('utf8', '') for seg in segs).split())
+        if not text:
+            # Eventos "aAppend" que solo agregan un salto de línea
+            continue
+        start = event.get('tStartMs', 0) / 1000
+        duration = event.get('dDurationMs', 0) / 1000
+        if previous is not None:
+            segments.append(previous[0], previous[1],
+                            min(previous[2], start - previous[1]) if merge_rolling else previous[2])
+        previous = (text, start, duration)
+
+    if previous is not None:
+        segments.append(*previous)
+    return {
+        'segments': segments,
+        'full_text': ' '.join(segments.texts())
+    }
@@ -179,7 +179,6 @@ def main():
         ("pip install colorama>=0.4.4", "Instalando colorama (colores en terminal)"),
         ("pip install rich>=13.0.0", "Instalando rich (interfaz mejorada)"),
         ("pip install pytube", "Instalando pytube (para playlists)"),
-        ("pip install beautifulsoup4", "Instalando beautifulsoup4 (parser HTML)"),
     ]
     
     success_count = 0
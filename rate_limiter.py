@@ -0,0 +1,123 @@
+"""
+Limitador de peticiones compartido para todas las llamadas a YouTube.
+
+Es un token bucket con tasa adaptativa (AIMD): cada señal de bloqueo (HTTP 429,
+"Sign in to confirm you're not a bot", ...) reduce la tasa a la mitad y pausa
+todas las peticiones con un backoff exponencial; cada respuesta correcta la
+vuelve a subir poco a poco hasta la tasa configurada.
+"""
+
+import random
+import threading
+import time
+from typing import Optional
+
+# Textos que yt-dlp escribe en stderr (o en la excepción) cuando YouTube limita
+THROTTLE_MARKERS = (
+    'HTTP Error 429',
+    'Too Many Requests',
+    "Sign in to confirm you're not a bot",
+    'Sign in to confirm you’re not a bot',
+)
+
+# Códigos HTTP que indican limitación
+THROTTLE_STATUS = (429, 503)
+
+
+def is_throttle_text(text: Optional[str]) -> bool:
+    """Indica si un mensaje de error de yt-dlp corresponde a una limitación."""
+    return bool(text) and any(marker in text for marker in THROTTLE_MARKERS)
+
+
+def retry_after_seconds(response) -> Optional[float]:
+    """Lee la cabecera Retry-After (en segundos) de una respuesta HTTP."""
+    value = response.headers.get('Retry-After')
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class RateLimiter:
+    """Token bucket con backoff ante limitaciones, seguro entre hilos."""
+
+    def __init__(self, rate: float = 2.0, burst: int = 4, min_rate: float = 0.1,
+                 increase_step: float = 0.1, base_backoff: float = 2.0, max_backoff: float = 300.0,
+                 max_retries: int = 3):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.increase_step = increase_step
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.max_retries = max_retries
+
+        self.throttle_events = 0
+        self.retries = 0
+
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._consecutive = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Bloquea hasta que se pueda hacer una petición."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                else:
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def set_rate(self, rate: float, burst: Optional[int] = None):
+        """Cambia la tasa máxima. Si la tasa actual está reducida por limitaciones,
+        se escala en la misma proporción."""
+        rate = max(self.min_rate, rate)
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * rate / self.max_rate)
+            self.max_rate = rate
+            if burst is not None:
+                self.burst = burst
+
+    def report_throttle(self, retry_after: Optional[float] = None):
+        """Registra una limitación: baja la tasa y pausa todas las peticiones."""
+        with self._lock:
+            self.throttle_events += 1
+            self._consecutive += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            if retry_after is None:
+                backoff = min(self.max_backoff, self.base_backoff * 2 ** (self._consecutive - 1))
+                retry_after = backoff * random.uniform(0.8, 1.2)
+            else:
+                # Un Retry-After desmedido no puede frenar a todos por horas
+                retry_after = min(self.max_backoff, retry_after)
+            self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+            self._tokens = 0.0
+
+    def report_success(self):
+        """Registra una respuesta correcta: la tasa sube de forma gradual."""
+        with self._lock:
+            self._consecutive = 0
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def count_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def observe_response(self, response) -> bool:
+        """Actualiza el limitador según la respuesta. Retorna True si hubo limitación."""
+        if response.status_code in THROTTLE_STATUS:
+            self.report_throttle(retry_after_seconds(response))
+            return True
+        self.report_success()
+        return False
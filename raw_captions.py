@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Almacén de subtítulos sin procesar y reprocesamiento sin red.
+
+get_transcript descarga los subtítulos en un directorio temporal que se borra
+al terminar, así que un cambio en la limpieza de los VTT obligaba a descargar
+todo de nuevo. Aquí cada pista descargada (VTT o json3) se guarda tal como
+llegó, comprimida con gzip, en un archivo por video; un índice JSONL de
+solo-anexar guarda el idioma, el formato, si era automática y el título.
+El almacén no expulsa entradas, así que es opcional: se activa con
+--keep-raw (o raw_captions_path en YouTubeTranscriptExtractor).
+
+El comando reprocess vuelve a parsear todo el almacén con caption_parser en
+un pool de procesos (uno por núcleo) y regenera los .txt, sin red.
+
+Uso:
+    python raw_captions.py reprocess transcripts/mi_lote [--jobs N]
+    python raw_captions.py reprocess transcripts/reprocesado --all
+    python raw_captions.py info
+"""
+
+import argparse
+import gzip
+import io
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, Optional
+
+from batch_manifest import BatchManifest, MANIFEST_NAME, DONE, write_text_atomic
+from caption_parser import parse_json3, parse_vtt
+from transcript_segments import SegmentList, format_timestamped_text
+from transcript_store import STORE_NAME, TranscriptStore
+
+DEFAULT_RAW_PATH = os.path.join('.transcript_cache', 'raw_captions')
+INDEX_NAME = 'index.jsonl'
+
+FORMATS = ('vtt', 'json3')
+
+# Los archivos crudos comprimen muy bien (texto repetido de los automáticos);
+# el nivel 6 es el de gzip por defecto y casi igual de chico que el 9
+COMPRESS_LEVEL = 6
+
+
+class RawCaptionStore:
+    """Subtítulos tal como se descargaron, un .gz por video e idioma."""
+
+    def __init__(self, directory: str = DEFAULT_RAW_PATH):
+        self.directory = directory
+        self.index_path = os.path.join(directory, INDEX_NAME)
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._index_file = None
+
+    def path_for(self, video_id: str, language: str, fmt: str) -> str:
+        # Subcarpetas por las dos primeras letras del ID para no tener cientos
+        # de miles de archivos en un solo directorio
+        return os.path.join(self.directory, video_id[:2], f'{video_id}.{language}.{fmt}.gz')
+
+    def put(self, video_id: str, language: str, fmt: str, data: bytes, auto: bool = False,
+            title: Optional[str] = None, detected_language: Optional[str] = None):
+        """Guarda una pista descargada. data son los bytes sin procesar."""
+        if fmt not in FORMATS:
+            raise ValueError(f'Formato desconocido: {fmt}')
+        path = self.path_for(video_id, language, fmt)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(gzip.compress(data, COMPRESS_LEVEL))
+        os.replace(tmp_path, path)
+
+        # El índice se escribe después del archivo: nunca apunta a uno que no existe
+        entry = {
+            'video_id': video_id,
+            'language': language,
+            'format': fmt,
+            'auto': auto,
+            'title': title,
+            'detected_language': detected_language,
+            'file': os.path.relpath(path, self.directory),
+            'size': len(data),
+            'stored_at': round(time.time(), 3),
+        }
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        with self._lock:
+            if self._index_file is None:
+                self._index_file = open(self.index_path, 'a', encoding='utf-8')
+            self._index_file.write(line)
+            self._index_file.flush()
+
+    def entries(self) -> Dict[str, dict]:
+        """Última pista guardada de cada video (video_id -> entrada del índice)."""
+        entries = {}
+        if not os.path.exists(self.index_path):
+            return entries
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Línea truncada por una interrupción
+                    continue
+                entries[entry['video_id']] = entry
+        return entries
+
+    def close(self):
+        with self._lock:
+            if self._index_file is not None:
+                self._index_file.close()
+                self._index_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def parse_raw_caption(data: bytes, fmt: str, merge_rolling: bool = False) -> dict:
+    """Procesa una pista cruda con el mismo parser que usa get_transcript."""
+    if fmt == 'json3':
+        return parse_json3(json.loads(data.decode('utf-8')), merge_rolling=merge_rolling)
+    return parse_vtt(io.StringIO(data.decode('utf-8')), merge_rolling=merge_rolling)
+
+
+def _reprocess_one(task: tuple) -> tuple:
+    """Worker del pool: parsea un archivo y escribe los .txt (o devuelve las columnas).
+
+    Retorna (video_id, segmentos, bytes sin comprimir, columnas o None, error o None).
+    """
+    video_id, path, fmt, merge_rolling, timestamps_dir, plain_dir, filename = task[:7]
+    try:
+        with gzip.open(path, 'rb') as f:
+            data = f.read()
+        transcript = parse_raw_caption(data, fmt, merge_rolling)
+        segments = transcript['segments']
+        if timestamps_dir is None:
+            # Salida agrupada: el proceso principal escribe en el TranscriptStore
+            return video_id, len(segments), len(data), segments.to_columns(), None
+        write_text_atomic(os.path.join(timestamps_dir, f'{filename}.txt'), format_timestamped_text(segments))
+        write_text_atomic(os.path.join(plain_dir, f'{filename}.txt'), transcript['full_text'])
+        return video_id, len(segments), len(data), None, None
+    except Exception as e:
+        return video_id, 0, 0, None, str(e)
+
+
+def _iter_tasks(store: RawCaptionStore, entries: Dict[str, dict], output_dir: str, all_videos: bool,
+                dedupe: bool, bundle: bool, missing: list) -> Iterator[tuple]:
+    """Tareas del pool: las de los videos terminados del lote o, con all_videos, todo el almacén."""
+    if bundle:
+        timestamps_dir = plain_dir = None
+    else:
+        timestamps_dir = os.path.join(output_dir, 'transcripts_with_timestamps')
+        plain_dir = os.path.join(output_dir, 'transcripts_plain')
+        os.makedirs(timestamps_dir, exist_ok=True)
+        os.makedirs(plain_dir, exist_ok=True)
+
+    if all_videos:
+        files = {video_id: (f"{entry['title']}_{video_id}" if entry.get('title') else video_id, None)
+                 for video_id, entry in entries.items()}
+    else:
+        # Mismos nombres que en el lote original, según su manifiesto
+        manifest = BatchManifest(output_dir)
+        manifest.close()
+        files = {video_id: (entry.get('file') or video_id, entry.get('url'))
+                 for video_id, entry in manifest.entries.items() if entry['status'] == DONE}
+
+    for video_id, (filename, url) in files.items():
+        entry = entries.get(video_id)
+        if entry is None:
+            missing.append(video_id)
+            continue
+        yield (video_id, os.path.join(store.directory, entry['file']), entry['format'],
+               dedupe and entry.get('auto', False), timestamps_dir, plain_dir, filename, url)
+
+
+def reprocess(raw_dir: str, output_dir: str, jobs: Optional[int] = None, all_videos: bool = False,
+              dedupe: bool = True) -> dict:
+    """Regenera las transcripciones de output_dir a partir del almacén crudo.
+
+    Si output_dir es un lote agrupado (transcripts.jsonl) los resultados se
+    agregan a su TranscriptStore; si no, se escriben los dos .txt por video.
+    Retorna los conteos y el throughput en archivos/s.
+    """
+    store = RawCaptionStore(raw_dir)
+    entries = store.entries()
+    bundle = os.path.exists(os.path.join(output_dir, STORE_NAME))
+    missing = []
+    tasks = list(_iter_tasks(store, entries, output_dir, all_videos, dedupe, bundle, missing))
+    jobs = max(1, jobs or os.cpu_count() or 1)
+    # Los archivos son chicos: se mandan en tandas para no pagar un viaje
+    # entre procesos por cada uno
+    chunksize = max(1, min(64, len(tasks) // (jobs * 8)))
+
+    files = segments = raw_bytes = 0
+    errors = []
+    bundle_store = TranscriptStore(output_dir) if bundle else None
+    # video_id -> (nombre de archivo, URL) para los registros del almacén agrupado
+    names = {task[0]: task[6:] for task in tasks} if bundle else {}
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            for video_id, count, size, columns, error in executor.map(_reprocess_one, tasks, chunksize=chunksize):
+                if error is not None:
+                    errors.append((video_id, error))
+                    continue
+                files += 1
+                segments += count
+                raw_bytes += size
+                if bundle_store is not None:
+                    entry = entries[video_id]
+                    transcript = {
+                        'segments': SegmentList.from_columns(columns['start'], columns['duration'], columns['text']),
+                        'title': entry.get('title'),
+                        'selected_language': entry['language'],
+                    }
+                    filename, url = names[video_id]
+                    bundle_store.put(video_id, filename, transcript, url=url)
+    finally:
+        if bundle_store is not None:
+            bundle_store.close()
+    elapsed = time.perf_counter() - start
+
+    return {
+        'files': files,
+        'segments': segments,
+        'raw_mb': raw_bytes / (1024 * 1024),
+        'errors': errors,
+        'missing': missing,
+        'jobs': jobs,
+        'seconds': elapsed,
+        'files_per_second': files / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Subtítulos sin procesar y reprocesamiento sin red')
+    parser.add_argument('--raw', default=DEFAULT_RAW_PATH, help=f'Carpeta del almacén (por defecto {DEFAULT_RAW_PATH})')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    reprocess_parser = subparsers.add_parser('reprocess', help='Regenera las transcripciones desde el almacén')
+    reprocess_parser.add_argument('output', help='Carpeta del lote (por ejemplo transcripts/mi_lote)')
+    reprocess_parser.add_argument('--all', action='store_true',
+                                  help='Todos los videos del almacén, no solo los del manifiesto del lote')
+    reprocess_parser.add_argument('--jobs', type=int, help='Procesos (por defecto uno por núcleo)')
+    reprocess_parser.add_argument('--no-dedupe', action='store_true',
+                                  help='No colapsar las líneas repetidas de los subtítulos automáticos')
+
+    subparsers.add_parser('info', help='Resume el contenido del almacén')
+
+    args = parser.parse_args()
+    store = RawCaptionStore(args.raw)
+    if args.command == 'info':
+        entries = store.entries()
+        raw_bytes = sum(entry['size'] for entry in entries.values())
+        stored_bytes = sum(os.path.getsize(os.path.join(store.directory, entry['file']))
+                           for entry in entries.values()
+                           if os.path.exists(os.path.join(store.directory, entry['file'])))
+        print(f'Videos: {len(entries)}')
+        for fmt in FORMATS:
+            print(f'  {fmt}: {sum(1 for entry in entries.values() if entry["format"] == fmt)}')
+        ratio = raw_bytes / stored_bytes if stored_bytes else 0
+        print(f'Tamaño: {raw_bytes / (1024 * 1024):.1f} MB sin comprimir, '
+              f'{stored_bytes / (1024 * 1024):.1f} MB en disco ({ratio:.1f}x)')
+        return
+
+    if not args.all and not os.path.exists(os.path.join(args.output, MANIFEST_NAME)):
+        print(f"Error: {args.output} no es un lote (no tiene '{MANIFEST_NAME}'); usa --all para reprocesar todo el almacén")
+        sys.exit(1)
+
+    result = reprocess(args.raw, args.output, jobs=args.jobs, all_videos=args.all, dedupe=not args.no_dedupe)
+    print(f"Se reprocesaron {result['files']} archivos ({result['segments']} segmentos, "
+          f"{result['raw_mb']:.1f} MB) en {result['seconds']:.2f} s con {result['jobs']} procesos: "
+          f"{result['files_per_second']:.0f} archivos/s")
+    if result['missing']:
+        print(f"Sin subtítulos guardados: {len(result['missing'])} videos (descargados antes de tener el almacén)")
+    for video_id, error in result['errors'][:10]:
+        print(f'Error en {video_id}: {error}')
+    if len(result['errors']) > 10:
+        print(f"... y {len(result['errors']) - 10} errores más")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Grabación y reproducción de las interacciones con YouTube.
+
+En modo grabación cada respuesta HTTP de la sesión de requests (títulos,
+subtítulos json3) y cada resultado de yt-dlp (metadata, subtítulos VTT
+descargados, entradas de playlists) se guarda en un archivo JSONL comprimido
+con gzip. En modo reproducción se sirven las mismas respuestas, en el mismo
+orden y sin red, así que un lote completo se puede volver a ejecutar para
+perfilar la parte de CPU.
+
+Uso:
+    python replay.py record grabacion.jsonl.gz urls.txt [--jobs N]
+    python replay.py run grabacion.jsonl.gz urls.txt [--profile]
+    python replay.py info grabacion.jsonl.gz
+"""
+
+import argparse
+import base64
+import collections
+import glob
+import gzip
+import io
+import json
+import os
+import sys
+import threading
+import time
+from typing import Iterator, List, Optional
+
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+
+# Tasa del limitador al reproducir: no hay servidor al que cuidar
+REPLAY_RATE = 1e9
+
+# Cada cuánto se vuelca la grabación al disco (un flush de gzip deja lo
+# escrito legible aunque el proceso muera sin cerrar el archivo)
+RECORD_FLUSH_SECONDS = 1.0
+
+# Archivo gzip cortado o dañado (BadGzipFile no existe antes de Python 3.8)
+_GZIP_ERRORS = (EOFError, getattr(gzip, 'BadGzipFile', OSError))
+
+
+class ReplayArchive:
+    """Archivo de respuestas grabadas: una línea JSON por interacción.
+
+    Cada línea tiene 'kind' (http, extract_info, download_subtitles o
+    playlist), 'key' y el resultado. Al reproducir, las respuestas de una
+    misma clave se entregan en el orden en que se grabaron; cuando se agotan
+    se repite la última.
+    """
+
+    def __init__(self, path: str, mode: str = 'replay'):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f'Modo desconocido: {mode}')
+        self.path = path
+        self.mode = mode
+        self.recorded = 0
+        self.served = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._file = None
+        self._flushed_at = time.monotonic()
+        # La grabación se cortó sin cerrar el archivo (se leyó hasta ahí)
+        self.truncated = False
+
+        if mode == 'record':
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = gzip.open(path, 'wt', encoding='utf-8')
+        else:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                try:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            # Última línea truncada si la grabación se cortó
+                            continue
+                        key = (entry['kind'], entry['key'])
+                        self._entries.setdefault(key, collections.deque()).append(entry)
+                except _GZIP_ERRORS:
+                    # Grabación interrumpida: sin el final del gzip, se usa lo leído
+                    self.truncated = True
+
+    def record(self, kind: str, key: str, **data):
+        line = json.dumps(dict(data, kind=kind, key=key), ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + '\n')
+            self.recorded += 1
+            now = time.monotonic()
+            if now - self._flushed_at >= RECORD_FLUSH_SECONDS:
+                self._file.flush()
+                self._flushed_at = now
+
+    def next(self, kind: str, key: str) -> Optional[dict]:
+        """Siguiente respuesta grabada para la clave, o None si no hay ninguna."""
+        with self._lock:
+            entries = self._entries.get((kind, key))
+            if not entries:
+                self.misses += 1
+                return None
+            self.served += 1
+            return entries.popleft() if len(entries) > 1 else entries[0]
+
+    def counts(self) -> collections.Counter:
+        """Respuestas grabadas por tipo."""
+        counts = collections.Counter()
+        with self._lock:
+            for (kind, _), entries in self._entries.items():
+                counts[kind] += len(entries)
+        return counts
+
+    def close(self):
+        if self._file is not None:
+            with self._lock:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _encode_body(body: bytes) -> dict:
+    try:
+        return {'text': body.decode('utf-8')}
+    except UnicodeDecodeError:
+        return {'b64': base64.b64encode(body).decode('ascii')}
+
+
+def _decode_body(entry: dict) -> bytes:
+    if 'b64' in entry:
+        return base64.b64decode(entry['b64'])
+    return entry.get('text', '').encode('utf-8')
+
+
+def _request_key(request) -> str:
+    return f'{request.method} {request.url}'
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Adaptador de requests que guarda cada respuesta en el archivo.
+
+    Lee el cuerpo completo antes de devolverlo, así que las lecturas en
+    streaming (la página del video al buscar el título) se graban enteras.
+    """
+
+    def __init__(self, archive: ReplayArchive, **kwargs):
+        super().__init__(**kwargs)
+        self.archive = archive
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        body = response.content
+        self.archive.record('http', _request_key(request), status=response.status_code,
+                            reason=response.reason, headers=dict(response.headers), **_encode_body(body))
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Adaptador de requests que responde desde el archivo, sin red."""
+
+    def __init__(self, archive: ReplayArchive):
+        super().__init__()
+        self.archive = archive
+
+    def send(self, request, **kwargs):
+        key = _request_key(request)
+        entry = self.archive.next('http', key)
+        if entry is None:
+            raise RequestsConnectionError(f'Sin respuesta grabada para {key}', request=request)
+
+        response = Response()
+        response.status_code = entry['status']
+        response.reason = entry.get('reason')
+        response.headers = CaseInsensitiveDict(entry.get('headers') or {})
+        # El cuerpo va en raw para que funcionen tanto .content como iter_content
+        response.raw = io.BytesIO(_decode_body(entry))
+        response.url = request.url
+        response.request = request
+        response.encoding = None
+        return response
+
+    def close(self):
+        pass
+
+
+def install_adapter(session, adapter):
+    """Monta el adaptador en la sesión para http y https."""
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+
+class RecordingBackend:
+    """Envuelve un backend de yt_dlp_backend y graba cada resultado."""
+
+    def __init__(self, backend, archive: ReplayArchive):
+        self.backend = backend
+        self.archive = archive
+        self.name = f'record:{backend.name}'
+        self.rate_limiter = getattr(backend, 'rate_limiter', None)
+
+    def extract_info(self, video_url: str) -> Optional[dict]:
+        info = self.backend.extract_info(video_url)
+        self.archive.record('extract_info', video_url, result=info)
+        return info
+
+    def download_subtitles(self, video_url: str, languages: List[str], output_dir: str) -> bool:
+        ok = self.backend.download_subtitles(video_url, languages, output_dir)
+        files = {}
+        for path in glob.glob(os.path.join(output_dir, '*.vtt')):
+            with open(path, 'rb') as f:
+                files[os.path.basename(path)] = _encode_body(f.read())
+        self.archive.record('download_subtitles', _subtitles_key(video_url, languages), ok=ok, files=files)
+        return ok
+
+    def iter_playlist_entries(self, playlist_url: str) -> Iterator[dict]:
+        entries = []
+        error = None
+        try:
+            for entry in self.backend.iter_playlist_entries(playlist_url):
+                entries.append(entry)
+                yield entry
+        except RuntimeError as e:
+            error = str(e)
+            raise
+        finally:
+            # También si se deja de consumir el generador: se graba lo enumerado
+            self.archive.record('playlist', playlist_url, entries=entries, error=error)
+
+
+class ReplayBackend:
+    """Backend que responde desde el archivo, sin yt-dlp ni red."""
+
+    name = 'replay'
+
+    def __init__(self, archive: ReplayArchive, rate_limiter=None):
+        self.archive = archive
+        self.rate_limiter = rate_limiter
+
+    def extract_info(self, video_url: str) -> Optional[dict]:
+        entry = self.archive.next('extract_info', video_url)
+        return entry['result'] if entry else None
+
+    def download_subtitles(self, video_url: str, languages: List[str], output_dir: str) -> bool:
+        entry = self.archive.next('download_subtitles', _subtitles_key(video_url, languages))
+        if entry is None:
+            return False
+        for name, body in entry['files'].items():
+            with open(os.path.join(output_dir, os.path.basename(name)), 'wb') as f:
+                f.write(_decode_body(body))
+        return entry['ok']
+
+    def iter_playlist_entries(self, playlist_url: str) -> Iterator[dict]:
+        entry = self.archive.next('playlist', playlist_url)
+        if entry is None:
+            raise RuntimeError(f'Sin respuesta grabada para la playlist {playlist_url}')
+        for item in entry['entries']:
+            yield item
+        if entry.get('error'):
+            raise RuntimeError(entry['error'])
+
+
+def _subtitles_key(video_url: str, languages: List[str]) -> str:
+    return f"{video_url} {','.join(languages)}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Graba y reproduce las interacciones con YouTube')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    for command, help_text in (('record', 'Procesa un lote grabando todas las respuestas'),
+                               ('run', 'Vuelve a procesar un lote con las respuestas grabadas')):
+        command_parser = subparsers.add_parser(command, help=help_text)
+        command_parser.add_argument('archive', help='Archivo de la grabación (.jsonl.gz)')
+        command_parser.add_argument('urls', help='Archivo de URLs o URL de una playlist')
+        command_parser.add_argument('--jobs', type=int, default=1, help='Videos en paralelo')
+        command_parser.add_argument('--folder', help='Carpeta de salida dentro de transcripts/')
+    subparsers.choices['run'].add_argument('--profile', action='store_true',
+                                           help='Perfilar con cProfile y mostrar las funciones más costosas')
+
+    info_parser = subparsers.add_parser('info', help='Resume el contenido de una grabación')
+    info_parser.add_argument('archive', help='Archivo de la grabación (.jsonl.gz)')
+
+    args = parser.parse_args()
+    if args.command == 'info':
+        archive = ReplayArchive(args.archive)
+        for kind, count in sorted(archive.counts().items()):
+            print(f'{kind}: {count}')
+        print(f'Tamaño: {os.path.getsize(args.archive) / 1024:.1f} KB')
+        if archive.truncated:
+            print('La grabación se cortó sin cerrarse: se muestran las respuestas guardadas hasta ese punto')
+        return
+
+    from youtube_transcript_extractor import YouTubeTranscriptExtractor
+
+    options = {'record_path': args.archive} if args.command == 'record' else {'replay_path': args.archive}
+    extractor = YouTubeTranscriptExtractor(jobs=args.jobs, **options)
+    if os.path.exists(args.urls):
+        urls = extractor.read_urls_from_file(args.urls)
+    else:
+        urls = extractor.iter_playlist_urls(args.urls)
+    # Carpeta nueva por ejecución: el manifiesto de una anterior saltaría los videos ya hechos
+    folder = args.folder or f'{args.command}_{os.path.basename(args.archive).split(".")[0]}_{time.strftime("%Y%m%d_%H%M%S")}'
+
+    # Los videos se procesan en hilos del pool: se perfila cada llamada al
+    # worker por separado y al final se juntan las estadísticas
+    profiles = []
+    if getattr(args, 'profile', False):
+        import cProfile
+        run_video_worker = extractor._run_video_worker
+
+        def profiled_worker(*worker_args):
+            profile = cProfile.Profile()
+            profiles.append(profile)
+            return profile.runcall(run_video_worker, *worker_args)
+
+        extractor._run_video_worker = profiled_worker
+    start = time.perf_counter()
+    try:
+        extractor.process_videos_from_urls(urls, folder)
+    finally:
+        elapsed = time.perf_counter() - start
+        extractor.replay_archive.close()
+
+    archive = extractor.replay_archive
+    if args.command == 'record':
+        print(f'Se grabaron {archive.recorded} respuestas en {args.archive} '
+              f'({os.path.getsize(args.archive) / 1024:.1f} KB) en {elapsed:.2f} s')
+    else:
+        print(f'Se reprodujeron {archive.served} respuestas ({archive.misses} sin grabar) en {elapsed:.2f} s')
+    if profiles:
+        import pstats
+        pstats.Stats(*profiles, stream=sys.stdout).sort_stats('cumulative').print_stats(25)
+
+
+if __name__ == '__main__':
+    main()
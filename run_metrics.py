@@ -0,0 +1,197 @@
+"""
+Métricas de una ejecución: latencia por etapa de cada video, bytes descargados
+y reintentos.
+
+Cada etapa se mide con un context manager (dos llamadas a perf_counter y un
+append), así que se puede dejar activado siempre. Las etapas no se anidan:
+sumar las de un video no cuenta nada dos veces. 'video' es el total de cada
+video (incluye el tiempo fuera de las etapas) y no se suma con ellas. Al terminar el lote se
+escribe un reporte JSON con percentiles por etapa y el desglose por video, y
+un archivo de texto en el formato de Prometheus (para el textfile collector de
+node_exporter).
+"""
+
+import json
+import math
+import threading
+import time
+from typing import Dict, List, Optional
+
+from batch_manifest import write_text_atomic
+
+REPORT_NAME = 'run_report.json'
+PROMETHEUS_NAME = 'run_metrics.prom'
+
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+METRIC_PREFIX = 'youtube_transcript'
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Percentil por rango más cercano de una lista ya ordenada."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class _Stage:
+    """Context manager que mide una etapa y la registra al salir."""
+
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics: 'RunMetrics', name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class RunMetrics:
+    """Latencias por etapa y contadores de una ejecución, seguros entre hilos."""
+
+    def __init__(self):
+        self.started = time.time()
+        self._start = time.perf_counter()
+        # etapa -> duraciones en segundos
+        self._stages: Dict[str, List[float]] = {}
+        self._counters: Dict[str, float] = {}
+        # video_id -> {etapa: segundos acumulados}
+        self._videos: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def stage(self, name: str) -> _Stage:
+        """Mide el bloque como una ejecución de la etapa `name`:
+
+            with metrics.stage('vtt_parse'):
+                ...
+        """
+        return _Stage(self, name)
+
+    def video(self, video_id: str) -> '_Video':
+        """Asocia las etapas del hilo actual a un video y mide su tiempo total."""
+        return _Video(self, video_id)
+
+    def record(self, name: str, seconds: float):
+        video = getattr(self._local, 'video', None)
+        with self._lock:
+            samples = self._stages.get(name)
+            if samples is None:
+                samples = self._stages[name] = []
+            samples.append(seconds)
+            if video is not None:
+                video[name] = video.get(name, 0.0) + seconds
+
+    def count(self, name: str, value: float = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def counter(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def summary(self) -> Dict[str, dict]:
+        """Conteo, total, media, percentiles y máximo (en segundos) por etapa."""
+        with self._lock:
+            stages = {name: sorted(samples) for name, samples in self._stages.items()}
+        result = {}
+        for name, samples in stages.items():
+            total = sum(samples)
+            entry = {'count': len(samples), 'total': round(total, 6), 'mean': round(total / len(samples), 6)}
+            for q in QUANTILES:
+                entry[f'p{int(q * 100)}'] = round(percentile(samples, q), 6)
+            entry['max'] = round(samples[-1], 6)
+            result[name] = entry
+        return result
+
+    def report(self, **extra) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            videos = {video_id: {name: round(seconds, 6) for name, seconds in stages.items()}
+                      for video_id, stages in self._videos.items()}
+        report = {
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S%z', time.localtime(self.started)),
+            'duration': round(time.perf_counter() - self._start, 3),
+            'stages': self.summary(),
+            'counters': counters,
+            'videos': videos,
+        }
+        report.update(extra)
+        return report
+
+    def write_json(self, path: str, **extra) -> dict:
+        report = self.report(**extra)
+        write_text_atomic(path, json.dumps(report, indent=2, ensure_ascii=False) + '\n')
+        return report
+
+    def write_prometheus(self, path: str, labels: Optional[Dict[str, str]] = None):
+        """Escribe las métricas en el formato de texto de Prometheus.
+
+        El archivo se reemplaza de forma atómica para que node_exporter nunca
+        lea uno a medio escribir.
+        """
+        write_text_atomic(path, self.prometheus_text(labels))
+
+    def prometheus_text(self, labels: Optional[Dict[str, str]] = None) -> str:
+        base = ''.join(f',{key}="{_escape_label(value)}"' for key, value in sorted((labels or {}).items()))
+        plain = '{' + base[1:] + '}' if base else ''
+        stage_metric = f'{METRIC_PREFIX}_stage_seconds'
+        lines = [
+            f'# HELP {stage_metric} Latencia de cada etapa por video.',
+            f'# TYPE {stage_metric} summary',
+        ]
+        for name, entry in sorted(self.summary().items()):
+            stage_labels = f'stage="{_escape_label(name)}"{base}'
+            for q in QUANTILES:
+                lines.append(f'{stage_metric}{{{stage_labels},quantile="{q}"}} {entry[f"p{int(q * 100)}"]:.6f}')
+            lines.append(f'{stage_metric}_sum{{{stage_labels}}} {entry["total"]:.6f}')
+            lines.append(f'{stage_metric}_count{{{stage_labels}}} {entry["count"]}')
+
+        with self._lock:
+            counters = sorted(self._counters.items())
+        for name, value in counters:
+            metric = f'{METRIC_PREFIX}_{name}_total'
+            lines.append(f'# TYPE {metric} counter')
+            lines.append(f'{metric}{plain} {value:g}')
+
+        for name, value in (('run_duration_seconds', time.perf_counter() - self._start),
+                            ('run_start_timestamp_seconds', self.started)):
+            metric = f'{METRIC_PREFIX}_{name}'
+            lines.append(f'# TYPE {metric} gauge')
+            lines.append(f'{metric}{plain} {value:.3f}')
+        return '\n'.join(lines) + '\n'
+
+
+class _Video:
+    """Context manager de RunMetrics.video."""
+
+    __slots__ = ('metrics', 'video_id', 'start', 'previous')
+
+    def __init__(self, metrics: RunMetrics, video_id: str):
+        self.metrics = metrics
+        self.video_id = video_id
+
+    def __enter__(self):
+        metrics = self.metrics
+        with metrics._lock:
+            stages = metrics._videos.setdefault(self.video_id, {})
+        self.previous = getattr(metrics._local, 'video', None)
+        metrics._local.video = stages
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record('video', time.perf_counter() - self.start)
+        self.metrics._local.video = self.previous
+        return False
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -6,38 +6,88 @@ Verifica dependencias y lanza la aplicación con interfaz mejorada.
 
 import sys
 import os
-import subprocess
+import json
+import shutil
+import sysconfig
 import platform
+from importlib.util import find_spec
 
-def check_dependencies():
-    """Verifica si las dependencias están instaladas."""
-    required_packages = [
-        'yt-dlp',
-        'requests', 
-        'rich',
-        'colorama',
-        'pytube',
-        'beautifulsoup4'
-    ]
+# Resultado de la última verificación correcta de dependencias
+DEPENDENCY_CACHE_PATH = os.path.join('.transcript_cache', 'dependencies.json')
+
+# Módulo de Python que provee cada paquete
+REQUIRED_PACKAGES = {
+    'yt-dlp': 'yt_dlp',
+    'requests': 'requests',
+    'rich': 'rich',
+    'colorama': 'colorama',
+}
+
+# Paquetes que solo usan algunos scripts: si faltan se avisa pero se puede iniciar
+OPTIONAL_PACKAGES = {
+    'pytube': 'pytube',  # youtube_extractor_list.py
+}
+
+
+def _environment_key():
+    """Identifica el entorno: intérprete, carpetas de paquetes y PATH.
+    
+    Instalar o desinstalar un paquete modifica la fecha de la carpeta
+    site-packages, así que la clave cambia y la verificación se repite.
+    """
+    paths = sysconfig.get_paths()
+    site_dirs = {paths['purelib'], paths['platlib']}
+    # Con --system-site-packages también cuentan las carpetas del sistema
+    site_dirs.update(path for path in sys.path if path.endswith(('site-packages', 'dist-packages')))
+    site_dirs = sorted(site_dirs)
+    return {
+        'executable': sys.executable,
+        'version': sys.version,
+        'prefix': sys.prefix,
+        'site_packages': {path: os.stat(path).st_mtime_ns if os.path.isdir(path) else None for path in site_dirs},
+        'path': os.environ.get('PATH', ''),
+    }
+
+
+def _is_available(package, module):
+    # find_spec ubica el módulo sin importarlo
+    if find_spec(module) is not None:
+        return True
+    # yt-dlp también sirve instalado como comando (backend subprocess)
+    return package == 'yt-dlp' and shutil.which('yt-dlp') is not None
+
+
+def check_dependencies(use_cache=True):
+    """Verifica si las dependencias están instaladas.
+    
+    Retorna (faltantes, opcionales_faltantes). Una verificación sin faltantes
+    se guarda junto con la clave del entorno y no se repite mientras el
+    entorno no cambie.
+    """
+    key = _environment_key()
+    if use_cache:
+        try:
+            with open(DEPENDENCY_CACHE_PATH, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('key') == key:
+                return [], cached.get('missing_optional', [])
+        except (OSError, ValueError):
+            pass
     
-    missing_packages = []
+    missing_packages = [package for package, module in REQUIRED_PACKAGES.items()
+                        if not _is_available(package, module)]
+    missing_optional = [package for package, module in OPTIONAL_PACKAGES.items()
+                        if not _is_available(package, module)]
     
-    for package in required_packages:
+    if not missing_packages and use_cache:
         try:
-            if package == 'beautifulsoup4':
-                __import__('bs4')
-            elif package == 'yt-dlp':
-                # yt-dlp es un comando, verificar si está disponible
-                result = subprocess.run(['yt-dlp', '--version'], 
-                                      capture_output=True, text=True, timeout=5)
-                if result.returncode != 0:
-                    missing_packages.append(package)
-            else:
-                __import__(package)
-        except (ImportError, subprocess.TimeoutExpired, FileNotFoundError):
-            missing_packages.append(package)
+            os.makedirs(os.path.dirname(DEPENDENCY_CACHE_PATH), exist_ok=True)
+            with open(DEPENDENCY_CACHE_PATH, 'w', encoding='utf-8') as f:
+                json.dump({'key': key, 'missing_optional': missing_optional}, f)
+        except OSError:
+            pass
     
-    return missing_packages
+    return missing_packages, missing_optional
 
 def get_system_commands():
     """Obtiene comandos específicos del sistema."""
@@ -77,7 +127,7 @@ def main():
     print("✅ Entorno virtual activo")
     print("Verificando dependencias...")
     
-    missing = check_dependencies()
+    missing, missing_optional = check_dependencies()
     
     if missing:
         print(f"❌ Faltan dependencias: {', '.join(missing)}")
@@ -87,6 +137,8 @@ def main():
         return
     
     print("✅ Todas las dependencias están instaladas")
+    for package in missing_optional:
+        print(f"⚠️  {package} no está instalado (opcional, solo para youtube_extractor_list.py)")
     print("🚀 Iniciando YouTube Transcript Extractor...\n")
     
     # Importar y ejecutar la aplicación principal
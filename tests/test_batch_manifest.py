@@ -0,0 +1,23 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_manifest import BatchManifest, DONE, MANIFEST_NAME
+
+
+def test_partial_last_line_does_not_corrupt_the_next_mark(tmp_path):
+    manifest = BatchManifest(str(tmp_path))
+    manifest.mark('dQw4w9WgXcQ', DONE, file='001_a_dQw4w9WgXcQ')
+    manifest.close()
+    with open(os.path.join(str(tmp_path), MANIFEST_NAME), 'a', encoding='utf-8') as f:
+        f.write('{"video_id": "nfWlot6h_JM", "sta')
+
+    manifest = BatchManifest(str(tmp_path))
+    manifest.mark('nfWlot6h_JM', DONE, file='002_b_nfWlot6h_JM')
+    manifest.close()
+
+    manifest = BatchManifest(str(tmp_path))
+    manifest.close()
+    assert manifest.status('dQw4w9WgXcQ') == DONE
+    assert manifest.status('nfWlot6h_JM') == DONE
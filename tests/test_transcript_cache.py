@@ -0,0 +1,40 @@
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transcript_cache import TranscriptCache
+from transcript_segments import SegmentList
+
+TRANSCRIPT = {
+    'segments': SegmentList([{'start': 0.0, 'duration': 1.0, 'text': 'hola'}]),
+    'title': 'Mi video',
+    'detected_language': 'es',
+    'selected_language': 'es',
+}
+
+
+def test_entry_from_another_mode_is_a_miss(tmp_path):
+    cache = TranscriptCache(str(tmp_path / 'cache.sqlite3'))
+    cache.put('dQw4w9WgXcQ', TRANSCRIPT, mode='json3:dedupe')
+    assert cache.get('dQw4w9WgXcQ', mode='vtt:dedupe') is None
+    assert cache.get('dQw4w9WgXcQ', mode='json3:raw') is None
+    assert cache.get('dQw4w9WgXcQ', mode='json3:dedupe')['full_text'] == 'hola'
+    assert (cache.hits, cache.misses) == (1, 2)
+    cache.close()
+
+
+def test_cache_without_mode_column_is_migrated(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE transcripts (video_id TEXT NOT NULL, language TEXT NOT NULL, title TEXT, '
+                 'detected_language TEXT, payload BLOB NOT NULL, size INTEGER NOT NULL, created_at REAL NOT NULL, '
+                 'accessed_at REAL NOT NULL, PRIMARY KEY (video_id, language))')
+    conn.commit()
+    conn.close()
+
+    cache = TranscriptCache(path)
+    cache.put('dQw4w9WgXcQ', TRANSCRIPT, mode='json3:dedupe')
+    assert cache.get('dQw4w9WgXcQ', mode='json3:dedupe') is not None
+    cache.close()
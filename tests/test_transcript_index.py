@@ -0,0 +1,31 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transcript_index import iter_extracted_transcripts, parse_transcript_filename
+
+
+def test_parse_filename_with_underscore_in_id():
+    assert parse_transcript_filename('001_Mi video_ab_cd-EF12g') == ('ab_cd-EF12g', 'Mi video')
+
+
+def test_parse_filename_with_underscores_in_title():
+    assert parse_transcript_filename('1203_a_b_c_dQw4w9WgXcQ') == ('dQw4w9WgXcQ', 'a_b_c')
+
+
+def test_parse_filename_without_index_or_title():
+    assert parse_transcript_filename('Mi video_dQw4w9WgXcQ') == ('dQw4w9WgXcQ', 'Mi video')
+    assert parse_transcript_filename('_Sz2-p--ZcB') == ('_Sz2-p--ZcB', None)
+
+
+def test_iter_extracted_transcripts_reads_id_with_underscore(tmp_path):
+    directory = tmp_path / 'lote' / 'transcripts_with_timestamps'
+    directory.mkdir(parents=True)
+    (directory / '001_Mi video_ab_cd-EF12g.txt').write_text('[00:00:01.500] hola mundo\n', encoding='utf-8')
+
+    (video_id, segments, title), = iter_extracted_transcripts(str(tmp_path))
+
+    assert video_id == 'ab_cd-EF12g'
+    assert title == 'Mi video'
+    assert len(segments) == 1
@@ -0,0 +1,21 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from url_processor import IngestStats, VideoIdSet, iter_video_urls
+
+
+def test_non_ascii_id_is_invalid_and_does_not_stop_the_list():
+    stats = IngestStats()
+    lines = ['https://youtu.be/abcdéfghij0\n', 'https://youtu.be/dQw4w9WgXcQ\n']
+    assert list(iter_video_urls(lines, stats)) == ['https://www.youtube.com/watch?v=dQw4w9WgXcQ']
+    assert stats.invalid == 1
+
+
+def test_undecodable_id_goes_to_irregular_set():
+    seen = VideoIdSet()
+    assert seen.add('abcdéfghij0')
+    assert not seen.add('abcdéfghij0')
+    assert 'abcdéfghij0' in seen
+    assert seen.add('dQw4w9WgXcQ') and 'dQw4w9WgXcQ' in seen
@@ -0,0 +1,23 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from yt_url_finder import iter_video_ids_in_file
+
+ESCAPED_PAGE = '<script>var ytInitialData = {"url": "/watch?v\\u003dnfWlot6h_JM", "pad": "%s"};</script>'
+
+
+def test_initial_data_is_decoded_within_the_window(tmp_path):
+    path = tmp_path / 'page.html'
+    path.write_text(ESCAPED_PAGE % 'x')
+    assert list(iter_video_ids_in_file(str(path))) == ['nfWlot6h_JM']
+
+
+def test_oversized_or_unclosed_initial_data_is_skipped(tmp_path):
+    path = tmp_path / 'page.html'
+    path.write_text(ESCAPED_PAGE % ('x' * 4096) + '<a href="/watch?v=dQw4w9WgXcQ">')
+    assert list(iter_video_ids_in_file(str(path), max_initial_data=1024)) == ['dQw4w9WgXcQ']
+
+    path.write_text('<a href="/watch?v=dQw4w9WgXcQ"><script>var ytInitialData = {"url": "/watch?v\\u003dnfWlot6h_JM"')
+    assert list(iter_video_ids_in_file(str(path))) == ['dQw4w9WgXcQ']
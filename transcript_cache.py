@@ -0,0 +1,145 @@
+"""
+Caché persistente de transcripciones en SQLite.
+
+Cada entrada se identifica por (video_id, idioma seleccionado) y guarda los
+segmentos ya procesados comprimidos con zlib, junto con el título, el idioma
+detectado y el modo con que se procesaron (formato de subtítulos y limpieza de
+los automáticos): si el modo pedido es otro, la entrada cuenta como fallo. Las entradas expiran por antigüedad y, si la caché supera el
+tamaño máximo, se eliminan las usadas hace más tiempo.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Optional
+
+from transcript_segments import SegmentList
+
+DEFAULT_CACHE_PATH = os.path.join('.transcript_cache', 'transcripts.sqlite3')
+DEFAULT_MAX_AGE_DAYS = 30
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Cada cuántas escrituras se revisa la expulsión por tamaño/antigüedad
+EVICT_EVERY = 100
+
+
+class TranscriptCache:
+    """Caché de transcripciones con expulsión por antigüedad y tamaño."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_age = max_age_days * 24 * 3600
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS transcripts (
+                video_id TEXT NOT NULL,
+                language TEXT NOT NULL,
+                title TEXT,
+                detected_language TEXT,
+                payload BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                mode TEXT NOT NULL DEFAULT '',
+                PRIMARY KEY (video_id, language)
+            )
+        ''')
+        columns = [row[1] for row in self._conn.execute('PRAGMA table_info(transcripts)')]
+        if 'mode' not in columns:
+            # Cachés anteriores: sus entradas quedan con modo '' y no coinciden con ninguno
+            self._conn.execute("ALTER TABLE transcripts ADD COLUMN mode TEXT NOT NULL DEFAULT ''")
+        self._conn.commit()
+        self.evict()
+
+    def get(self, video_id: str, language: Optional[str] = None, mode: str = '') -> Optional[dict]:
+        """Devuelve la transcripción guardada o None.
+
+        Sin idioma se devuelve la entrada más reciente del video, que es la que
+        eligió la política de selección la última vez. Si se guardó con otro
+        modo de procesamiento se trata como un fallo de caché.
+        """
+        now = time.time()
+        with self._lock:
+            if language is None:
+                row = self._conn.execute(
+                    'SELECT language, title, detected_language, payload, created_at, mode FROM transcripts '
+                    'WHERE video_id = ? ORDER BY created_at DESC LIMIT 1', (video_id,)).fetchone()
+            else:
+                row = self._conn.execute(
+                    'SELECT language, title, detected_language, payload, created_at, mode FROM transcripts '
+                    'WHERE video_id = ? AND language = ?', (video_id, language)).fetchone()
+
+            if row is None or now - row[4] > self.max_age or row[5] != mode:
+                self.misses += 1
+                return None
+
+            self._conn.execute('UPDATE transcripts SET accessed_at = ? WHERE video_id = ? AND language = ?',
+                               (now, video_id, row[0]))
+            self._conn.commit()
+            self.hits += 1
+
+        data = json.loads(zlib.decompress(row[3]).decode('utf-8'))
+        if isinstance(data, dict):
+            segments = SegmentList.from_columns(data['start'], data['duration'], data['text'])
+        else:
+            # Entradas antiguas guardadas como lista de dicts
+            segments = SegmentList(data)
+        return {
+            'segments': segments,
+            'full_text': ' '.join(segments.texts()),
+            'title': row[1],
+            'detected_language': row[2],
+            'selected_language': row[0],
+        }
+
+    def put(self, video_id: str, transcript: dict, mode: str = ''):
+        """Guarda una transcripción procesada por get_transcript con el modo indicado."""
+        segments = transcript['segments']
+        if not isinstance(segments, SegmentList):
+            segments = SegmentList(segments)
+        payload = zlib.compress(json.dumps(segments.to_columns(), ensure_ascii=False).encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO transcripts (video_id, language, title, detected_language, payload, size, '
+                'created_at, accessed_at, mode) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (video_id, transcript.get('selected_language') or 'unknown', transcript.get('title'),
+                 transcript.get('detected_language'), payload, len(payload), now, now, mode))
+            self._conn.commit()
+            self._puts += 1
+            evict = self._puts % EVICT_EVERY == 0
+        if evict:
+            self.evict()
+
+    def evict(self):
+        """Elimina entradas vencidas y, si hace falta, las menos usadas hasta caber en max_bytes."""
+        with self._lock:
+            self._conn.execute('DELETE FROM transcripts WHERE created_at < ?', (time.time() - self.max_age,))
+            total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM transcripts').fetchone()[0]
+            if total > self.max_bytes:
+                rows = self._conn.execute(
+                    'SELECT video_id, language, size FROM transcripts ORDER BY accessed_at').fetchall()
+                for video_id, language, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    self._conn.execute('DELETE FROM transcripts WHERE video_id = ? AND language = ?',
+                                       (video_id, language))
+                    total -= size
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Índice invertido de texto completo sobre las transcripciones extraídas.
+
+Para cada término se guarda una lista de postings (video, frecuencia, inicios
+de los segmentos donde aparece). Los términos se guardan una vez en un
+diccionario y las postings usan su ID numérico; los inicios se guardan en
+milisegundos como diferencias codificadas en varint, así que una posting ocupa
+pocos bytes. El índice vive en SQLite y se actualiza de a un video: volver a
+agregar un video reemplaza sus postings.
+
+Las búsquedas se ordenan con BM25 por video y cada resultado trae los
+momentos exactos (ms) donde aparecen los términos, con un enlace directo.
+
+Uso:
+    python transcript_index.py build transcripts/
+    python transcript_index.py search "redes neuronales" [-n 10]
+    python transcript_index.py stats
+"""
+
+import argparse
+import heapq
+import json
+import math
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from transcript_segments import SegmentList
+
+DEFAULT_INDEX_PATH = os.path.join('.transcript_cache', 'index.sqlite3')
+
+# Parámetros de BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Momentos que se muestran por video en los resultados
+HITS_PER_VIDEO = 3
+
+_TOKEN_RE = re.compile(r'\w\w+')
+_TIMESTAMP_LINE_RE = re.compile(r'^\[(\d{2}):(\d{2}):(\d{2})\.(\d{3})\] (.*)$')
+
+
+def tokenize(text: str) -> List[str]:
+    """Términos en minúsculas y sin acentos (de al menos dos caracteres)."""
+    text = text.lower()
+    try:
+        text.encode('ascii')
+    except UnicodeEncodeError:
+        text = ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+    return _TOKEN_RE.findall(text)
+
+
+def encode_positions(values: Iterable[int]) -> bytes:
+    """Codifica enteros crecientes como diferencias en varint."""
+    out = bytearray()
+    previous = 0
+    for value in values:
+        delta = value - previous
+        previous = value
+        while delta >= 0x80:
+            out.append((delta & 0x7F) | 0x80)
+            delta >>= 7
+        out.append(delta)
+    return bytes(out)
+
+
+def decode_positions(data: bytes) -> List[int]:
+    values = []
+    current = 0
+    delta = 0
+    shift = 0
+    for byte in data:
+        delta |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            current += delta
+            values.append(current)
+            delta = 0
+            shift = 0
+    return values
+
+
+def deep_link(video_id: str, start_ms: int) -> str:
+    return f'https://www.youtube.com/watch?v={video_id}&t={start_ms // 1000}s'
+
+
+class TranscriptIndex:
+    """Índice invertido en SQLite, seguro entre hilos."""
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        # término -> term_id (se carga al agregar el primer video)
+        self._term_ids: Optional[Dict[str, int]] = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS terms (
+                term_id INTEGER PRIMARY KEY,
+                term TEXT NOT NULL UNIQUE
+            );
+            CREATE TABLE IF NOT EXISTS videos (
+                doc INTEGER PRIMARY KEY,
+                video_id TEXT NOT NULL UNIQUE,
+                title TEXT,
+                length INTEGER NOT NULL,
+                terms BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                term_id INTEGER NOT NULL,
+                doc INTEGER NOT NULL,
+                tf INTEGER NOT NULL,
+                positions BLOB NOT NULL,
+                PRIMARY KEY (term_id, doc)
+            ) WITHOUT ROWID;
+        ''')
+        self._conn.commit()
+
+    def add(self, video_id: str, segments, title: Optional[str] = None):
+        """Agrega (o reemplaza) un video y hace commit."""
+        with self._lock:
+            self._add(video_id, segments, title)
+            self._conn.commit()
+
+    def add_many(self, videos: Iterable[Tuple[str, object, Optional[str]]]) -> int:
+        """Agrega muchos videos (video_id, segmentos, título) en una sola transacción."""
+        count = 0
+        with self._lock:
+            for video_id, segments, title in videos:
+                self._add(video_id, segments, title)
+                count += 1
+            self._conn.commit()
+        return count
+
+    def _add(self, video_id: str, segments, title: Optional[str]):
+        if not isinstance(segments, SegmentList):
+            segments = SegmentList(segments)
+
+        # término -> [frecuencia, inicios en ms (crecientes, sin repetir)]
+        terms: Dict[str, list] = {}
+        length = 0
+        for start, _, text in segments.rows():
+            start_ms = int(round(start * 1000))
+            for term in tokenize(text):
+                length += 1
+                entry = terms.get(term)
+                if entry is None:
+                    terms[term] = [1, [start_ms]]
+                else:
+                    entry[0] += 1
+                    if entry[1][-1] != start_ms:
+                        entry[1].append(start_ms)
+
+        term_ids = self._get_term_ids()
+        postings = []
+        for term, (tf, starts) in terms.items():
+            term_id = term_ids.get(term)
+            if term_id is None:
+                term_id = self._conn.execute('INSERT INTO terms (term) VALUES (?)', (term,)).lastrowid
+                term_ids[term] = term_id
+            postings.append((term_id, tf, encode_positions(sorted(starts))))
+        postings.sort()
+        # Los term_id del video permiten borrar sus postings por clave primaria
+        doc_terms = encode_positions(term_id for term_id, _, _ in postings)
+
+        row = self._conn.execute('SELECT doc, terms FROM videos WHERE video_id = ?', (video_id,)).fetchone()
+        if row is not None:
+            doc = row[0]
+            self._conn.executemany('DELETE FROM postings WHERE term_id = ? AND doc = ?',
+                                   ((term_id, doc) for term_id in decode_positions(row[1])))
+            self._conn.execute('UPDATE videos SET title = ?, length = ?, terms = ? WHERE doc = ?',
+                               (title, length, doc_terms, doc))
+        else:
+            doc = self._conn.execute('INSERT INTO videos (video_id, title, length, terms) VALUES (?, ?, ?, ?)',
+                                     (video_id, title, length, doc_terms)).lastrowid
+        self._conn.executemany('INSERT INTO postings VALUES (?, ?, ?, ?)',
+                               ((term_id, doc, tf, positions) for term_id, tf, positions in postings))
+
+    def _get_term_ids(self) -> Dict[str, int]:
+        if self._term_ids is None:
+            self._term_ids = dict(self._conn.execute('SELECT term, term_id FROM terms'))
+        return self._term_ids
+
+    def __contains__(self, video_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute('SELECT 1 FROM videos WHERE video_id = ?', (video_id,)).fetchone() is not None
+
+    def stats(self) -> dict:
+        with self._lock:
+            videos, total_length = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(length), 0) FROM videos').fetchone()
+            terms = self._conn.execute('SELECT COUNT(*) FROM terms').fetchone()[0]
+            postings = self._conn.execute('SELECT COUNT(*) FROM postings').fetchone()[0]
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        return {'videos': videos, 'tokens': total_length, 'terms': terms, 'postings': postings, 'bytes': size}
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        """Busca los términos de la consulta y devuelve los videos mejor puntuados.
+
+        Cada resultado es {'video_id', 'title', 'score', 'hits'}, con hits como
+        [{'start_ms', 'terms', 'url'}] ordenados por cantidad de términos y tiempo.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        with self._lock:
+            videos, total_length = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(length), 0) FROM videos').fetchone()
+            if not videos:
+                return []
+            average_length = total_length / videos
+
+            scores: Dict[int, float] = {}
+            matched: Dict[int, Dict[str, bytes]] = {}
+            lengths: Dict[int, int] = {}
+            for term in terms:
+                rows = self._conn.execute(
+                    'SELECT p.doc, p.tf, p.positions, v.length FROM terms t '
+                    'JOIN postings p ON p.term_id = t.term_id JOIN videos v ON v.doc = p.doc '
+                    'WHERE t.term = ?', (term,)).fetchall()
+                if not rows:
+                    continue
+                idf = math.log(1 + (videos - len(rows) + 0.5) / (len(rows) + 0.5))
+                for doc, tf, positions, length in rows:
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+                    scores[doc] = scores.get(doc, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+                    matched.setdefault(doc, {})[term] = positions
+                    lengths[doc] = length
+
+            top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            titles = {}
+            for doc, _ in top:
+                titles[doc] = self._conn.execute(
+                    'SELECT video_id, title FROM videos WHERE doc = ?', (doc,)).fetchone()
+
+        results = []
+        for doc, score in top:
+            video_id, title = titles[doc]
+            # Segmento -> términos de la consulta que contiene
+            moments: Dict[int, int] = {}
+            for positions in matched[doc].values():
+                for start_ms in decode_positions(positions):
+                    moments[start_ms] = moments.get(start_ms, 0) + 1
+            best = sorted(moments.items(), key=lambda item: (-item[1], item[0]))[:HITS_PER_VIDEO]
+            results.append({
+                'video_id': video_id,
+                'title': title,
+                'score': score,
+                'hits': [{'start_ms': start_ms, 'terms': count, 'url': deep_link(video_id, start_ms)}
+                         for start_ms, count in best],
+            })
+        return results
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _read_timestamped_file(path: str) -> SegmentList:
+    """Lee un .txt de transcripts_with_timestamps ("[HH:MM:SS.mmm] texto" por línea)."""
+    segments = SegmentList()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            match = _TIMESTAMP_LINE_RE.match(line.rstrip('\n'))
+            if match:
+                hours, minutes, seconds, ms, text = match.groups()
+                start = int(hours) * 3600 + int(minutes) * 60 + int(seconds) + int(ms) / 1000
+                segments.append(text, start, 0.0)
+    return segments
+
+
+def parse_transcript_filename(stem: str) -> Tuple[str, Optional[str]]:
+    """(video_id, título) de un nombre {idx:03d}_{título}_{video_id} (sin .txt).
+
+    Los IDs de YouTube pueden tener '_', así que no se puede partir por el
+    último '_': el ID son siempre los últimos 11 caracteres.
+    """
+    if len(stem) < 12 or stem[-12] != '_':
+        # Sin título: el nombre es solo el ID
+        return stem, None
+    video_id = stem[-11:]
+    prefix = stem[:-12]
+    idx, sep, title = prefix.partition('_')
+    if not sep or not idx.isdigit():
+        # {título}_{video_id}, como los de raw_captions.py reprocess --all
+        title = prefix
+    return video_id, title or None
+
+
+def iter_extracted_transcripts(root: str) -> Iterator[Tuple[str, SegmentList, Optional[str]]]:
+    """Recorre una carpeta de salida y genera (video_id, segmentos, título).
+
+    Lee tanto los lotes en .txt (transcripts_with_timestamps) como los
+    almacenes agrupados (transcripts.jsonl).
+    """
+    from transcript_store import STORE_NAME, TranscriptStore
+
+    for directory, subdirs, files in os.walk(root):
+        subdirs.sort()
+        if STORE_NAME in files:
+            with TranscriptStore(directory) as store:
+                for video_id in store.video_ids():
+                    record = store.get(video_id)
+                    yield video_id, record['segments'], record['title']
+        if os.path.basename(directory) == 'transcripts_with_timestamps':
+            for name in sorted(files):
+                if not name.endswith('.txt'):
+                    continue
+                video_id, title = parse_transcript_filename(name[:-4])
+                yield video_id, _read_timestamped_file(os.path.join(directory, name)), title
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Índice de texto completo de las transcripciones')
+    parser.add_argument('--index', default=DEFAULT_INDEX_PATH, help='Ruta del índice SQLite')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    build_parser = subparsers.add_parser('build', help='Indexa las transcripciones de una carpeta')
+    build_parser.add_argument('root', nargs='?', default='transcripts', help='Carpeta de salida (por defecto transcripts)')
+
+    search_parser = subparsers.add_parser('search', help='Busca en las transcripciones')
+    search_parser.add_argument('query', help='Texto a buscar')
+    search_parser.add_argument('-n', '--limit', type=int, default=10, help='Cantidad de videos')
+    search_parser.add_argument('--json', action='store_true', help='Resultados en JSON')
+
+    subparsers.add_parser('stats', help='Tamaño del índice')
+
+    args = parser.parse_args()
+    index = TranscriptIndex(args.index)
+    try:
+        if args.command == 'build':
+            if not os.path.isdir(args.root):
+                print(f"Error: No se encontró la carpeta '{args.root}'")
+                sys.exit(1)
+            start = time.perf_counter()
+            count = index.add_many(iter_extracted_transcripts(args.root))
+            elapsed = time.perf_counter() - start
+            print(f'Se indexaron {count} transcripciones en {elapsed:.2f} s')
+        elif args.command == 'search':
+            start = time.perf_counter()
+            results = index.search(args.query, args.limit)
+            elapsed = time.perf_counter() - start
+            if args.json:
+                print(json.dumps(results, ensure_ascii=False, indent=2))
+                return
+            if not results:
+                print('Sin resultados')
+            for position, result in enumerate(results, 1):
+                print(f"{position}. {result['title'] or result['video_id']} (puntaje {result['score']:.2f})")
+                for hit in result['hits']:
+                    print(f"   {hit['start_ms']:>10} ms  {hit['url']}")
+            print(f'\n{len(results)} resultados en {elapsed * 1000:.1f} ms')
+        elif args.command == 'stats':
+            stats = index.stats()
+            print(f"Videos: {stats['videos']}  Términos: {stats['terms']}  Postings: {stats['postings']}  "
+                  f"Tokens: {stats['tokens']}  Tamaño: {stats['bytes'] / (1024 * 1024):.1f} MB")
+    finally:
+        index.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Contenedor compacto de segmentos de una transcripción.
+
+En lugar de un dict por segmento, los inicios y duraciones se guardan en
+arrays de floats y todos los textos en un solo buffer con offsets. El
+formato "HH:MM:SS.mmm" de cada inicio se calcula al leerlo.
+
+Al iterarlo se siguen obteniendo dicts {'text', 'start', 'duration',
+'start_formatted'}, así que el código existente funciona sin cambios.
+"""
+
+from array import array
+from typing import Iterable, Iterator, List, Tuple
+
+
+def format_vtt_time(seconds: float) -> str:
+    """Convierte segundos al formato de tiempo VTT (HH:MM:SS.mmm)."""
+    total_ms = int(round(seconds * 1000))
+    hours, rest = divmod(total_ms, 3600000)
+    minutes, rest = divmod(rest, 60000)
+    secs, ms = divmod(rest, 1000)
+    return f'{hours:02d}:{minutes:02d}:{secs:02d}.{ms:03d}'
+
+
+def format_timestamped_text(segments: 'SegmentList') -> str:
+    """Texto con una línea "[HH:MM:SS.mmm] texto" por segmento."""
+    return ''.join(f'[{format_vtt_time(start)}] {text}\n' for start, _, text in segments.rows())
+
+
+class SegmentList:
+    """Lista de segmentos almacenada en columnas."""
+
+    __slots__ = ('_starts', '_durations', '_ends', '_buffer', '_pending')
+
+    def __init__(self, segments: Iterable[dict] = ()):
+        self._starts = array('d')
+        self._durations = array('d')
+        # Offset final de cada texto dentro de _buffer
+        self._ends = array('q')
+        self._buffer = ''
+        # Textos agregados que todavía no se unieron al buffer
+        self._pending: List[str] = []
+        for segment in segments:
+            self.append(segment['text'], segment['start'], segment['duration'])
+
+    @classmethod
+    def from_columns(cls, starts: Iterable[float], durations: Iterable[float], texts: Iterable[str]) -> 'SegmentList':
+        segments = cls()
+        for text, start, duration in zip(texts, starts, durations):
+            segments.append(text, start, duration)
+        return segments
+
+    def append(self, text: str, start: float, duration: float):
+        offset = self._ends[-1] if self._ends else 0
+        self._ends.append(offset + len(text))
+        self._starts.append(start)
+        self._durations.append(duration)
+        self._pending.append(text)
+
+    def _flush(self):
+        if self._pending:
+            self._buffer += ''.join(self._pending)
+            self._pending = []
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def text(self, index: int) -> str:
+        self._flush()
+        begin = self._ends[index - 1] if index > 0 else 0
+        return self._buffer[begin:self._ends[index]]
+
+    def rows(self) -> Iterator[Tuple[float, float, str]]:
+        """Itera (inicio, duración, texto) sin crear dicts."""
+        self._flush()
+        buffer = self._buffer
+        begin = 0
+        for start, duration, end in zip(self._starts, self._durations, self._ends):
+            yield start, duration, buffer[begin:end]
+            begin = end
+
+    def texts(self) -> Iterator[str]:
+        for _, _, text in self.rows():
+            yield text
+
+    def __getitem__(self, index: int) -> dict:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('segment index out of range')
+        start = self._starts[index]
+        return {
+            'text': self.text(index),
+            'start': start,
+            'duration': self._durations[index],
+            'start_formatted': format_vtt_time(start)
+        }
+
+    def __iter__(self) -> Iterator[dict]:
+        for start, duration, text in self.rows():
+            yield {
+                'text': text,
+                'start': start,
+                'duration': duration,
+                'start_formatted': format_vtt_time(start)
+            }
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, SegmentList):
+            return list(self.rows()) == list(other.rows())
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    def to_columns(self) -> dict:
+        """Representación serializable en JSON ({'start', 'duration', 'text'})."""
+        return {
+            'start': self._starts.tolist(),
+            'duration': self._durations.tolist(),
+            'text': list(self.texts())
+        }
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Almacén agrupado de transcripciones para lotes grandes.
+
+En lugar de dos archivos .txt por video, todas las transcripciones de un lote
+se anexan a un solo archivo JSONL (una línea por video) y un índice aparte
+guarda, para cada ID, la posición y longitud de su línea. Así se puede leer
+cualquier video sin recorrer el archivo completo.
+
+La serialización y la escritura las hace un hilo en segundo plano, de modo que
+los hilos de extracción solo encolan. Si el proceso se corta, al abrir el
+almacén se descarta la última línea incompleta y el índice se reconstruye a
+partir de los datos.
+
+Uso:
+    python transcript_store.py export transcripts/mi_lote
+    python transcript_store.py get transcripts/mi_lote VIDEO_ID
+"""
+
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+from typing import Iterator, Optional
+
+from batch_manifest import write_text_atomic
+from transcript_segments import SegmentList, format_timestamped_text
+
+STORE_NAME = 'transcripts.jsonl'
+INDEX_NAME = 'transcripts.idx'
+
+_STOP = object()
+
+
+class TranscriptStore:
+    """Archivo JSONL de solo-anexar con índice por ID de video."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path = os.path.join(directory, STORE_NAME)
+        self.index_path = os.path.join(directory, INDEX_NAME)
+        os.makedirs(directory, exist_ok=True)
+
+        # video_id -> (offset, longitud) de su última línea en el archivo de datos
+        self._index = {}
+        # Registros encolados que el hilo escritor todavía no escribió
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._error = None
+
+        self._recover()
+        self._data = open(self.path, 'ab')
+        self._index_file = open(self.index_path, 'a', encoding='utf-8')
+        self._reader = open(self.path, 'rb')
+        self._read_lock = threading.Lock()
+
+        self._queue = queue.Queue(maxsize=1024)
+        self._writer = threading.Thread(target=self._write_loop, name='transcript-store-writer', daemon=True)
+        self._writer.start()
+
+    def _recover(self):
+        """Carga el índice y lo completa con las líneas que no llegaron a indexarse."""
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    parts = line.rstrip('\n').split('\t')
+                    if len(parts) != 3 or not line.endswith('\n'):
+                        continue
+                    video_id, offset, length = parts[0], int(parts[1]), int(parts[2])
+                    if offset + length <= size:
+                        self._index[video_id] = (offset, length)
+
+        indexed_end = max((offset + length + 1 for offset, length in self._index.values()), default=0)
+        if indexed_end >= size:
+            return
+
+        # Líneas escritas después de la última entrada del índice
+        added = []
+        valid_end = indexed_end
+        with open(self.path, 'rb') as f:
+            f.seek(indexed_end)
+            offset = indexed_end
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    video_id = json.loads(line)['video_id']
+                except (ValueError, KeyError):
+                    video_id = None
+                if video_id:
+                    self._index[video_id] = (offset, len(line) - 1)
+                    added.append((video_id, offset, len(line) - 1))
+                offset += len(line)
+                valid_end = offset
+
+        if valid_end < size:
+            # Línea truncada por una interrupción
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_end)
+        if added:
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.writelines(f'{video_id}\t{offset}\t{length}\n' for video_id, offset, length in added)
+
+    def put(self, video_id: str, filename: str, transcript: dict, url: Optional[str] = None):
+        """Encola una transcripción procesada por get_transcript."""
+        self._raise_writer_error()
+        segments = transcript['segments']
+        if not isinstance(segments, SegmentList):
+            segments = SegmentList(segments)
+        record = {
+            'video_id': video_id,
+            'file': filename,
+            'url': url,
+            'title': transcript.get('title'),
+            'language': transcript.get('selected_language'),
+            'segments': segments,
+        }
+        with self._lock:
+            self._pending[video_id] = record
+        self._queue.put(record)
+
+    def _write_loop(self):
+        while True:
+            record = self._queue.get()
+            try:
+                if record is _STOP:
+                    return
+                self._write(record)
+                if self._queue.empty():
+                    self._data.flush()
+                    self._index_file.flush()
+            except Exception as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _write(self, record: dict):
+        serializable = dict(record, segments=record['segments'].to_columns())
+        line = json.dumps(serializable, ensure_ascii=False).encode('utf-8')
+        offset = self._data.tell()
+        self._data.write(line + b'\n')
+        # El índice se escribe después de los datos: una entrada del índice
+        # nunca apunta a una línea que no existe
+        self._data.flush()
+        self._index_file.write(f"{record['video_id']}\t{offset}\t{len(line)}\n")
+        with self._lock:
+            self._index[record['video_id']] = (offset, len(line))
+            if self._pending.get(record['video_id']) is record:
+                del self._pending[record['video_id']]
+
+    def _raise_writer_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def get(self, video_id: str) -> Optional[dict]:
+        """Lee la transcripción de un video, o None si no está en el almacén."""
+        with self._lock:
+            pending = self._pending.get(video_id)
+            position = self._index.get(video_id)
+        if pending is not None:
+            record = dict(pending)
+        elif position is not None:
+            offset, length = position
+            with self._read_lock:
+                self._reader.seek(offset)
+                data = self._reader.read(length)
+            record = json.loads(data.decode('utf-8'))
+            columns = record['segments']
+            record['segments'] = SegmentList.from_columns(columns['start'], columns['duration'], columns['text'])
+        else:
+            return None
+        record['full_text'] = ' '.join(record['segments'].texts())
+        return record
+
+    def __contains__(self, video_id: str) -> bool:
+        with self._lock:
+            return video_id in self._index or video_id in self._pending
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._index.keys() | self._pending.keys())
+
+    def video_ids(self) -> Iterator[str]:
+        """IDs guardados, en el orden en que se escribieron por última vez."""
+        with self._lock:
+            positions = sorted(self._index.items(), key=lambda item: item[1][0])
+        for video_id, _ in positions:
+            yield video_id
+
+    def flush(self):
+        """Espera a que el hilo escritor termine lo encolado."""
+        self._queue.join()
+        self._raise_writer_error()
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        self._data.close()
+        self._index_file.close()
+        self._reader.close()
+        self._raise_writer_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def export_txt(self, timestamps_dir: str, plain_dir: str) -> int:
+        """Regenera los .txt por video (con timestamps y texto plano). Retorna cuántos."""
+        self.flush()
+        os.makedirs(timestamps_dir, exist_ok=True)
+        os.makedirs(plain_dir, exist_ok=True)
+        count = 0
+        for video_id in self.video_ids():
+            record = self.get(video_id)
+            filename = record['file'] or video_id
+            write_text_atomic(os.path.join(timestamps_dir, f'{filename}.txt'),
+                              format_timestamped_text(record['segments']))
+            write_text_atomic(os.path.join(plain_dir, f'{filename}.txt'), record['full_text'])
+            count += 1
+        return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Almacén agrupado de transcripciones')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    export_parser = subparsers.add_parser('export', help='Regenera los .txt por video de un lote')
+    export_parser.add_argument('batch_dir', help='Carpeta del lote (por ejemplo transcripts/mi_lote)')
+    export_parser.add_argument('--output', help='Carpeta de salida (por defecto la del lote)')
+
+    get_parser = subparsers.add_parser('get', help='Muestra la transcripción de un video')
+    get_parser.add_argument('batch_dir', help='Carpeta del lote')
+    get_parser.add_argument('video_id', help='ID del video')
+    get_parser.add_argument('--timestamps', action='store_true', help='Mostrar con timestamps')
+
+    args = parser.parse_args()
+    if not os.path.exists(os.path.join(args.batch_dir, STORE_NAME)):
+        print(f"Error: No se encontró '{STORE_NAME}' en {args.batch_dir}")
+        sys.exit(1)
+
+    with TranscriptStore(args.batch_dir) as store:
+        if args.command == 'export':
+            output = args.output or args.batch_dir
+            count = store.export_txt(os.path.join(output, 'transcripts_with_timestamps'),
+                                     os.path.join(output, 'transcripts_plain'))
+            print(f'Se exportaron {count} transcripciones a {output}')
+        elif args.command == 'get':
+            record = store.get(args.video_id)
+            if record is None:
+                print(f'Error: El video {args.video_id} no está en el almacén')
+                sys.exit(1)
+            print(format_timestamped_text(record['segments']) if args.timestamps else record['full_text'])
+
+
+if __name__ == '__main__':
+    main()
@@ -1,43 +1,256 @@
-def process_urls_file(file_path):
-    """Procesa un archivo de URLs y devuelve una lista limpia de URLs de YouTube."""
-    urls = []
-    
-    with open(file_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            # Limpiar espacios y caracteres extra
-            url = line.strip()
-            
-            # Ignorar líneas vacías
-            if not url:
+"""
+Lectura de listas de URLs de YouTube en streaming.
+
+Cada línea se reduce al ID del video con una sola expresión regular
+precompilada (watch?v=, youtu.be/, shorts/, embed/, live/, m.youtube.com,
+music.youtube.com, ...) y se convierte a la URL canónica
+https://www.youtube.com/watch?v=ID, descartando &t=, &list= y demás
+parámetros. Los IDs ya vistos se descartan con VideoIdSet, que guarda cada ID
+en 8 bytes, así que archivos de millones de líneas se leen de a una línea y
+sin cargar todas las URLs en memoria.
+"""
+
+import binascii
+import re
+import sys
+from array import array
+from typing import Iterable, Iterator, List, Optional, TextIO, Union
+
+VIDEO_URL_RE = re.compile(
+    r'(?:https?://)?(?:(?:www|m|music)\.)?'
+    r'(?:youtube(?:-nocookie)?\.com/'
+    r'(?:watch/?\?(?:[^#\s]*?&(?:amp;)?)?v=|shorts/|embed/|live/|v/|e/)'
+    r'|youtu\.be/)'
+    r'([A-Za-z0-9_-]{11})(?![\w-])',
+    re.IGNORECASE
+)
+
+# Los IDs de YouTube son 64 bits en base64url: el último carácter solo
+# aporta 4 bits y siempre es uno de estos
+_REGULAR_LAST_CHARS = frozenset('AEIMQUYcgkosw048')
+
+# ID suelto: forma estricta de 64 bits (último carácter incluido)
+_BARE_VIDEO_ID_RE = re.compile(r'[A-Za-z0-9_-]{10}[AEIMQUYcgkosw048]')
+# Palabras comunes de 11 letras ("Programming", "programming", "HELLOWORLDS"):
+# se descartan aunque así se pierdan unos 2 de cada 10.000 IDs reales
+_WORD_RE = re.compile(r'[A-Z]?[a-z]+|[A-Z]+')
+
+# Constante de Fibonacci para repartir los IDs en la tabla
+_HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+_MASK64 = (1 << 64) - 1
+
+
+def canonical_url(video_id: str) -> str:
+    return f'https://www.youtube.com/watch?v={video_id}'
+
+
+def is_bare_video_id(text: str) -> bool:
+    """Indica si el texto tiene la forma de un ID de video de YouTube."""
+    return _BARE_VIDEO_ID_RE.fullmatch(text) is not None and _WORD_RE.fullmatch(text) is None
+
+
+def canonical_video_id(text: str, allow_bare_id: bool = False) -> Optional[str]:
+    """ID del primer video de YouTube que aparece en una URL del texto.
+
+    Con allow_bare_id=True también se acepta un ID suelto, si tiene la forma
+    estricta de is_bare_video_id.
+    """
+    match = VIDEO_URL_RE.search(text)
+    if match:
+        return match.group(1)
+    if allow_bare_id:
+        text = text.strip()
+        if is_bare_video_id(text):
+            return text
+    return None
+
+
+def _id_to_int(video_id: str) -> Optional[int]:
+    """Los 64 bits del ID, o None si no tiene esa forma (va al set de irregulares)."""
+    if len(video_id) != 11 or video_id[-1] not in _REGULAR_LAST_CHARS:
+        return None
+    try:
+        # a2b_base64 con replace es bastante más rápido que urlsafe_b64decode
+        return int.from_bytes(binascii.a2b_base64(video_id.replace('-', '+').replace('_', '/') + '='), 'big')
+    except ValueError:
+        # Caracteres fuera de base64url (por ejemplo letras no ASCII)
+        return None
+
+
+class VideoIdSet:
+    """Conjunto de IDs de video en una tabla hash de enteros de 64 bits.
+
+    Un set de str de Python usa más de 100 bytes por ID; aquí cada ID ocupa
+    un casillero de 8 bytes de un array('Q') con direccionamiento abierto y
+    sondeo lineal (con carga de hasta 1/2). Los IDs que no tienen la forma
+    de 64 bits de YouTube se guardan aparte en un set normal.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        size = 16
+        while size < capacity * 2:
+            size *= 2
+        self._table = array('Q', bytes(8 * size))
+        self._shift = 64 - (size.bit_length() - 1)
+        self._count = 0
+        # El 0 marca casilleros vacíos: el ID que codifica a 0 se guarda aparte
+        self._has_zero = False
+        self._irregular = set()
+
+    def add(self, video_id: str) -> bool:
+        """Agrega el ID. Retorna False si ya estaba."""
+        value = _id_to_int(video_id)
+        if value is None:
+            if video_id in self._irregular:
+                return False
+            self._irregular.add(video_id)
+            return True
+
+        if value == 0:
+            if self._has_zero:
+                return False
+            self._has_zero = True
+            return True
+
+        table = self._table
+        mask = len(table) - 1
+        i = ((value * _HASH_MULTIPLIER) & _MASK64) >> self._shift
+        while True:
+            slot = table[i]
+            if slot == 0:
+                break
+            if slot == value:
+                return False
+            i = (i + 1) & mask
+        table[i] = value
+        self._count += 1
+        if self._count * 2 > len(table):
+            self._grow()
+        return True
+
+    def __contains__(self, video_id: str) -> bool:
+        value = _id_to_int(video_id)
+        if value is None:
+            return video_id in self._irregular
+        if value == 0:
+            return self._has_zero
+        table = self._table
+        mask = len(table) - 1
+        i = ((value * _HASH_MULTIPLIER) & _MASK64) >> self._shift
+        while True:
+            slot = table[i]
+            if slot == 0:
+                return False
+            if slot == value:
+                return True
+            i = (i + 1) & mask
+
+    def _grow(self):
+        old = self._table
+        table = self._table = array('Q', bytes(16 * len(old)))
+        self._shift -= 1
+        mask = len(table) - 1
+        shift = self._shift
+        for value in old:
+            if value:
+                i = ((value * _HASH_MULTIPLIER) & _MASK64) >> shift
+                while table[i]:
+                    i = (i + 1) & mask
+                table[i] = value
+
+    def __len__(self) -> int:
+        return self._count + self._has_zero + len(self._irregular)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes que ocupa la tabla (sin contar los IDs irregulares)."""
+        return len(self._table) * self._table.itemsize
+
+
+class IngestStats:
+    """Conteos de una lectura: líneas, URLs válidas, repetidas e inválidas."""
+
+    def __init__(self):
+        self.lines = 0
+        self.unique = 0
+        self.duplicates = 0
+        self.invalid = 0
+
+    def __repr__(self):
+        return (f'IngestStats(lines={self.lines}, unique={self.unique}, '
+                f'duplicates={self.duplicates}, invalid={self.invalid})')
+
+
+def iter_video_urls(source: Union[str, Iterable[str]], stats: Optional[IngestStats] = None,
+                    seen: Optional[VideoIdSet] = None, allow_bare_ids: bool = False) -> Iterator[str]:
+    """Genera las URLs canónicas, sin repetir, de un archivo o de un iterable de líneas.
+
+    Se ignoran las líneas vacías y los comentarios (#). Una línea puede tener
+    varias URLs (por ejemplo HTML pegado); con allow_bare_ids también se
+    acepta una línea con solo el ID. Las demás líneas cuentan como inválidas.
+    stats se actualiza a medida que se consume el generador.
+    """
+    stats = stats if stats is not None else IngestStats()
+    seen = seen if seen is not None else VideoIdSet()
+    if isinstance(source, str):
+        with open(source, 'r', encoding='utf-8', errors='replace') as f:
+            yield from _iter_lines(f, stats, seen, allow_bare_ids)
+    else:
+        yield from _iter_lines(source, stats, seen, allow_bare_ids)
+
+
+def _iter_lines(lines: Union[TextIO, Iterable[str]], stats: IngestStats, seen: VideoIdSet,
+                allow_bare_ids: bool) -> Iterator[str]:
+    findall = VIDEO_URL_RE.findall
+    add = seen.add
+    for line in lines:
+        stats.lines += 1
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        video_ids = findall(line)
+        if not video_ids:
+            if not (allow_bare_ids and is_bare_video_id(line)):
+                stats.invalid += 1
                 continue
-                
-            # Asegurarse que es una URL de YouTube
-            if 'youtube.com/watch' in url or 'youtu.be/' in url:
-                urls.append(url)
-    
-    return urls
+            video_ids = [line]
+        for video_id in video_ids:
+            if add(video_id):
+                stats.unique += 1
+                yield canonical_url(video_id)
+            else:
+                stats.duplicates += 1
+
+
+def process_urls_file(file_path, stats: Optional[IngestStats] = None, allow_bare_ids: bool = False) -> List[str]:
+    """Procesa un archivo de URLs y devuelve una lista limpia de URLs de YouTube."""
+    return list(iter_video_urls(file_path, stats, allow_bare_ids=allow_bare_ids))
 
 def save_urls_to_file(urls, output_file='video_urls.txt'):
     """Guarda las URLs procesadas en un archivo."""
+    count = 0
     with open(output_file, 'w', encoding='utf-8') as f:
         for url in urls:
             f.write(url + '\n')
-    
-    print(f"Se guardaron {len(urls)} URLs en {output_file}")
+            count += 1
+
+    print(f"Se guardaron {count} URLs en {output_file}")
 
 if __name__ == "__main__":
+    # --ids: aceptar también líneas con solo el ID del video
+    allow_bare_ids = '--ids' in sys.argv[1:]
     print("Pega las URLs de YouTube (una por línea)")
     print("Cuando termines, presiona Ctrl+D (Unix/Mac) o Ctrl+Z (Windows) y Enter")
-    
-    urls = []
+
+    stats = IngestStats()
     try:
-        while True:
-            line = input()
-            if 'youtube.com/watch' in line or 'youtu.be/' in line:
-                urls.append(line.strip())
-    except (EOFError, KeyboardInterrupt):
+        save_urls_to_file(iter_video_urls(sys.stdin, stats, allow_bare_ids=allow_bare_ids))
+    except KeyboardInterrupt:
         pass
-    
-    if urls:
-        save_urls_to_file(urls)
-        print("\nAhora puedes usar estas URLs con el script principal")
\ No newline at end of file
+
+    if stats.duplicates:
+        print(f"Se descartaron {stats.duplicates} URLs repetidas")
+    if stats.invalid:
+        print(f"Se ignoraron {stats.invalid} líneas sin URL de YouTube")
+    if stats.unique:
+        print("\nAhora puedes usar estas URLs con el script principal")
@@ -0,0 +1,68 @@
+"""
+Metadata compacta de un video de YouTube.
+
+Se construye a partir de una sola extracción de yt-dlp y guarda solo los
+campos que usa el extractor (título, idioma, duración y pistas de
+subtítulos), en lugar de conservar el JSON completo de --dump-json.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional
+
+
+class VideoMetadata:
+    """Datos de un video usados para el título, el idioma y los subtítulos."""
+
+    __slots__ = ('video_id', 'title', 'language', 'duration', 'subtitles', 'automatic_captions')
+
+    def __init__(self, video_id: str, title: str, language: str, duration: Optional[float] = None,
+                 subtitles: Optional[Dict[str, Dict[str, str]]] = None,
+                 automatic_captions: Optional[Dict[str, Dict[str, str]]] = None):
+        self.video_id = video_id
+        self.title = title
+        self.language = language
+        self.duration = duration
+        # {idioma: {extensión: url}} para subtítulos manuales y automáticos
+        self.subtitles = subtitles or {}
+        self.automatic_captions = automatic_captions or {}
+
+    @classmethod
+    def from_info(cls, info: dict, keep_languages: Optional[Iterable[str]] = None) -> 'VideoMetadata':
+        """Crea la metadata desde el dict de yt-dlp.
+
+        Si se indica keep_languages, solo se conservan las pistas de esos idiomas
+        (las pistas automáticas traducidas pueden ser más de cien por video).
+        """
+        language = info.get('language') or info.get('language_preference') or 'en'
+        keep = set(keep_languages) | {language} if keep_languages is not None else None
+        return cls(
+            video_id=info.get('id'),
+            title=info.get('title') or info.get('id'),
+            language=language,
+            duration=info.get('duration'),
+            subtitles=_compact_tracks(info.get('subtitles'), keep),
+            automatic_captions=_compact_tracks(info.get('automatic_captions'), keep),
+        )
+
+    @property
+    def safe_title(self) -> str:
+        """Título apto para usar en nombres de archivo."""
+        return re.sub(r'[<>:"/\\|?*]', '_', self.title)
+
+    def caption_languages(self) -> List[str]:
+        """Idiomas con subtítulos disponibles (manuales primero)."""
+        languages = list(self.subtitles)
+        languages.extend(lang for lang in self.automatic_captions if lang not in self.subtitles)
+        return languages
+
+
+def _compact_tracks(tracks: Optional[dict], keep: Optional[set]) -> Dict[str, Dict[str, str]]:
+    """Reduce {idioma: [formatos]} de yt-dlp a {idioma: {ext: url}}."""
+    compact = {}
+    for lang, formats in (tracks or {}).items():
+        if keep is not None and lang not in keep:
+            continue
+        urls = {fmt['ext']: fmt['url'] for fmt in formats or [] if fmt.get('ext') and fmt.get('url')}
+        if urls:
+            compact[lang] = urls
+    return compact
@@ -1,136 +1,331 @@
-import subprocess
 import re
-import json
-from typing import Optional, List
+from typing import Optional, List, Iterable, Iterator
 from pathlib import Path
 import requests
+from requests.adapters import HTTPAdapter
 import time
 import os
+import io
+import html
 from rich.console import Console
 from rich.progress import Progress, BarColumn, TextColumn, TimeRemainingColumn
 from rich.panel import Panel
 from rich.text import Text
-from rich.prompt import Prompt, Confirm
+from rich.prompt import Prompt, Confirm, IntPrompt, FloatPrompt
 from rich.table import Table
+import argparse
 import colorama
 from colorama import Fore, Style
 import sys
 import tempfile
 import glob
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from yt_dlp_backend import create_backend
+from rate_limiter import RateLimiter
+from video_metadata import VideoMetadata
+from memory_cache import LRUCache
+from caption_parser import parse_vtt, parse_json3
+from transcript_segments import format_vtt_time, format_timestamped_text
+from transcript_store import TranscriptStore
+from transcript_index import TranscriptIndex
+from transcript_cache import TranscriptCache, DEFAULT_CACHE_PATH
+from raw_captions import RawCaptionStore, DEFAULT_RAW_PATH
+from run_metrics import RunMetrics, REPORT_NAME, PROMETHEUS_NAME
+from replay import (ReplayArchive, RecordingAdapter, ReplayAdapter, RecordingBackend, ReplayBackend,
+                    install_adapter, REPLAY_RATE)
+from url_processor import IngestStats, canonical_video_id, iter_video_urls
+from batch_manifest import BatchManifest, write_text_atomic, PENDING, DONE, FAILED, NO_CAPTIONS
+
+# Idiomas de respaldo que se piden además del idioma original del video
+FALLBACK_LANGUAGES = ['es', 'en', 'fr', 'de', 'it', 'pt']
+
+# Máximo de entradas de metadata y de títulos que se mantienen en memoria
+METADATA_CACHE_SIZE = 256
+TITLE_CACHE_SIZE = 4096
+
+# Peticiones por segundo a YouTube por cada hilo del lote (la tasa por defecto
+# es esto por jobs). La pausa fija de 0.5 s que reemplazó el limitador dejaba
+# hacer hasta 2 videos/s por hilo, y cada video usa 2 peticiones (metadata y
+# json3) o 3 (metadata, título y VTT): con 6 por hilo el limitador nunca es
+# más lento que esa pausa y solo frena cuando YouTube responde 429
+REQUESTS_PER_SECOND_PER_JOB = 6.0
+RATE_LIMITER_BURST = 4
+
+# Lectura parcial de la página del video al buscar el título
+TITLE_CHUNK_SIZE = 8192
+TITLE_MAX_BYTES = 512 * 1024
 
 class YouTubeTranscriptExtractor:
-    def __init__(self):
+    # Endpoint oEmbed usado para resolver títulos sin descargar la página del video
+    OEMBED_URL = 'https://www.youtube.com/oembed'
+    
+    def __init__(self, jobs: int = 1, backend: str = 'auto', cache_path: Optional[str] = DEFAULT_CACHE_PATH,
+                 dedupe_auto_captions: bool = True, caption_format: str = 'json3',
+                 requests_per_second: Optional[float] = None, output_format: str = 'txt',
+                 index_path: Optional[str] = None, metrics_textfile: Optional[str] = None,
+                 record_path: Optional[str] = None, replay_path: Optional[str] = None,
+                 raw_captions_path: Optional[str] = None, allow_bare_ids: bool = False):
+        # Número de videos que se procesan en paralelo en process_videos_from_urls
+        self.jobs = max(1, jobs)
+        # Tasa configurada (None: REQUESTS_PER_SECOND_PER_JOB por cada hilo del lote)
+        self.requests_per_second = requests_per_second
+        self._replaying = bool(replay_path)
+        # Limitador compartido por todas las peticiones a YouTube (HTTP y yt-dlp)
+        self.rate_limiter = RateLimiter(rate=REPLAY_RATE if replay_path else self.default_rate(self.jobs),
+                                        burst=max(RATE_LIMITER_BURST, self.jobs))
+        # Grabación (record_path) o reproducción sin red (replay_path) de las respuestas de YouTube
+        self.replay_archive = None
+        if replay_path:
+            self.replay_archive = ReplayArchive(replay_path, 'replay')
+            self.backend = ReplayBackend(self.replay_archive, rate_limiter=self.rate_limiter)
+        else:
+            # Backend de yt-dlp: 'api' (en proceso), 'subprocess' o 'auto'
+            self.backend = create_backend(backend, rate_limiter=self.rate_limiter)
+            if record_path:
+                self.replay_archive = ReplayArchive(record_path, 'record')
+                self.backend = RecordingBackend(self.backend, self.replay_archive)
+        # Metadata y títulos por ID de video (una sola extracción por video)
+        self._metadata_cache = LRUCache(METADATA_CACHE_SIZE)
+        self._title_cache = LRUCache(TITLE_CACHE_SIZE)
+        # Caché persistente de transcripciones (None la desactiva). Al grabar o
+        # reproducir no se usa: un acierto de caché no haría ninguna petición
+        self.cache = TranscriptCache(cache_path) if cache_path and self.replay_archive is None else None
+        # Subtítulos tal como se descargaron, para reprocesarlos sin red con
+        # raw_captions.py. Es opcional (None, por defecto, lo desactiva) porque
+        # el almacén no expulsa entradas; al reproducir no se guardan
+        self.raw_store = RawCaptionStore(raw_captions_path) if raw_captions_path and not replay_path else None
+        # Aceptar IDs sueltos (sin URL) en las listas; por defecto solo URLs de YouTube
+        self.allow_bare_ids = allow_bare_ids
+        # Colapsar las líneas repetidas de los subtítulos automáticos
+        self.dedupe_auto_captions = dedupe_auto_captions
+        # Estadísticas acumuladas (descargas de subtítulos evitadas, bytes leídos para títulos)
+        self.stats = {'negotiated_videos': 0, 'caption_requests_saved': 0, 'caption_bytes_saved': 0,
+                      'title_bytes': 0}
+        self._stats_lock = threading.Lock()
+        # Motivo del último fallo de get_transcript en cada hilo (estado del manifiesto)
+        self._local = threading.local()
+        # Formato preferido de subtítulos: 'json3' (descarga directa) o 'vtt' (yt-dlp)
+        self.caption_format = caption_format
+        # Salida de los lotes: 'txt' (dos archivos por video) o 'bundle' (TranscriptStore)
+        self.output_format = output_format
+        # Índice de texto completo que se actualiza con cada video extraído (None lo desactiva)
+        self.index = TranscriptIndex(index_path) if index_path else None
+        # Latencia por etapa, bytes descargados y reintentos (se reinicia en cada lote)
+        self.metrics = RunMetrics()
+        # Copia adicional de las métricas para el textfile collector de node_exporter
+        self.metrics_textfile = metrics_textfile
         self.session = requests.Session()
+        # Pool de conexiones persistentes dimensionado para los hilos del lote
+        if replay_path:
+            adapter = ReplayAdapter(self.replay_archive)
+        elif record_path:
+            adapter = RecordingAdapter(self.replay_archive, pool_connections=10, pool_maxsize=max(10, self.jobs * 2))
+        else:
+            adapter = HTTPAdapter(pool_connections=10, pool_maxsize=max(10, self.jobs * 2))
+        install_adapter(self.session, adapter)
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
         self.console = Console()
         colorama.init(autoreset=True)
 
+    def default_rate(self, jobs: int) -> float:
+        """Peticiones por segundo para un lote con `jobs` hilos."""
+        return self.requests_per_second or REQUESTS_PER_SECOND_PER_JOB * max(1, jobs)
+
     def extract_video_id(self, url: str) -> Optional[str]:
-        """Extrae el ID del video de una URL de YouTube."""
-        patterns = [
-            r'(?:v=|\/)([0-9A-Za-z_-]{11}).*',
-            r'youtu\.be\/([0-9A-Za-z_-]{11})',
-        ]
+        """Extrae el ID del video de una URL de YouTube (o de un ID suelto, con allow_bare_ids)."""
+        return canonical_video_id(url, allow_bare_id=self.allow_bare_ids)
+
+    def _http_get(self, url: str, **kwargs) -> requests.Response:
+        """GET con la sesión compartida, pasando por el limitador de peticiones.
+        
+        Ante un 429/503 el limitador pausa todas las peticiones y la llamada se
+        reintenta; tras agotar los reintentos se devuelve la última respuesta.
+        """
+        for attempt in range(self.rate_limiter.max_retries + 1):
+            self.rate_limiter.acquire()
+            response = self.session.get(url, **kwargs)
+            if not self.rate_limiter.observe_response(response):
+                break
+            if attempt < self.rate_limiter.max_retries:
+                self.rate_limiter.count_retry()
+                self.metrics.count('http_retries')
+                response.close()
+        return response
+
+    def get_video_metadata(self, video_url: str) -> Optional[VideoMetadata]:
+        """Obtiene la metadata del video con una sola extracción de yt-dlp por ID."""
+        video_id = self.extract_video_id(video_url)
+        if not video_id:
+            return None
         
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                return match.group(1)
-        return None
+        metadata = self._metadata_cache.get(video_id)
+        if metadata is not None:
+            return metadata
+        
+        try:
+            with self.metrics.stage('metadata'):
+                info = self.backend.extract_info(video_url)
+        except Exception:
+            info = None
+        if not info:
+            return None
+        
+        metadata = VideoMetadata.from_info(info, keep_languages=FALLBACK_LANGUAGES)
+        self._metadata_cache.put(video_id, metadata)
+        self._title_cache.put(video_id, metadata.safe_title)
+        return metadata
 
     def get_video_title(self, video_url: str) -> str:
-        """Obtiene el título del video."""
+        """Obtiene el título del video.
+        
+        Usa la metadata o un título ya resuelto si están en memoria; si no,
+        consulta el endpoint oEmbed (unos cientos de bytes) y como último
+        recurso lee la página del video solo hasta encontrar <title>.
+        """
+        video_id = self.extract_video_id(video_url)
+        if not video_id:
+            return video_url
+        
+        title = self._title_cache.get(video_id)
+        if title is not None:
+            return title
+        
+        with self.metrics.stage('title'):
+            title = self._fetch_oembed_title(video_id) or self._fetch_watch_page_title(video_url)
+        if not title:
+            return video_id
+        
+        return self.remember_title(video_id, title)
+
+    def remember_title(self, video_id: str, title: str) -> str:
+        """Guarda un título ya conocido (por ejemplo, de una playlist) y lo retorna saneado."""
+        title = re.sub(r'[<>:"/\\|?*]', '_', title)
+        self._title_cache.put(video_id, title)
+        return title
+
+    def _fetch_oembed_title(self, video_id: str) -> Optional[str]:
+        """Obtiene el título desde el endpoint oEmbed de YouTube."""
         try:
-            response = self.session.get(video_url)
-            match = re.search(r'<title>(.+?)</title>', response.text)
-            if match:
-                title = match.group(1).replace(' - YouTube', '').strip()
-                # Limpiar el título para usarlo como nombre de archivo
-                title = re.sub(r'[<>:"/\\|?*]', '_', title)
-                return title
-            return self.extract_video_id(video_url)
-        except:
-            return self.extract_video_id(video_url)
+            response = self._http_get(self.OEMBED_URL, timeout=15, params={
+                'url': f'https://www.youtube.com/watch?v={video_id}',
+                'format': 'json'
+            })
+            self._add_stat('title_bytes', len(response.content))
+            self.metrics.count('bytes_downloaded', len(response.content))
+            if response.status_code != 200:
+                return None
+            return response.json().get('title')
+        except (requests.RequestException, ValueError):
+            return None
 
-    def _detect_video_language(self, video_url: str) -> str:
-        """Detecta el idioma original del video usando metadata de yt-dlp."""
+    def _fetch_watch_page_title(self, video_url: str) -> Optional[str]:
+        """Lee la página del video en streaming y corta al encontrar </title>."""
         try:
-            cmd = ['yt-dlp', '--dump-json', '--no-download', video_url]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                metadata = json.loads(result.stdout)
-                # Intentar obtener idioma de diferentes campos
-                language = (metadata.get('language') or 
-                           metadata.get('language_preference') or 
-                           metadata.get('automatic_captions', {}).get('language') or
-                           'en')  # Default inglés
-                
-                self.console.print(f'[blue]🌐 Idioma detectado: {language}[/blue]')
-                return language
-            else:
-                self.console.print('[yellow]⚠️ No se pudo detectar idioma, usando inglés por defecto[/yellow]')
-                return 'en'
-                
-        except Exception as e:
-            self.console.print(f'[yellow]⚠️ Error detectando idioma: {str(e)}, usando inglés[/yellow]')
-            return 'en'
+            response = self._http_get(video_url, timeout=15, stream=True)
+        except requests.RequestException:
+            return None
+        
+        buffer = b''
+        try:
+            for chunk in response.iter_content(chunk_size=TITLE_CHUNK_SIZE):
+                buffer += chunk
+                if b'</title>' in buffer or len(buffer) >= TITLE_MAX_BYTES:
+                    break
+        except requests.RequestException:
+            return None
+        finally:
+            response.close()
+            self._add_stat('title_bytes', len(buffer))
+            self.metrics.count('bytes_downloaded', len(buffer))
+        
+        match = re.search(r'<title>(.+?)</title>', buffer.decode('utf-8', errors='replace'))
+        if not match:
+            return None
+        return html.unescape(match.group(1)).replace(' - YouTube', '').strip()
+
+    def _add_stat(self, name: str, value: int):
+        with self._stats_lock:
+            self.stats[name] = self.stats.get(name, 0) + value
+
+    def _detect_video_language(self, video_url: str) -> str:
+        """Detecta el idioma original del video usando metadata de yt-dlp.
+        
+        Sin etapa propia: el tiempo de la consulta ya se mide como 'metadata'.
+        """
+        return self._language_from_metadata(self.get_video_metadata(video_url))
+    
+    def _language_from_metadata(self, metadata: Optional[VideoMetadata]) -> str:
+        """Idioma original según la metadata ya obtenida ('en' si no hay metadata)."""
+        if metadata:
+            self.console.print(f'[blue]🌐 Idioma detectado: {metadata.language}[/blue]')
+            return metadata.language
+        
+        self.console.print('[yellow]⚠️ No se pudo detectar idioma, usando inglés por defecto[/yellow]')
+        return 'en'
     
     def get_transcript(self, video_url: str) -> Optional[dict]:
-        """Obtiene la transcripción de un video de YouTube usando yt-dlp."""
+        """Obtiene la transcripción de un video de YouTube usando yt-dlp.
+        
+        Si falla, last_failure() indica si el video no tiene subtítulos o si
+        conviene reintentarlo.
+        """
+        self._local.failure = FAILED
         try:
             video_id = self.extract_video_id(video_url)
             if not video_id:
                 return None
             
+            # Una transcripción en caché evita toda la red y yt-dlp
+            if self.cache is not None:
+                cached = self.cache.get(video_id, mode=self._cache_mode())
+                if cached:
+                    cached['cached'] = True
+                    self.console.print(f'[blue]💾 Transcripción en caché ({cached["selected_language"]})[/blue]')
+                    return cached
+            
+            # Una sola consulta de metadata por intento: si falla no se
+            # vuelve a pedir para detectar el idioma ni para clasificar el fallo
+            metadata = self.get_video_metadata(video_url)
+            
             # Detectar idioma original del video
-            original_language = self._detect_video_language(video_url)
+            original_language = self._language_from_metadata(metadata)
             
-            # Crear directorio temporal para descargar subtítulos
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # Configurar comando yt-dlp - incluir más idiomas
-                cmd = [
-                    'yt-dlp',
-                    '--write-auto-sub',
-                    '--write-sub', 
-                    '--skip-download',
-                    '--sub-lang', f'{original_language},es,en,fr,de,it,pt',
-                    '--output', f'{temp_dir}/%(title)s.%(ext)s',
-                    video_url
-                ]
-                
-                # Ejecutar yt-dlp
-                result = subprocess.run(cmd, capture_output=True, text=True, cwd=temp_dir)
-                
-                if result.returncode != 0:
+            # Elegir la pista con la metadata antes de descargar: así solo se
+            # descarga el subtítulo que se va a usar en lugar de todos los idiomas
+            selected_language = None
+            available = []
+            if metadata is not None:
+                available = self._available_caption_languages(metadata, original_language)
+                if not available:
+                    if not metadata.caption_languages():
+                        self._local.failure = NO_CAPTIONS
                     self.console.print(f'[bold yellow]⚠️ No hay transcripciones disponibles para este video[/bold yellow]')
                     return None
-                
-                # Buscar archivos de subtítulos descargados
-                vtt_files = glob.glob(f'{temp_dir}/*.vtt')
-                
-                if not vtt_files:
-                    self.console.print(f'[bold yellow]⚠️ No se descargaron transcripciones[/bold yellow]')
-                    return None
-                
-                # Seleccionar el mejor archivo priorizando idioma original
-                best_vtt = self._select_best_vtt_file_smart(vtt_files, original_language)
-                
-                if best_vtt:
-                    # Procesar archivo VTT
-                    with open(best_vtt, 'r', encoding='utf-8') as f:
-                        vtt_content = f.read()
-                    
-                    transcript = self._process_vtt_transcript(vtt_content)
-                    
-                    if transcript:
-                        # Agregar información del idioma usado
-                        transcript['detected_language'] = original_language
-                        transcript['selected_language'] = self._extract_language_from_filename(best_vtt)
-                        self.console.print(f'[blue]📝 Idioma seleccionado: {transcript["selected_language"]}[/blue]')
-                        return transcript
+                selected_language = self._select_caption_language(available, original_language)
+            
+            transcript = None
+            if selected_language and self.caption_format == 'json3':
+                transcript = self._fetch_json3_transcript(video_url, metadata, selected_language, len(available))
+            if transcript is None:
+                transcript, selected_language = self._download_vtt_transcript(
+                    video_url, metadata, original_language, selected_language, len(available))
+            
+            if transcript:
+                raw_caption = transcript.pop('raw_caption', None)
+                # Agregar información del idioma usado
+                transcript['detected_language'] = original_language
+                transcript['selected_language'] = selected_language
+                self.console.print(f'[blue]📝 Idioma seleccionado: {transcript["selected_language"]}[/blue]')
+                transcript['title'] = self.get_video_title(video_url)
+                if raw_caption is not None:
+                    self._store_raw_caption(video_id, transcript, *raw_caption)
+                if self.cache is not None and transcript['segments']:
+                    self.cache.put(video_id, transcript, mode=self._cache_mode())
+                return transcript
                 
             return None
             
@@ -138,6 +333,181 @@ class YouTubeTranscriptExtractor:
             self.console.print(f'[bold red]❌ Error al obtener transcripción: {str(e)}[/bold red]')
             return None
     
+    def _cache_mode(self) -> str:
+        """Modo de procesamiento con que se guardan las transcripciones en la caché.
+        
+        Un acierto solo vale si se procesó con el mismo formato de subtítulos y
+        la misma limpieza de los automáticos.
+        """
+        return f"{self.caption_format}:{'dedupe' if self.dedupe_auto_captions else 'raw'}"
+    
+    def last_failure(self) -> str:
+        """Estado del manifiesto (FAILED o NO_CAPTIONS) del último get_transcript fallido del hilo.
+        
+        Sin metadata no se sabe si el video tiene subtítulos: queda FAILED y
+        se reintenta en la próxima ejecución del lote.
+        """
+        return getattr(self._local, 'failure', FAILED)
+    
+    def _fetch_json3_transcript(self, video_url: str, metadata: VideoMetadata, language: str,
+                                available_count: int) -> Optional[dict]:
+        """Descarga la pista json3 directamente con la sesión HTTP (sin yt-dlp ni archivos).
+        
+        Retorna None si la pista no tiene URL json3 o la descarga falla, para
+        que get_transcript use la descarga VTT con yt-dlp.
+        """
+        track = metadata.subtitles.get(language) or metadata.automatic_captions.get(language) or {}
+        url = track.get('json3')
+        if not url:
+            return None
+        
+        try:
+            with self.metrics.stage('caption_download'):
+                response = self._http_get(url, timeout=30)
+                self.metrics.count('bytes_downloaded', len(response.content))
+                response.raise_for_status()
+                data = response.json()
+        except (requests.RequestException, ValueError) as e:
+            self.console.print(f'[yellow]⚠️ No se pudo descargar json3 ({str(e)}), usando yt-dlp[/yellow]')
+            return None
+        
+        auto = self._is_auto_caption(metadata, language)
+        with self.metrics.stage('caption_parse'):
+            transcript = parse_json3(data, merge_rolling=self.dedupe_auto_captions and auto)
+        if not transcript['segments']:
+            return None
+        transcript['auto'] = auto
+        self._record_negotiation_savings(available_count - 1, len(response.content))
+        if self.raw_store is not None:
+            transcript['raw_caption'] = ('json3', response.content)
+        return transcript
+    
+    def _store_raw_caption(self, video_id: str, transcript: dict, fmt: str, data: bytes):
+        """Guarda la pista descargada en el almacén crudo; un error no detiene el video.
+        
+        Si la pista es automática lo indica transcript['auto'], calculado al
+        procesarla: aquí no se vuelve a consultar la metadata.
+        """
+        language = transcript['selected_language'] or 'unknown'
+        try:
+            with self.metrics.stage('raw_store'):
+                self.raw_store.put(video_id, language, fmt, data, auto=transcript.get('auto', False),
+                                   title=transcript['title'], detected_language=transcript['detected_language'])
+        except OSError as e:
+            self.console.print(f'[yellow]⚠️ No se pudo guardar el subtítulo original: {str(e)}[/yellow]')
+    
+    def _download_vtt_transcript(self, video_url: str, metadata: Optional[VideoMetadata], original_language: str,
+                                 selected_language: Optional[str], available_count: int) -> tuple:
+        """Descarga subtítulos VTT con yt-dlp y los procesa.
+        
+        Si ya hay un idioma elegido solo se descarga esa pista; si no, se bajan
+        todos los candidatos y se elige con _select_best_vtt_file_smart.
+        metadata es la que ya consultó get_transcript (None si falló).
+        Retorna (transcripción, idioma) o (None, None).
+        """
+        # Crear directorio temporal para descargar subtítulos
+        with tempfile.TemporaryDirectory() as temp_dir:
+            if selected_language:
+                languages = [selected_language]
+            else:
+                # Sin metadata: descargar todos los candidatos y elegir después
+                languages = [original_language] + FALLBACK_LANGUAGES
+            
+            with self.metrics.stage('subtitle_download'):
+                downloaded = self.backend.download_subtitles(video_url, languages, temp_dir)
+            if not downloaded:
+                self.console.print(f'[bold yellow]⚠️ No hay transcripciones disponibles para este video[/bold yellow]')
+                return None, None
+            
+            # Buscar archivos de subtítulos descargados
+            vtt_files = glob.glob(f'{temp_dir}/*.vtt')
+            self.metrics.count('bytes_downloaded', sum(os.path.getsize(path) for path in vtt_files))
+            
+            if not vtt_files:
+                self.console.print(f'[bold yellow]⚠️ No se descargaron transcripciones[/bold yellow]')
+                return None, None
+            
+            if selected_language:
+                best_vtt = vtt_files[0]
+                self._record_negotiation_savings(available_count - 1, os.path.getsize(best_vtt))
+            else:
+                # Seleccionar el mejor archivo priorizando idioma original
+                best_vtt = self._select_best_vtt_file_smart(vtt_files, original_language)
+                if not best_vtt:
+                    return None, None
+                selected_language = self._extract_language_from_filename(best_vtt)
+            
+            auto = self._is_auto_caption(metadata, selected_language)
+            
+            # Procesar archivo VTT en streaming
+            with open(best_vtt, 'r', encoding='utf-8') as f, self.metrics.stage('caption_parse'):
+                transcript = self._process_vtt_transcript(f, merge_rolling=self.dedupe_auto_captions and auto)
+            if transcript:
+                transcript['auto'] = auto
+            
+            # El directorio temporal se borra al salir: copiar antes el VTT original
+            if transcript and self.raw_store is not None:
+                with open(best_vtt, 'rb') as f:
+                    transcript['raw_caption'] = ('vtt', f.read())
+        
+        return transcript, selected_language
+    
+    def _available_caption_languages(self, metadata: VideoMetadata, original_language: str) -> List[str]:
+        """Idiomas candidatos con pista disponible, en el orden en que se pedían a yt-dlp."""
+        available = []
+        for lang in [original_language] + FALLBACK_LANGUAGES:
+            if lang not in available and (lang in metadata.subtitles or lang in metadata.automatic_captions):
+                available.append(lang)
+        return available
+    
+    def _select_caption_language(self, available: List[str], original_language: str) -> str:
+        """Elige el idioma con la misma política que _select_best_vtt_file_smart."""
+        self.console.print(f'[blue]🔍 Pistas disponibles: {", ".join(available)}[/blue]')
+        
+        # 1. Priorizar idioma original detectado
+        if original_language in available:
+            self.console.print(f'[green]✅ Seleccionado idioma original: {original_language}[/green]')
+            return original_language
+        
+        # 2. Para videos en inglés/español, priorizar esos idiomas
+        if original_language in ['en', 'es']:
+            priority_langs = [original_language, 'en' if original_language == 'es' else 'es']
+        else:
+            self.console.print(f'[yellow]⚠️ Video en {original_language}, usando inglés como solicitado[/yellow]')
+            priority_langs = ['en', 'es']
+        
+        for lang in priority_langs:
+            if lang in available:
+                self.console.print(f'[green]✅ Seleccionado idioma fallback: {lang}[/green]')
+                return lang
+        
+        # 3. Último recurso: primer idioma disponible
+        self.console.print(f'[yellow]⚠️ Usando primer idioma disponible: {available[0]}[/yellow]')
+        return available[0]
+    
+    def _record_negotiation_savings(self, skipped_tracks: int, track_bytes: int):
+        """Acumula las descargas evitadas al bajar una sola pista.
+        
+        Los bytes ahorrados son una estimación: se asume que cada pista evitada
+        pesa lo mismo que la descargada.
+        """
+        with self._stats_lock:
+            self.stats['negotiated_videos'] += 1
+            self.stats['caption_requests_saved'] += skipped_tracks
+            self.stats['caption_bytes_saved'] += skipped_tracks * track_bytes
+    
+    def _is_auto_caption(self, metadata: Optional[VideoMetadata], language: str) -> bool:
+        """Indica si la pista descargada es de subtítulos automáticos.
+        
+        yt-dlp prefiere los subtítulos manuales cuando existen ambos, así que la
+        pista es automática si el idioma solo aparece en automatic_captions.
+        Usa la metadata que ya se consultó: sin ella (la consulta falló) no se
+        vuelve a pedir y la pista se trata como manual.
+        """
+        if metadata is None:
+            return False
+        return language not in metadata.subtitles and language in metadata.automatic_captions
+    
     def _extract_language_from_filename(self, filename: str) -> str:
         """Extrae el código de idioma del nombre del archivo VTT."""
         # Buscar patrones como .es.vtt, .en.vtt, etc.
@@ -184,66 +554,19 @@ class YouTubeTranscriptExtractor:
         """Método legacy - mantener para compatibilidad."""
         return self._select_best_vtt_file_smart(vtt_files, 'es')
     
-    def _process_vtt_transcript(self, vtt_content: str) -> dict:
-        """Procesa el contenido VTT de yt-dlp."""
-        transcript = {
-            'segments': [],
-            'full_text': []
-        }
-
+    def _process_vtt_transcript(self, vtt_content, merge_rolling: bool = False) -> dict:
+        """Procesa el contenido VTT de yt-dlp.
+        
+        Acepta el texto completo o cualquier iterable de líneas (por ejemplo un
+        archivo abierto), que se procesa en streaming sin cargarlo en memoria.
+        Con merge_rolling=True se colapsan las repeticiones de los subtítulos
+        automáticos.
+        """
+        if isinstance(vtt_content, str):
+            vtt_content = io.StringIO(vtt_content)
+        
         try:
-            lines = vtt_content.split('\n')
-            i = 0
-            
-            while i < len(lines):
-                line = lines[i].strip()
-                
-                # Buscar líneas de tiempo (formato: 00:00:00.000 --> 00:00:03.000)
-                if '-->' in line:
-                    time_match = re.match(r'(\d{2}:\d{2}:\d{2}\.\d{3})\s*-->\s*(\d{2}:\d{2}:\d{2}\.\d{3})', line)
-                    if time_match:
-                        start_time = time_match.group(1)
-                        end_time = time_match.group(2)
-                        
-                        # Convertir tiempo a segundos
-                        start_seconds = self._time_to_seconds(start_time)
-                        end_seconds = self._time_to_seconds(end_time)
-                        duration = end_seconds - start_seconds
-                        
-                        # Leer las líneas de texto siguiente
-                        i += 1
-                        text_lines = []
-                        while i < len(lines) and lines[i].strip() and '-->' not in lines[i]:
-                            text_line = lines[i].strip()
-                            if text_line:
-                                # Limpiar texto VTT (remover tags de tiempo y formato)
-                                clean_text = re.sub(r'<[^>]+>', '', text_line)  # Remover tags HTML
-                                clean_text = re.sub(r'<\d{2}:\d{2}:\d{2}\.\d{3}>', '', clean_text)  # Remover timestamps inline
-                                if clean_text:
-                                    text_lines.append(clean_text)
-                            i += 1
-                        
-                        # Unir el texto y crear segmento
-                        if text_lines:
-                            full_text = ' '.join(text_lines)
-                            segment = {
-                                'text': full_text.strip(),
-                                'start': start_seconds,
-                                'duration': duration,
-                                'start_formatted': start_time
-                            }
-                            
-                            if segment['text']:  # Solo agregar si hay texto
-                                transcript['segments'].append(segment)
-                                transcript['full_text'].append(segment['text'])
-                        
-                        continue
-                
-                i += 1
-            
-            transcript['full_text'] = ' '.join(transcript['full_text'])
-            return transcript
-            
+            return parse_vtt(vtt_content, merge_rolling=merge_rolling)
         except Exception as e:
             self.console.print(f'[bold red]❌ Error al procesar VTT: {str(e)}[/bold red]')
             return None
@@ -281,78 +604,226 @@ class YouTubeTranscriptExtractor:
         
         return timestamps_dir, plain_dir
 
-    def read_urls_from_file(self, file_path: str) -> List[str]:
-        """Lee URLs desde un archivo de texto."""
-        urls = []
+    def read_urls_from_file(self, file_path: str, stats: Optional[IngestStats] = None) -> List[str]:
+        """Lee URLs desde un archivo de texto (canónicas y sin repetir)."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    # Ignorar comentarios y líneas vacías
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        if 'youtube.com/watch' in line or 'youtu.be/' in line:
-                            urls.append(line)
-            return urls
+            return list(iter_video_urls(file_path, stats, allow_bare_ids=self.allow_bare_ids))
         except Exception as e:
             self.console.print(f'[bold red]❌ Error al leer el archivo: {str(e)}[/bold red]')
             return []
 
-    def process_videos_from_urls(self, urls: List[str], folder_name: str):
-        """Procesa una lista de URLs de videos."""
-        timestamps_dir, plain_dir = self.create_directory_structure('transcripts', folder_name)
+    def iter_urls_from_file(self, file_path: str, stats: Optional[IngestStats] = None) -> Iterator[str]:
+        """Lee URLs de un archivo de a una línea, para listas de millones de URLs.
+        
+        Cada URL se convierte a https://www.youtube.com/watch?v=ID y los videos
+        repetidos se descartan; stats cuenta las repeticiones a medida que se lee.
+        """
+        try:
+            yield from iter_video_urls(file_path, stats, allow_bare_ids=self.allow_bare_ids)
+        except OSError as e:
+            self.console.print(f'[bold red]❌ Error al leer el archivo: {str(e)}[/bold red]')
+
+    def _process_single_video(self, idx: int, video_url: str, timestamps_dir: str, plain_dir: str, progress=None, task=None,
+                              store: Optional[TranscriptStore] = None) -> tuple:
+        """Extrae y guarda la transcripción de un video.
+        
+        Con store la transcripción se agrega al almacén del lote en lugar de
+        escribir los dos .txt. Retorna (estado, nombre_de_archivo) con el
+        estado del manifiesto del lote.
+        """
+        transcript = self.get_transcript(video_url)
+        
+        video_title = (transcript or {}).get('title') or self.get_video_title(video_url)
+        if progress is not None:
+            progress.update(task, description=f'[bold blue]📹 {video_title[:40]}...')
+        
+        if not transcript or not transcript['segments']:
+            # Se clasifica con lo que ya vio get_transcript, sin volver a pedir la metadata
+            return (self.last_failure() if not transcript else FAILED), None
+        
+        # Crear nombre de archivo (el prefijo depende solo de la posición en la lista)
+        video_id = self.extract_video_id(video_url)
+        filename = f"{idx:03d}_{video_title}_{video_id}"
+        
+        if self.index is not None:
+            with self.metrics.stage('index'):
+                self.index.add(video_id, transcript['segments'], video_title)
+        
+        with self.metrics.stage('write'):
+            if store is not None:
+                store.put(video_id, filename, transcript, url=video_url)
+                return DONE, filename
+            
+            # Guardar con timestamps y luego el texto completo; el manifiesto solo
+            # marca el video como terminado cuando ambos archivos están completos
+            write_text_atomic(os.path.join(timestamps_dir, f"{filename}.txt"),
+                              format_timestamped_text(transcript['segments']))
+            write_text_atomic(os.path.join(plain_dir, f"{filename}.txt"), transcript['full_text'])
+        
+        return DONE, filename
+
+    def _run_video_worker(self, idx: int, video_url: str, timestamps_dir: str, plain_dir: str, manifest, progress, task,
+                          store: Optional[TranscriptStore] = None) -> bool:
+        """Envuelve _process_single_video para que un error no detenga el lote."""
+        video_id = self.extract_video_id(video_url) or video_url
+        try:
+            with self.metrics.video(video_id):
+                status, filename = self._process_single_video(idx, video_url, timestamps_dir, plain_dir, progress, task, store)
+        except Exception as e:
+            self.console.print(f'[bold red]❌ Error procesando {video_url}: {str(e)}[/bold red]')
+            status, filename = FAILED, None
+        
+        self.metrics.count(f'videos_{status}')
+        manifest.mark(video_id, status, url=video_url, file=filename)
+        return status == DONE
+
+    def process_videos_from_urls(self, urls: Iterable[str], folder_name: str, jobs: Optional[int] = None,
+                                 retry_no_captions: bool = False, requests_per_second: Optional[float] = None):
+        """Procesa una lista de URLs de videos.
+        
+        urls puede ser un generador (por ejemplo iter_playlist_urls): los videos
+        se procesan a medida que llegan y el total de la barra crece con ellos.
+        
+        Con jobs > 1 los videos se procesan en paralelo con un pool de hilos acotado.
+        El prefijo {idx:03d}_ de cada archivo se asigna según el orden de la lista,
+        por lo que los nombres son los mismos que en el modo secuencial.
+        
+        El estado de cada video se guarda en el manifiesto de la carpeta, así que
+        al repetir el mismo lote solo se procesan los videos pendientes o fallidos.
+        """
+        if self.output_format == 'bundle':
+            # Un solo archivo por lote; los .txt se pueden regenerar con transcript_store.py export
+            batch_dir = os.path.join('transcripts', folder_name)
+            timestamps_dir = os.path.join(batch_dir, 'transcripts_with_timestamps')
+            plain_dir = os.path.join(batch_dir, 'transcripts_plain')
+            store = TranscriptStore(batch_dir)
+        else:
+            timestamps_dir, plain_dir = self.create_directory_structure('transcripts', folder_name)
+            batch_dir = os.path.dirname(plain_dir)
+            store = None
+        manifest = BatchManifest(batch_dir)
         
-        total_videos = len(urls)
+        jobs = max(1, jobs if jobs is not None else self.jobs)
+        if self._replaying:
+            rate = REPLAY_RATE
+        else:
+            # La tasa por defecto depende de los hilos de este lote
+            rate = requests_per_second or self.default_rate(jobs)
+            self.rate_limiter.set_rate(rate, burst=max(RATE_LIMITER_BURST, jobs))
+        # Sin len() (generador) el total se conoce al terminar de enumerar
+        total_videos = len(urls) if isinstance(urls, (list, tuple)) else None
+        streaming = total_videos is None
         successful = 0
+        resumed = 0
+        cache_hits = self.cache.hits if self.cache is not None else 0
+        cache_misses = self.cache.misses if self.cache is not None else 0
+        stats_before = dict(self.stats)
+        throttles_before = self.rate_limiter.throttle_events
+        retries_before = self.rate_limiter.retries
+        # Métricas nuevas para cada lote
+        self.metrics = RunMetrics()
         
-        with Progress(
-            TextColumn('[bold blue]Procesando...', justify='right'),
-            BarColumn(bar_width=None),
-            '[progress.percentage]{task.percentage:>3.1f}%',
-            '•',
-            TextColumn('[bold green]{task.completed}/{task.total}'),
-            '•',
-            TimeRemainingColumn(),
-            console=self.console
-        ) as progress:
+        try:
+            with Progress(
+                TextColumn('[bold blue]Procesando...', justify='right'),
+                BarColumn(bar_width=None),
+                '[progress.percentage]{task.percentage:>3.1f}%',
+                '•',
+                TextColumn('[bold green]{task.completed}/{task.total}'),
+                '•',
+                TimeRemainingColumn(),
+                console=self.console
+            ) as progress:
             
-            task = progress.add_task('Extrayendo transcripciones', total=total_videos)
+                task = progress.add_task('Extrayendo transcripciones', total=total_videos)
             
-            for idx, video_url in enumerate(urls, 1):
-                video_title = self.get_video_title(video_url)
-                progress.update(task, description=f'[bold blue]📹 {video_title[:40]}...')
-                
-                transcript = self.get_transcript(video_url)
-                if transcript and transcript['segments']:
-                    # Crear nombre de archivo
-                    video_id = self.extract_video_id(video_url)
-                    filename = f"{idx:03d}_{video_title}_{video_id}"
-                    
-                    # Guardar texto completo
-                    with open(os.path.join(plain_dir, f"{filename}.txt"), 'w', encoding='utf-8') as f:
-                        f.write(transcript['full_text'])
-                    
-                    # Guardar con timestamps
-                    with open(os.path.join(timestamps_dir, f"{filename}.txt"), 'w', encoding='utf-8') as f:
-                        for segment in transcript['segments']:
-                            f.write(f"[{segment['start_formatted']}] {segment['text']}\n")
+                with ThreadPoolExecutor(max_workers=jobs) as executor:
+                    pending = set()
+                    enumerated = 0
+                    for idx, video_url in enumerate(urls, 1):
+                        enumerated = idx
+                        if streaming:
+                            progress.update(task, total=idx)
+                        video_id = self.extract_video_id(video_url) or video_url
+                        if manifest.is_complete(video_id, plain_dir, retry_no_captions, store):
+                            # Ya resuelto en una ejecución anterior del mismo lote
+                            if manifest.status(video_id) == DONE:
+                                successful += 1
+                            resumed += 1
+                            progress.advance(task)
+                            continue
                     
-                    successful += 1
+                        # Mantener acotado el número de tareas en vuelo
+                        if len(pending) >= jobs * 2:
+                            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                            for future in done:
+                                successful += future.result()
+                                progress.advance(task)
                     
-                progress.advance(task)
-                time.sleep(0.5)
+                        manifest.mark(video_id, PENDING, url=video_url)
+                        pending.add(executor.submit(
+                            self._run_video_worker, idx, video_url, timestamps_dir, plain_dir, manifest, progress, task, store
+                        ))
+                
+                    while pending:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            successful += future.result()
+                            progress.advance(task)
+                    total_videos = enumerated
+        
+        finally:
+            if store is not None:
+                store.close()
+            if self.raw_store is not None:
+                # Cierra el índice del almacén crudo; el próximo lote lo reabre
+                self.raw_store.close()
+            manifest.close()
+            self._write_run_metrics(batch_dir, folder_name, jobs, rate, throttles_before, retries_before)
+        
+        if not total_videos:
+            self.console.print('[bold red]❌ No se encontraron videos para procesar[/bold red]')
+            return
         
         # Mostrar resumen final
         self.console.print()
+        extra_stats = ''
+        if resumed:
+            extra_stats += f'\n   • Ya resueltos en ejecuciones anteriores: {resumed}'
+        if self.cache is not None:
+            extra_stats += (f'\n   • Caché: {self.cache.hits - cache_hits} aciertos / '
+                            f'{self.cache.misses - cache_misses} fallos')
+        throttles = self.rate_limiter.throttle_events - throttles_before
+        if throttles:
+            extra_stats += (f'\n   • Limitaciones de YouTube: {throttles} '
+                            f'({self.rate_limiter.retries - retries_before} reintentos)')
+        negotiated = self.stats['negotiated_videos'] - stats_before['negotiated_videos']
+        if negotiated:
+            requests_saved = self.stats['caption_requests_saved'] - stats_before['caption_requests_saved']
+            kb_saved = (self.stats['caption_bytes_saved'] - stats_before['caption_bytes_saved']) / 1024
+            extra_stats += (f'\n   • Subtítulos: {requests_saved} descargas evitadas '
+                            f'({requests_saved / negotiated:.1f}/video, ~{kb_saved / negotiated:.0f} KB/video)')
+        video_times = self.metrics.summary().get('video')
+        if video_times:
+            extra_stats += (f'\n   • Tiempo por video: {video_times["p50"]:.1f} s mediana / '
+                            f'{video_times["p95"]:.1f} s p95')
+        if store is not None:
+            saved_to = f'''📦 Transcripciones guardadas en:
+   • {store.path}
+   • Para generar los .txt: python transcript_store.py export {batch_dir}'''
+        else:
+            saved_to = f'''📁 Archivos guardados en:
+   • Texto plano: {plain_dir}
+   • Con timestamps: {timestamps_dir}'''
+        saved_to += f'\n   • Tiempos por etapa: {os.path.join(batch_dir, REPORT_NAME)}'
         if successful == total_videos:
             success_text = f'''[bold green]✅ ¡Procesamiento completado exitosamente!
 
 📊 Estadísticas:
    • Videos procesados: {successful}/{total_videos}
-   • Éxito: 100%
+   • Éxito: 100%{extra_stats}
 
-📁 Archivos guardados en:
-   • Texto plano: {plain_dir}
-   • Con timestamps: {timestamps_dir}'''
+{saved_to}'''
             self.console.print(Panel(success_text, title='[bold green]🎉 Éxito Total', border_style='green'))
         else:
             warning_text = f'''[bold yellow]⚠️  Procesamiento completado con algunos errores
@@ -360,13 +831,30 @@ class YouTubeTranscriptExtractor:
 📊 Estadísticas:
    • Videos procesados: {successful}/{total_videos}
    • Éxito: {(successful/total_videos)*100:.1f}%
-   • Errores: {total_videos-successful}
+   • Errores: {total_videos-successful}{extra_stats}
 
-📁 Archivos guardados en:
-   • Texto plano: {plain_dir}
-   • Con timestamps: {timestamps_dir}'''
+{saved_to}'''
             self.console.print(Panel(warning_text, title='[bold yellow]⚠️  Procesamiento Completado', border_style='yellow'))
 
+    def _write_run_metrics(self, batch_dir: str, folder_name: str, jobs: int, rate: float,
+                           throttles_before: int, retries_before: int):
+        """Guarda el reporte JSON y las métricas de Prometheus del lote.
+        
+        jobs y rate son los del lote (el menú los elige por lote, no al crear el extractor).
+        """
+        metrics = self.metrics
+        metrics.count('retries', self.rate_limiter.retries - retries_before)
+        metrics.count('throttle_events', self.rate_limiter.throttle_events - throttles_before)
+        try:
+            metrics.write_json(os.path.join(batch_dir, REPORT_NAME), batch=folder_name,
+                               jobs=jobs, backend=self.backend.name, requests_per_second=rate)
+            labels = {'batch': folder_name}
+            metrics.write_prometheus(os.path.join(batch_dir, PROMETHEUS_NAME), labels)
+            if self.metrics_textfile:
+                metrics.write_prometheus(self.metrics_textfile, labels)
+        except OSError as e:
+            self.console.print(f'[yellow]⚠️ No se pudieron guardar las métricas: {str(e)}[/yellow]')
+
     def validate_youtube_url(self, url: str) -> bool:
         """Valida si una URL es de YouTube."""
         youtube_patterns = [
@@ -377,18 +865,24 @@ class YouTubeTranscriptExtractor:
         ]
         return any(re.search(pattern, url) for pattern in youtube_patterns)
     
-    def get_playlist_urls(self, playlist_url: str) -> List[str]:
-        """Extrae URLs de videos de una playlist usando youtube_extractor_list.py"""
+    def iter_playlist_urls(self, playlist_url: str) -> Iterator[str]:
+        """Genera las URLs de los videos de una playlist a medida que se enumeran.
+        
+        La enumeración es plana (no se extrae cada video) y avanza página por
+        página, así que el procesamiento puede empezar con la primera página.
+        Los títulos de la playlist quedan en la caché de títulos.
+        """
         try:
-            from youtube_extractor_list import extract_playlist_urls
-            import tempfile
-            
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as tmp_file:
-                extract_playlist_urls(playlist_url, tmp_file.name)
-                return self.read_urls_from_file(tmp_file.name)
+            for entry in self.backend.iter_playlist_entries(playlist_url):
+                if entry.get('title'):
+                    self.remember_title(entry['id'], entry['title'])
+                yield f'https://www.youtube.com/watch?v={entry["id"]}'
         except Exception as e:
             self.console.print(f'[bold red]❌ Error al extraer playlist: {str(e)}[/bold red]')
-            return []
+
+    def get_playlist_urls(self, playlist_url: str) -> List[str]:
+        """Extrae todas las URLs de videos de una playlist."""
+        return list(self.iter_playlist_urls(playlist_url))
     
     def show_welcome(self):
         """Muestra la pantalla de bienvenida."""
@@ -428,7 +922,13 @@ def show_menu(extractor):
     return choice
 
 def main():
-    extractor = YouTubeTranscriptExtractor()
+    parser = argparse.ArgumentParser(description='YouTube Transcript Extractor')
+    parser.add_argument('--rate', type=float,
+                        help=f'Peticiones por segundo a YouTube (por defecto {REQUESTS_PER_SECOND_PER_JOB:g} por hilo)')
+    parser.add_argument('--keep-raw', nargs='?', const=DEFAULT_RAW_PATH, metavar='DIR',
+                        help=f'Guardar los subtítulos originales para raw_captions.py (por defecto en {DEFAULT_RAW_PATH})')
+    args = parser.parse_args()
+    extractor = YouTubeTranscriptExtractor(requests_per_second=args.rate, raw_captions_path=args.keep_raw)
     
     try:
         extractor.show_welcome()
@@ -443,6 +943,7 @@ def main():
             
             urls = []
             folder_name = ''
+            ingest = None
             
             if choice == '1':
                 # Video individual
@@ -475,26 +976,26 @@ def main():
                     extractor.console.print('[dim]💡 Asegúrate de que el archivo existe y contiene URLs de YouTube, una por línea.[/dim]')
                     continue
                     
-                urls = extractor.read_urls_from_file(file_path)
-                if not urls:
+                # El archivo se lee de a una línea mientras se procesa; solo se
+                # adelantan las primeras URLs para mostrarlas
+                ingest = IngestStats()
+                file_urls = extractor.iter_urls_from_file(file_path, ingest)
+                preview = list(itertools.islice(file_urls, 6))
+                if not preview:
                     extractor.console.print('[bold red]❌ No se encontraron URLs válidas en el archivo[/bold red]')
                     continue
                 
-                extractor.console.print(f'[green]✅ Se encontraron {len(urls)} URLs válidas[/green]')
+                extractor.console.print('[green]✅ URLs válidas encontradas. Primeros videos:[/green]')
+                for i, url in enumerate(preview[:5], 1):
+                    title = extractor.get_video_title(url)
+                    extractor.console.print(f'   {i}. {title[:60]}...')
+                if len(preview) > 5:
+                    extractor.console.print('[dim]   ... el resto se lee mientras se extraen las transcripciones[/dim]')
                 
-                # Mostrar preview de las primeras URLs
-                if len(urls) <= 5:
-                    for i, url in enumerate(urls, 1):
-                        title = extractor.get_video_title(url)
-                        extractor.console.print(f'   {i}. {title[:60]}...')
-                else:
-                    for i in range(5):
-                        title = extractor.get_video_title(urls[i])
-                        extractor.console.print(f'   {i+1}. {title[:60]}...')
-                    extractor.console.print(f'   ... y {len(urls)-5} videos más')
-                
-                if not Confirm.ask(f'\n¿Procesar estos {len(urls)} videos?'):
+                if not Confirm.ask('\n¿Procesar todos los videos del archivo?'):
+                    file_urls.close()
                     continue
+                urls = preview if len(preview) <= 5 else itertools.chain(preview, file_urls)
                     
                 folder_name = Prompt.ask('[yellow]Nombre de la carpeta para las transcripciones[/yellow]', default='transcripts_batch')
                 
@@ -507,24 +1008,21 @@ def main():
                     
                     if 'playlist?list=' in playlist_url:
                         extractor.console.print('[blue]🔍 Extrayendo videos de la playlist...[/blue]')
-                        urls = extractor.get_playlist_urls(playlist_url)
+                        # Solo se espera la primera página; el resto se enumera durante el procesamiento
+                        playlist_urls = extractor.iter_playlist_urls(playlist_url)
+                        preview = list(itertools.islice(playlist_urls, 3))
                         
-                        if urls:
-                            extractor.console.print(f'[green]✅ Se encontraron {len(urls)} videos en la playlist[/green]')
+                        if preview:
+                            extractor.console.print('[green]✅ Playlist encontrada. Primeros videos:[/green]')
+                            for i, url in enumerate(preview, 1):
+                                title = extractor.get_video_title(url)
+                                extractor.console.print(f'   {i}. {title[:60]}...')
+                            extractor.console.print('[dim]   ... el resto se enumera mientras se extraen las transcripciones[/dim]')
                             
-                            # Mostrar preview de algunos videos
-                            if len(urls) <= 3:
-                                for i, url in enumerate(urls, 1):
-                                    title = extractor.get_video_title(url)
-                                    extractor.console.print(f'   {i}. {title[:60]}...')
-                            else:
-                                for i in range(3):
-                                    title = extractor.get_video_title(urls[i])
-                                    extractor.console.print(f'   {i+1}. {title[:60]}...')
-                                extractor.console.print(f'   ... y {len(urls)-3} videos más')
-                            
-                            if Confirm.ask(f'\n¿Procesar estos {len(urls)} videos de la playlist?'):
+                            if Confirm.ask('\n¿Procesar todos los videos de la playlist?'):
+                                urls = itertools.chain(preview, playlist_urls)
                                 break
+                            playlist_urls.close()
                         else:
                             extractor.console.print('[bold red]❌ No se pudieron extraer videos de la playlist[/bold red]')
                             if not Confirm.ask('¿Intentar con otra URL de playlist?'):
@@ -539,15 +1037,16 @@ def main():
             elif choice == '4':
                 # Buscar en código HTML
                 extractor.console.print('\n[bold cyan]🔍 Búsqueda en código HTML[/bold cyan]')
-                extractor.console.print('[dim]Esta opción busca URLs de YouTube en el archivo "codigo_fuente.txt"[/dim]')
+                extractor.console.print('[dim]Esta opción busca URLs de YouTube en el archivo "codigo_fuente.txt" '
+                                        '(o en otro archivo, una carpeta o un patrón glob)[/dim]')
                 
                 if not os.path.exists('codigo_fuente.txt'):
                     extractor.console.print('[bold red]❌ No se encontró el archivo "codigo_fuente.txt"[/bold red]')
                     extractor.console.print('[dim]💡 Crea el archivo "codigo_fuente.txt" y pega el código HTML que contiene los videos.[/dim]')
                     
                     if Confirm.ask('¿Quieres usar otro archivo?'):
-                        html_file = Prompt.ask('[yellow]Nombre del archivo HTML[/yellow]')
-                        if not os.path.exists(html_file):
+                        html_file = Prompt.ask('[yellow]Archivo, carpeta o patrón (ej: paginas/*.html)[/yellow]')
+                        if not os.path.exists(html_file) and not glob.has_magic(html_file):
                             extractor.console.print(f'[bold red]❌ No se encontró el archivo: {html_file}[/bold red]')
                             continue
                     else:
@@ -558,12 +1057,34 @@ def main():
                 extractor.console.print('[blue]🔍 Buscando URLs de YouTube en el código...[/blue]')
                 
                 try:
-                    from yt_url_finder import extract_youtube_urls
+                    from yt_url_finder import extract_youtube_urls_from_file, discover_urls
                     
-                    with open(html_file, 'r', encoding='utf-8') as f:
-                        html_content = f.read()
+                    video_info = {}
+                    if os.path.isfile(html_file):
+                        # El archivo se recorre por bloques sin cargarlo completo en memoria
+                        found_urls = extract_youtube_urls_from_file(html_file, video_info)
+                    else:
+                        # Carpeta o patrón: los archivos se procesan en paralelo en varios procesos.
+                        # La lista se guarda en transcripts/ y no se pisa una anterior sin preguntar
+                        os.makedirs('transcripts', exist_ok=True)
+                        urls_file = os.path.join('transcripts', 'video_urls_encontradas.txt')
+                        if os.path.exists(urls_file) and not Confirm.ask(f'¿Sobrescribir {urls_file}?'):
+                            urls_file = Prompt.ask(
+                                '[yellow]Archivo para las URLs encontradas[/yellow]',
+                                default=os.path.join('transcripts', f'video_urls_encontradas_{time.strftime("%Y%m%d_%H%M%S")}.txt'))
+                        stats = discover_urls([html_file], urls_file)
+                        extractor.console.print(
+                            f"[dim]{stats['files']} archivos en {stats['elapsed']:.1f} s "
+                            f"({stats['files'] / max(stats['elapsed'], 1e-9):.1f} archivos/s), "
+                            f"URLs guardadas en {urls_file}[/dim]")
+                        found_urls = extractor.read_urls_from_file(urls_file)
+                        video_info = {video_id: {'title': title, 'duration': None}
+                                      for video_id, title in stats['titles'].items()}
                     
-                    found_urls = extract_youtube_urls(html_content)
+                    # Los títulos de ytInitialData evitan consultarlos después
+                    for video_id, info in video_info.items():
+                        if info['title']:
+                            extractor.remember_title(video_id, info['title'])
                     
                     if found_urls:
                         extractor.console.print(f'[green]✅ Se encontraron {len(found_urls)} URLs de YouTube[/green]')
@@ -572,7 +1093,12 @@ def main():
                         preview_count = min(5, len(found_urls))
                         for i in range(preview_count):
                             video_id = extractor.extract_video_id(found_urls[i])
-                            extractor.console.print(f'   {i+1}. Video ID: {video_id}')
+                            info = video_info.get(video_id)
+                            if info and info['title']:
+                                duration = f" ({format_vtt_time(info['duration'])[:8]})" if info['duration'] is not None else ''
+                                extractor.console.print(f'   {i+1}. {info["title"][:60]}{duration}')
+                            else:
+                                extractor.console.print(f'   {i+1}. Video ID: {video_id}')
                         
                         if len(found_urls) > 5:
                             extractor.console.print(f'   ... y {len(found_urls)-5} videos más')
@@ -596,8 +1122,22 @@ def main():
             
             # Procesar los videos
             if urls and folder_name:
-                extractor.console.print(f'\n[bold green]🚀 Iniciando extracción de {len(urls)} video(s)...[/bold green]')
-                extractor.process_videos_from_urls(urls, folder_name)
+                jobs = 1
+                rate = None
+                if not isinstance(urls, list) or len(urls) > 1:
+                    jobs = IntPrompt.ask('[yellow]Videos a procesar en paralelo[/yellow]', default=4)
+                    rate = FloatPrompt.ask('[yellow]Peticiones por segundo a YouTube[/yellow]',
+                                           default=extractor.default_rate(jobs))
+                
+                if isinstance(urls, list):
+                    count = f'{len(urls)} video(s)'
+                else:
+                    count = 'los videos del archivo' if ingest is not None else 'los videos de la playlist'
+                extractor.console.print(f'\n[bold green]🚀 Iniciando extracción de {count}...[/bold green]')
+                extractor.process_videos_from_urls(urls, folder_name, jobs=jobs, requests_per_second=rate)
+                if ingest is not None and (ingest.duplicates or ingest.invalid):
+                    extractor.console.print(f'[dim]🔁 URLs repetidas descartadas: {ingest.duplicates} • '
+                                            f'líneas sin URL de video: {ingest.invalid}[/dim]')
                 
                 # Pausa antes de regresar al menú
                 extractor.console.print('\n[dim]⏸️  Presiona Enter para regresar al menú principal...[/dim]')
@@ -0,0 +1,281 @@
+"""
+Backends para ejecutar yt-dlp.
+
+- YtDlpApiBackend: usa la API de Python (yt_dlp.YoutubeDL) con una instancia
+  reutilizada por hilo, evitando arrancar un intérprete nuevo en cada llamada.
+- SubprocessBackend: ejecuta el comando `yt-dlp` como antes. Se usa como
+  respaldo cuando el módulo yt_dlp no se puede importar.
+
+Ambos pasan cada llamada por el RateLimiter compartido (si se indica) y la
+reintentan cuando el error de yt-dlp indica que YouTube está limitando.
+"""
+
+import json
+import subprocess
+import tempfile
+import threading
+from importlib.util import find_spec
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from rate_limiter import RateLimiter, is_throttle_text
+
+# Entradas por página de una playlist de YouTube (cada continuación trae hasta 100)
+PLAYLIST_PAGE_SIZE = 100
+
+
+class _Backend:
+    """Base común: aplica el limitador de peticiones y los reintentos."""
+
+    def __init__(self, rate_limiter: Optional[RateLimiter] = None):
+        self.rate_limiter = rate_limiter
+
+    def _limited(self, call: Callable[[], Tuple[bool, object, str]]):
+        """Ejecuta call() -> (ok, valor, texto_de_error) respetando el limitador.
+
+        Si el error es una limitación de YouTube se avisa al limitador (que
+        pausa todas las peticiones) y se reintenta.
+        """
+        limiter = self.rate_limiter
+        attempts = 1 + (limiter.max_retries if limiter else 0)
+        for attempt in range(attempts):
+            if limiter:
+                limiter.acquire()
+            ok, value, error_text = call()
+            if not limiter:
+                return value
+            if ok:
+                limiter.report_success()
+                return value
+            if not is_throttle_text(error_text):
+                return value
+            limiter.report_throttle()
+            if attempt + 1 < attempts:
+                limiter.count_retry()
+        return value
+
+
+class SubprocessBackend(_Backend):
+    """Ejecuta yt-dlp como proceso externo (un proceso por llamada)."""
+
+    name = 'subprocess'
+
+    def __init__(self, executable: str = 'yt-dlp', rate_limiter: Optional[RateLimiter] = None):
+        super().__init__(rate_limiter)
+        self.executable = executable
+
+    def extract_info(self, video_url: str) -> Optional[dict]:
+        """Obtiene la metadata del video (equivalente a --dump-json)."""
+        cmd = [self.executable, '--dump-json', '--no-download', video_url]
+
+        def call():
+            result = subprocess.run(cmd, capture_output=True, text=True)
+            if result.returncode != 0:
+                return False, None, result.stderr
+            return True, json.loads(result.stdout), ''
+
+        return self._limited(call)
+
+    def download_subtitles(self, video_url: str, languages: List[str], output_dir: str) -> bool:
+        """Descarga subtítulos (manuales y automáticos) en output_dir."""
+        cmd = [
+            self.executable,
+            '--write-auto-sub',
+            '--write-sub',
+            '--skip-download',
+            '--sub-lang', ','.join(languages),
+            '--output', f'{output_dir}/%(title)s.%(ext)s',
+            video_url
+        ]
+
+        def call():
+            result = subprocess.run(cmd, capture_output=True, text=True, cwd=output_dir)
+            return result.returncode == 0, result.returncode == 0, result.stderr
+
+        return self._limited(call)
+
+    def iter_playlist_entries(self, playlist_url: str) -> Iterator[dict]:
+        """Enumera los videos de una playlist a medida que yt-dlp lee cada página.
+
+        Usa --flat-playlist (sin extraer cada video) y --lazy-playlist, y lee la
+        salida línea por línea. Genera dicts {'id', 'title'}.
+
+        Las peticiones del proceso no pasan por el limitador, así que se toma
+        una ficha por cada página de PLAYLIST_PAGE_SIZE entradas leídas: con
+        --lazy-playlist yt-dlp no pide la página siguiente mientras no se
+        consuma la salida (salvo lo que entra en el buffer del pipe).
+        """
+        cmd = [
+            self.executable,
+            '--flat-playlist',
+            '--lazy-playlist',
+            '--print', '%(id)s\t%(title)s',
+            playlist_url
+        ]
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+
+        with tempfile.TemporaryFile(mode='w+') as stderr:
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr, text=True)
+            try:
+                count = 0
+                for line in process.stdout:
+                    video_id, _, title = line.rstrip('\n').partition('\t')
+                    if video_id and video_id != 'NA':
+                        count += 1
+                        if self.rate_limiter and count % PLAYLIST_PAGE_SIZE == 0:
+                            self.rate_limiter.acquire()
+                        yield {'id': video_id, 'title': title if title != 'NA' else None}
+                returncode = process.wait()
+            finally:
+                # Si se deja de consumir el generador, no dejar el proceso vivo
+                if process.poll() is None:
+                    process.kill()
+                    process.wait()
+                process.stdout.close()
+
+            if returncode != 0:
+                stderr.seek(0)
+                error_text = stderr.read()
+                if self.rate_limiter and is_throttle_text(error_text):
+                    self.rate_limiter.report_throttle()
+                raise RuntimeError(error_text.strip().splitlines()[-1] if error_text.strip()
+                                   else f'yt-dlp terminó con código {returncode}')
+
+
+class _QuietLogger:
+    """Logger para YoutubeDL que descarta la salida (igual que capture_output)."""
+
+    def debug(self, msg):
+        pass
+
+    def warning(self, msg):
+        pass
+
+    def error(self, msg):
+        pass
+
+
+class YtDlpApiBackend(_Backend):
+    """Usa yt_dlp.YoutubeDL en el mismo proceso.
+
+    Cada hilo mantiene su propia instancia de YoutubeDL (no es seguro
+    compartirla entre hilos), que se crea una sola vez y se reutiliza
+    para todos los videos que procesa ese hilo.
+
+    El módulo yt_dlp se importa en la primera llamada, no al crear el backend,
+    para no demorar el arranque de la aplicación.
+    """
+
+    name = 'api'
+
+    def __init__(self, rate_limiter: Optional[RateLimiter] = None):
+        if find_spec('yt_dlp') is None:
+            raise ImportError("No se encontró el módulo 'yt_dlp'")
+        super().__init__(rate_limiter)
+        self._module = None
+        self._local = threading.local()
+
+    @property
+    def _yt_dlp(self):
+        if self._module is None:
+            import yt_dlp
+            self._module = yt_dlp
+        return self._module
+
+    def _new_ydl(self):
+        return self._yt_dlp.YoutubeDL({
+            'quiet': True,
+            'no_warnings': True,
+            'logger': _QuietLogger(),
+            'noprogress': True,
+            'skip_download': True,
+            'writesubtitles': True,
+            'writeautomaticsub': True,
+            'outtmpl': '%(title)s.%(ext)s',
+        })
+
+    def _get_ydl(self):
+        ydl = getattr(self._local, 'ydl', None)
+        if ydl is None:
+            ydl = self._local.ydl = self._new_ydl()
+        return ydl
+
+    def _playlist_ydl(self):
+        """Instancia propia para enumerar una playlist: cada petición HTTP de
+        yt-dlp (la primera página y cada continuación) toma una ficha del
+        limitador."""
+        ydl = self._new_ydl()
+        limiter = self.rate_limiter
+        if limiter:
+            urlopen = ydl.urlopen
+
+            def limited_urlopen(*args, **kwargs):
+                limiter.acquire()
+                return urlopen(*args, **kwargs)
+
+            ydl.urlopen = limited_urlopen
+        return ydl
+
+    def extract_info(self, video_url: str) -> Optional[dict]:
+        """Obtiene la metadata del video sin descargar nada."""
+        ydl = self._get_ydl()
+
+        def call():
+            try:
+                info = ydl.extract_info(video_url, download=False)
+            except self._yt_dlp.utils.DownloadError as e:
+                return False, None, str(e)
+            return True, ydl.sanitize_info(info), ''
+
+        return self._limited(call)
+
+    def download_subtitles(self, video_url: str, languages: List[str], output_dir: str) -> bool:
+        """Descarga subtítulos (manuales y automáticos) en output_dir."""
+        ydl = self._get_ydl()
+        # La instancia es del hilo actual, así que se puede ajustar por llamada
+        ydl.params['subtitleslangs'] = list(languages)
+        ydl.params['paths'] = {'home': output_dir}
+
+        def call():
+            try:
+                ydl.extract_info(video_url, download=True)
+            except self._yt_dlp.utils.DownloadError as e:
+                return False, False, str(e)
+            return True, True, ''
+
+        return self._limited(call)
+
+    def iter_playlist_entries(self, playlist_url: str) -> Iterator[dict]:
+        """Enumera los videos de una playlist a medida que yt-dlp lee cada página.
+
+        Con process=False el extractor devuelve las entradas planas (sin extraer
+        cada video) en un generador que pide la siguiente página solo cuando se
+        consume la anterior. Genera dicts {'id', 'title'}. Cada página pasa por
+        el limitador (ver _playlist_ydl).
+        """
+        ydl = self._playlist_ydl()
+
+        try:
+            info = ydl.extract_info(playlist_url, download=False, process=False)
+            if info and info.get('_type') == 'url':
+                # URLs que redirigen a la playlist (por ejemplo watch?v=...&list=...)
+                info = ydl.extract_info(info['url'], download=False, process=False)
+            for entry in (info or {}).get('entries') or ():
+                if entry and entry.get('id'):
+                    yield {'id': entry['id'], 'title': entry.get('title')}
+        except self._yt_dlp.utils.DownloadError as e:
+            if self.rate_limiter and is_throttle_text(str(e)):
+                self.rate_limiter.report_throttle()
+            raise RuntimeError(str(e)) from e
+
+
+def create_backend(name: str = 'auto', rate_limiter: Optional[RateLimiter] = None):
+    """Crea el backend pedido: 'api', 'subprocess' o 'auto' (API si está disponible)."""
+    if name == 'subprocess':
+        return SubprocessBackend(rate_limiter=rate_limiter)
+    try:
+        return YtDlpApiBackend(rate_limiter=rate_limiter)
+    except ImportError:
+        if name == 'api':
+            raise
+        return SubprocessBackend(rate_limiter=rate_limiter)
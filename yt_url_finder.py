@@ -1,109 +1,236 @@
 import re
 import os
+import sys
+import glob
 import json
-from bs4 import BeautifulSoup
+import mmap
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from urllib.parse import urljoin, urlparse, parse_qs
 
-def extract_video_id_from_text(text):
-    """
-    Extrae IDs de videos de YouTube de cualquier texto.
+# Un ID de video tiene 11 caracteres. Se captura dentro de un lookahead para que
+# cada coincidencia consuma solo su prefijo y no oculte la siguiente.
+_ID = r'(?=([\w-]{11}))'
+
+# Prefijos que preceden a un ID. Los patrones anteriores (videoRenderer,
+# watchEndpoint, richItemRenderer.*?videoId, /watch\\?v=, "url": "...", etc.)
+# terminaban siempre en uno de estos, así que encuentran los mismos IDs.
+_ID_ALTERNATIVES = [
+    # URL directa
+    r'(?:youtube\.com/(?:watch\?v=|embed/|v/)|youtu\.be/)' + _ID,
+    r'v=' + _ID,
+    # JSON ("videoId": "...") y JSON escapado dentro de strings (videoId\":\"...)
+    r'"videoId"\s*:\s*"(?=([\w-]{11})")',
+    r'videoId\\?":\\?"' + _ID,
+    # Datos serializados
+    r'serializedShareEntity\\?":\\?"video_' + _ID,
+]
+
+# Una sola pasada sobre el texto con todas las alternativas
+VIDEO_ID_RE = re.compile('|'.join(_ID_ALTERNATIVES))
+
+# En HTML también se buscan los atributos data-video-id="..."
+HTML_VIDEO_ID_RE = re.compile('|'.join(
+    _ID_ALTERNATIVES + [r'(?i:data-video-id)\s*=\s*["\']?(?=([\w-]{11})["\'\s/>])']
+))
+
+# Las mismas alternativas sobre bytes, para recorrer archivos mapeados en memoria
+# (en bytes \w y \s son solo ASCII, que es lo que puede tener un ID)
+VIDEO_ID_BYTES_RE = re.compile(VIDEO_ID_RE.pattern.encode('ascii'))
+HTML_VIDEO_ID_BYTES_RE = re.compile(HTML_VIDEO_ID_RE.pattern.encode('ascii'))
+
+# Inicio del objeto ytInitialData; el final lo determina el decodificador JSON
+_YT_INITIAL_DATA_RE = re.compile(r'(?:var |window\[")ytInitialData"?\]?\s*=\s*(?={)')
+_YT_INITIAL_DATA_BYTES_RE = re.compile(_YT_INITIAL_DATA_RE.pattern.encode('ascii'))
+_JSON_DECODER = json.JSONDecoder()
+
+# Claves de ytInitialData cuyo valor describe un video (videoId, título, duración)
+RENDERER_KEYS = frozenset([
+    'videoRenderer', 'gridVideoRenderer', 'compactVideoRenderer', 'playlistVideoRenderer',
+    'playlistPanelVideoRenderer', 'endScreenVideoRenderer', 'reelItemRenderer',
+    'videoWithContextRenderer', 'richItemRenderer', 'watchEndpoint',
+])
+
+_FULL_ID_RE = re.compile(r'[\w-]{11}')
+
+# Lectura por bloques de archivos grandes. El solapamiento debe ser mayor que la
+# coincidencia más larga para no perder IDs que crucen el borde de un bloque.
+CHUNK_SIZE = 8 * 1024 * 1024
+CHUNK_OVERLAP = 64 * 1024
+
+# Tamaño máximo de un bloque ytInitialData que se decodifica al leer un archivo
+# (decodificado ocupa varias veces su tamaño). Los IDs sin escapes de uno más
+# grande los encuentra igual la búsqueda por bloques; solo se pierden los
+# títulos, las duraciones y los IDs escapados de ese bloque
+MAX_INITIAL_DATA_BYTES = 2 * 1024 * 1024
+
+# Extensiones que se buscan al recorrer una carpeta
+DISCOVERY_EXTENSIONS = ('.html', '.htm', '.txt', '.json', '.mhtml')
+
+
+def _scan(pattern, text, video_ids):
+    for match in pattern.finditer(text):
+        video_ids.add(match.group(match.lastindex))
+
+
+def _renderer_text(value):
+    """Texto de un campo de YouTube ({'simpleText': ...} o {'runs': [...]})."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        if 'simpleText' in value:
+            return value['simpleText']
+        runs = value.get('runs')
+        if isinstance(runs, list):
+            return ''.join(run.get('text', '') for run in runs if isinstance(run, dict))
+    return None
+
+
+def _renderer_duration(renderer):
+    """Duración en segundos a partir de lengthSeconds o lengthText ("1:02:03")."""
+    seconds = renderer.get('lengthSeconds')
+    if seconds is not None:
+        try:
+            return int(seconds)
+        except (TypeError, ValueError):
+            pass
+    text = _renderer_text(renderer.get('lengthText'))
+    if text:
+        try:
+            total = 0
+            for part in text.split(':'):
+                total = total * 60 + int(part)
+            return total
+        except ValueError:
+            pass
+    return None
+
+
+def walk_initial_data(data, video_ids, video_info=None):
     """
-    # Patrones para encontrar IDs de videos
-    video_ids = set()
+    Recorre ytInitialData (ya decodificado) y agrega los IDs de video.
     
-    # Buscar en objetos JSON y texto normal
-    patterns = [
-        # Patrones de URL directa
-        r'(?:youtube\.com/(?:watch\?v=|embed/|v/)|youtu\.be/)([\w-]{11})',
-        r'v=([\w-]{11})',
-        # Patrones de JSON y datos estructurados
-        r'\"videoId\"\s*:\s*\"([\w-]{11})\"',
-        r'\"videoRenderer\"\s*:\s*{[^}]*\"videoId\"\s*:\s*\"([\w-]{11})\"',
-        r'\"watchEndpoint\"\s*:\s*{[^}]*\"videoId\"\s*:\s*\"([\w-]{11})\"',
-        r'\"videoPrimaryInfoRenderer[^}]*\"videoId\"\s*:\s*\"([\w-]{11})\"',
-        # Patrones escapados
-        r'/watch\\?v=([\w-]{11})',
-        r'videoId\\?":\\?"([\w-]{11})',
-        # Patrones de URL con comillas
-        r'\"url\":\s*\"[^\"]*(?:youtube\.com/(?:watch\?v=|embed/|v/)|youtu\.be/)([\w-]{11})\"',
-        # Patrones específicos de la página
-        r'richItemRenderer.*?videoId\\?":\\?"([\w-]{11})',
-        r'gridVideoRenderer.*?videoId\\?":\\?"([\w-]{11})',
-        r'playlistVideoRenderer.*?videoId\\?":\\?"([\w-]{11})',
-        r'compactVideoRenderer.*?videoId\\?":\\?"([\w-]{11})',
-        r'endScreenVideoRenderer.*?videoId\\?":\\?"([\w-]{11})',
-        # Búsqueda en datos serializados
-        r'serializedShareEntity\\?":\\?"video_([\w-]{11})',
-        r'watchEndpoint\\?":{[^}]*\\?"videoId\\?":\\?"([\w-]{11})',
-    ]
-    
-    for pattern in patterns:
-        # Usar re.DOTALL para que el punto coincida con saltos de línea
-        matches = re.finditer(pattern, text, re.DOTALL)
-        for match in matches:
-            video_id = match.group(1)
-            if video_id and len(video_id) == 11:  # Los IDs de YouTube tienen 11 caracteres
+    El recorrido es iterativo. Los renderers conocidos aportan además el
+    título y la duración, que se guardan en video_info[id] si se indica.
+    También se revisan los strings con URLs (por ejemplo /watch?v=...).
+    """
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            video_id = node.get('videoId')
+            if isinstance(video_id, str) and _FULL_ID_RE.fullmatch(video_id):
                 video_ids.add(video_id)
-    
-    # Buscar en estructuras JSON
+            for key, value in node.items():
+                if key in RENDERER_KEYS and isinstance(value, dict) and video_info is not None:
+                    renderer_id = value.get('videoId')
+                    if isinstance(renderer_id, str) and _FULL_ID_RE.fullmatch(renderer_id):
+                        info = video_info.setdefault(renderer_id, {'title': None, 'duration': None})
+                        if info['title'] is None:
+                            info['title'] = _renderer_text(value.get('title') or value.get('headline'))
+                        if info['duration'] is None:
+                            info['duration'] = _renderer_duration(value)
+                if isinstance(value, (dict, list)):
+                    stack.append(value)
+                elif isinstance(value, str) and ('v=' in value or 'youtu' in value or 'videoId' in value):
+                    _scan(VIDEO_ID_RE, value, video_ids)
+        elif isinstance(node, list):
+            for value in node:
+                if isinstance(value, (dict, list)):
+                    stack.append(value)
+                elif isinstance(value, str) and ('v=' in value or 'youtu' in value or 'videoId' in value):
+                    _scan(VIDEO_ID_RE, value, video_ids)
+
+
+def _walk_initial_data_at(text, index, video_ids, video_info):
+    """Decodifica el objeto JSON que empieza en text[index] y lo recorre."""
     try:
-        # Encontrar objetos JSON en el texto
-        json_matches = re.finditer(r'var ytInitialData = ({.*?});', text, re.DOTALL)
-        for json_match in json_matches:
-            try:
-                json_data = json.loads(json_match.group(1))
-                # Convertir el JSON a texto y buscar IDs
-                json_text = json.dumps(json_data)
-                for pattern in patterns:
-                    matches = re.finditer(pattern, json_text)
-                    for match in matches:
-                        video_id = match.group(1)
-                        if video_id and len(video_id) == 11:
-                            video_ids.add(video_id)
-            except:
-                continue
-    except:
-        pass
-    
-    return video_ids
+        data, _ = _JSON_DECODER.raw_decode(text, index)
+    except (ValueError, RecursionError):
+        return
+    walk_initial_data(data, video_ids, video_info)
 
-def extract_youtube_urls(html_content):
+
+def extract_video_id_from_text(text, pattern=VIDEO_ID_RE, video_info=None):
     """
-    Extrae todas las URLs de videos de YouTube de un contenido HTML.
+    Extrae IDs de videos de YouTube de cualquier texto.
+    
+    Si se pasa video_info (dict), se completa con {id: {'title', 'duration'}}
+    para los videos descritos en ytInitialData.
     """
     video_ids = set()
+    _scan(pattern, text, video_ids)
     
-    # Extraer IDs directamente del HTML completo
-    ids_from_html = extract_video_id_from_text(html_content)
-    video_ids.update(ids_from_html)
+    # Dentro de ytInitialData los IDs pueden venir con escapes (\u003d, ...), así
+    # que el objeto se decodifica y se recorre
+    for match in _YT_INITIAL_DATA_RE.finditer(text):
+        _walk_initial_data_at(text, match.end(), video_ids, video_info)
     
-    # Parsear el HTML
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
-    # Buscar en scripts
-    for script in soup.find_all('script'):
-        if script.string:
-            ids_from_script = extract_video_id_from_text(script.string)
-            video_ids.update(ids_from_script)
+    return video_ids
+
+def iter_video_ids_in_file(path, html=True, chunk_size=CHUNK_SIZE, overlap=CHUNK_OVERLAP, video_info=None,
+                           max_initial_data=MAX_INITIAL_DATA_BYTES):
+    """
+    Genera los IDs de video de un archivo a medida que los encuentra.
     
-    # Buscar en atributos específicos
-    for element in soup.find_all(attrs={"data-video-id": True}):
-        video_id = element.get('data-video-id')
-        if video_id and len(video_id) == 11:
-            video_ids.add(video_id)
+    El archivo se mapea en memoria y se recorre en bloques solapados, así que
+    la memoria usada no depende del tamaño del archivo. Cada ID se genera una
+    sola vez. Los bloques ytInitialData de más de max_initial_data bytes (o
+    sin </script>) no se decodifican.
+    """
+    pattern = HTML_VIDEO_ID_BYTES_RE if html else VIDEO_ID_BYTES_RE
+    seen = set()
     
-    # Buscar en atributos href que contengan IDs de video
-    for a in soup.find_all('a', href=True):
-        ids_from_href = extract_video_id_from_text(a['href'])
-        video_ids.update(ids_from_href)
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for chunk_start in range(0, size, chunk_size):
+                chunk_end = chunk_start + chunk_size
+                # Solo cuentan las coincidencias que empiezan en este bloque; las
+                # del solapamiento las encuentra el bloque siguiente
+                for match in pattern.finditer(mm, chunk_start, min(size, chunk_end + overlap)):
+                    if match.start() >= chunk_end:
+                        break
+                    video_id = match.group(match.lastindex).decode('ascii')
+                    if video_id not in seen:
+                        seen.add(video_id)
+                        yield video_id
+            
+            # Bloques ytInitialData: solo se decodifica el script que los contiene
+            for match in _YT_INITIAL_DATA_BYTES_RE.finditer(mm):
+                # El cierre se busca solo dentro de la ventana máxima
+                end = mm.find(b'</script>', match.end(), match.end() + max_initial_data)
+                if end == -1:
+                    continue
+                blob = mm[match.end():end].decode('utf-8', errors='replace')
+                blob_ids = set()
+                _walk_initial_data_at(blob, 0, blob_ids, video_info)
+                for video_id in blob_ids - seen:
+                    seen.add(video_id)
+                    yield video_id
+
+def extract_youtube_urls_from_file(path, video_info=None):
+    """
+    Igual que extract_youtube_urls, pero leyendo el archivo por bloques sin
+    cargarlo completo en memoria.
+    """
+    video_ids = iter_video_ids_in_file(path, video_info=video_info)
+    return sorted(f'https://www.youtube.com/watch?v={video_id}' for video_id in video_ids)
+
+def extract_youtube_urls(html_content, video_info=None):
+    """
+    Extrae todas las URLs de videos de YouTube de un contenido HTML.
     
-    # Convertir IDs a URLs completas y filtrar duplicados
-    youtube_urls = set()
-    for video_id in video_ids:
-        url = f'https://www.youtube.com/watch?v={video_id}'
-        youtube_urls.add(url)
+    Los scripts y los href son parte del HTML, así que basta con una pasada
+    sobre el contenido completo (incluyendo los atributos data-video-id).
+    """
+    video_ids = extract_video_id_from_text(html_content, HTML_VIDEO_ID_RE, video_info)
     
-    return sorted(list(youtube_urls))
+    # Convertir IDs a URLs completas
+    return sorted(f'https://www.youtube.com/watch?v={video_id}' for video_id in video_ids)
 
 def save_urls_to_file(urls, directory_path):
     """
@@ -116,38 +243,150 @@ def save_urls_to_file(urls, directory_path):
         for url in urls:
             f.write(f'{url}\n')
 
-def main():
+def expand_inputs(inputs, extensions=DISCOVERY_EXTENSIONS):
     """
-    Función principal que lee el archivo de código fuente y extrae las URLs.
+    Convierte archivos, carpetas (recorridas de forma recursiva) y patrones
+    glob en una lista de archivos sin repetidos.
+    """
+    paths = []
+    seen = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            candidates = []
+            for root, _, files in os.walk(item):
+                candidates.extend(os.path.join(root, name) for name in sorted(files)
+                                  if name.lower().endswith(extensions))
+        elif glob.has_magic(item):
+            candidates = sorted(glob.glob(item, recursive=True))
+        else:
+            candidates = [item]
+        for path in candidates:
+            if os.path.isfile(path) and path not in seen:
+                seen.add(path)
+                paths.append(path)
+    return paths
+
+def _scan_file_worker(path):
     """
-    directory_path = '/Users/francomicalizzi/Downloads/Claude/youtube-extract'
-    input_file = os.path.join(directory_path, 'codigo_fuente.txt')
+    Procesa un archivo en un proceso del pool.
     
+    Retorna (ruta, IDs, títulos, segundos, bytes, error).
+    """
+    start = time.perf_counter()
+    video_info = {}
     try:
-        # Leer el contenido del archivo
-        print(f"Leyendo código fuente desde '{input_file}'...")
-        with open(input_file, 'r', encoding='utf-8') as f:
-            html_content = f.read()
-        
-        print(f"\nLongitud total del contenido: {len(html_content)} caracteres")
-        
-        # Extraer las URLs
-        youtube_urls = extract_youtube_urls(html_content)
-        
-        # Mostrar resultados
-        print(f"\nSe encontraron {len(youtube_urls)} URLs de YouTube:")
-        for url in youtube_urls:
-            print(url)
+        video_ids = list(iter_video_ids_in_file(path, video_info=video_info))
+        error = None
+    except (OSError, ValueError) as e:
+        video_ids = []
+        error = str(e)
+    titles = {video_id: info['title'] for video_id, info in video_info.items() if info['title']}
+    size = os.path.getsize(path) if error is None else 0
+    return path, video_ids, titles, time.perf_counter() - start, size, error
+
+def discover_urls(inputs, output_file, workers=None, verbose=False):
+    """
+    Busca URLs de videos en muchos archivos en paralelo.
+    
+    Los archivos se reparten en un pool de procesos. Las URLs nuevas se
+    escriben en output_file a medida que llegan (una por línea, el formato de
+    read_urls_from_file) y los IDs repetidos entre archivos se descartan.
+    Retorna un dict con las estadísticas y los títulos encontrados.
+    """
+    paths = expand_inputs(inputs)
+    workers = workers or os.cpu_count() or 1
+    seen = set()
+    stats = {'files': len(paths), 'bytes': 0, 'urls': 0, 'duplicates': 0, 'errors': 0,
+             'timings': [], 'titles': {}, 'elapsed': 0.0}
+    
+    start = time.perf_counter()
+    with open(output_file, 'w', encoding='utf-8') as out, ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        path_iter = iter(paths)
         
-        # Guardar en archivo
-        save_urls_to_file(youtube_urls, directory_path)
-        print(f"\nLas URLs han sido guardadas en '{os.path.join(directory_path, 'video_urls.txt')}'")
+        def handle(result):
+            path, video_ids, titles, elapsed, size, error = result
+            if error is not None:
+                stats['errors'] += 1
+                print(f"   ⚠️  {path}: {error}")
+                return
+            new_ids = [video_id for video_id in video_ids if video_id not in seen]
+            seen.update(new_ids)
+            for video_id in new_ids:
+                out.write(f'https://www.youtube.com/watch?v={video_id}\n')
+            out.flush()
+            stats['bytes'] += size
+            stats['urls'] += len(new_ids)
+            stats['duplicates'] += len(video_ids) - len(new_ids)
+            stats['timings'].append((elapsed, path))
+            stats['titles'].update(titles)
+            if verbose:
+                print(f"   {elapsed * 1000:8.1f} ms  {len(video_ids):6d} IDs  {path}")
         
-    except FileNotFoundError:
-        print(f"\nError: No se encontró el archivo '{input_file}'")
+        # Mantener acotado el número de archivos en vuelo
+        for path in path_iter:
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    handle(future.result())
+            pending.add(executor.submit(_scan_file_worker, path))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                handle(future.result())
+    
+    stats['elapsed'] = time.perf_counter() - start
+    return stats
+
+def print_discovery_report(stats, output_file):
+    """Muestra el resumen de discover_urls con tiempos por archivo y throughput."""
+    elapsed = stats['elapsed'] or 1e-9
+    timings = sorted(stats['timings'], reverse=True)
+    print(f"\nArchivos procesados: {stats['files']} ({stats['bytes'] / (1024 * 1024):.1f} MB)")
+    print(f"URLs únicas: {stats['urls']} (repetidas entre archivos: {stats['duplicates']})")
+    if stats['errors']:
+        print(f"Archivos con errores: {stats['errors']}")
+    print(f"Tiempo total: {elapsed:.2f} s • {stats['files'] / elapsed:.1f} archivos/s • "
+          f"{stats['bytes'] / (1024 * 1024) / elapsed:.1f} MB/s")
+    if timings:
+        median = timings[len(timings) // 2][0]
+        print(f"Tiempo por archivo: mediana {median * 1000:.1f} ms, máximo {timings[0][0] * 1000:.1f} ms")
+        if len(timings) > 1:
+            print("Archivos más lentos:")
+            for elapsed_file, path in timings[:5]:
+                print(f"   {elapsed_file * 1000:8.1f} ms  {path}")
+    print(f"\nLas URLs han sido guardadas en '{output_file}'")
+
+def main():
+    """
+    Busca URLs de YouTube en uno o varios archivos de código fuente.
+    
+    Uso:
+        python yt_url_finder.py                                  # codigo_fuente.txt
+        python yt_url_finder.py paginas/ "volcado/**/*.html" -o video_urls.txt -j 8
+    """
+    parser = argparse.ArgumentParser(description='Busca URLs de videos de YouTube en archivos HTML o de texto')
+    parser.add_argument('inputs', nargs='*', default=['codigo_fuente.txt'],
+                        help='Archivos, carpetas o patrones glob (por defecto: codigo_fuente.txt)')
+    parser.add_argument('-o', '--output', default='video_urls.txt', help='Archivo de salida con las URLs')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='Procesos en paralelo (por defecto: núcleos)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Mostrar el tiempo de cada archivo')
+    args = parser.parse_args()
+    
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        print(f"\nError: No se encontraron archivos en {', '.join(args.inputs)}")
         print("Por favor, asegúrate de crear el archivo 'codigo_fuente.txt' con el código HTML antes de ejecutar el script.")
+        sys.exit(1)
+    
+    print(f"Buscando URLs de YouTube en {len(paths)} archivo(s)...")
+    try:
+        stats = discover_urls(paths, args.output, workers=args.jobs, verbose=args.verbose)
     except Exception as e:
-        print(f"\nError al procesar el archivo: {str(e)}")
+        print(f"\nError al procesar los archivos: {str(e)}")
+        sys.exit(1)
+    
+    print_discovery_report(stats, args.output)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()